@@ -1,7 +1,7 @@
 import re
 import pandas as pd
 from datetime import datetime
-from data_processing import normalize_date
+from data_processing import normalize_date, sheet_cells
 
 def get_upcoming_jubilees(marriage_date_str, surname, husband, wife, jub_type="MAŁŻONKOWIE", window_days=30, marriage_year_from=1900, marriage_year_to=2100):
     """Sprawdza nadchodzące jubileusze ślubu."""
@@ -52,12 +52,13 @@ def get_upcoming_jubilees(marriage_date_str, surname, husband, wife, jub_type="M
 def analyze_marriage_jubilees(sheet, file_path, surname="", window_days=30, marriage_year_from=1900, marriage_year_to=2100):
     """Analizuje jubileusze ślubu małżonków."""
     jubilees = []
+    sheet = sheet_cells(sheet)
     try:
         if sheet.shape[0] >= 10 and sheet.shape[1] >= 4:
-            husband = sheet.iloc[8, 1] if not pd.isna(sheet.iloc[8, 1]) else None
-            wife = sheet.iloc[9, 1] if not pd.isna(sheet.iloc[9, 1]) else None
-            marriage_date_husband = sheet.iloc[8, 3] if not pd.isna(sheet.iloc[8, 3]) else None
-            marriage_date_wife = sheet.iloc[9, 3] if not pd.isna(sheet.iloc[9, 3]) else None
+            husband = sheet[8, 1] if not pd.isna(sheet[8, 1]) else None
+            wife = sheet[9, 1] if not pd.isna(sheet[9, 1]) else None
+            marriage_date_husband = sheet[8, 3] if not pd.isna(sheet[8, 3]) else None
+            marriage_date_wife = sheet[9, 3] if not pd.isna(sheet[9, 3]) else None
             if husband and wife:
                 marriage_date = marriage_date_husband or marriage_date_wife
                 if isinstance(marriage_date, (pd.Timestamp, datetime)):
@@ -75,6 +76,7 @@ def analyze_marriage_jubilees(sheet, file_path, surname="", window_days=30, marr
 def analyze_grandparents_jubilees(sheet, file_path, surname="", window_days=30, marriage_year_from=1900, marriage_year_to=2100):
     """Analizuje jubileusze ślubu dziadków."""
     jubilees = []
+    sheet = sheet_cells(sheet)
     try:
         start_col = 4
         end_col = min(sheet.shape[1] - 1, 17)
@@ -82,7 +84,7 @@ def analyze_grandparents_jubilees(sheet, file_path, surname="", window_days=30,
         dziadek_idx = None
         babcia_idx = None
         for row_idx in range(len(sheet)):
-            cell_D = str(sheet.iloc[row_idx, 3]).lower() if pd.notna(sheet.iloc[row_idx, 3]) else ""
+            cell_D = str(sheet[row_idx, 3]).lower() if pd.notna(sheet[row_idx, 3]) else ""
             if "dziadek" in cell_D and "†" not in cell_D and "zm." not in cell_D:
                 dziadek_idx = row_idx
             elif "babcia" in cell_D and "†" not in cell_D and "zm." not in cell_D:
@@ -91,7 +93,7 @@ def analyze_grandparents_jubilees(sheet, file_path, surname="", window_days=30,
             marriage_date_gp = None
             for row_idx in range(max(0, dziadek_idx - 2), min(len(sheet), babcia_idx + 3)):
                 for col in range(start_col, end_col + 1):
-                    val = sheet.iloc[row_idx, col]
+                    val = sheet[row_idx, col]
                     if pd.notna(val):
                         if isinstance(val, str):
                             m = regex_slub.search(val)
@@ -114,11 +116,12 @@ def analyze_grandparents_jubilees(sheet, file_path, surname="", window_days=30,
 
 def extract_marriage_info(sheet):
     """Zwraca informacje o ślubie małżonków."""
+    sheet = sheet_cells(sheet)
     try:
         if sheet.shape[0] >= 10 and sheet.shape[1] >= 4:
-            husband = sheet.iloc[8, 1] if not pd.isna(sheet.iloc[8, 1]) else None
-            wife = sheet.iloc[9, 1] if not pd.isna(sheet.iloc[9, 1]) else None
-            marriage_date = sheet.iloc[8, 3] if not pd.isna(sheet.iloc[8, 3]) else (sheet.iloc[9, 3] if not pd.isna(sheet.iloc[9, 3]) else None)
+            husband = sheet[8, 1] if not pd.isna(sheet[8, 1]) else None
+            wife = sheet[9, 1] if not pd.isna(sheet[9, 1]) else None
+            marriage_date = sheet[8, 3] if not pd.isna(sheet[8, 3]) else (sheet[9, 3] if not pd.isna(sheet[9, 3]) else None)
             if isinstance(marriage_date, (pd.Timestamp, datetime)):
                 marriage_date = marriage_date.date().isoformat()
             elif isinstance(marriage_date, str):
@@ -133,6 +136,7 @@ def extract_marriage_info(sheet):
 
 def extract_grandparents_marriage_info(sheet):
     """Próbuje znaleźć datę ślubu dziadków."""
+    sheet = sheet_cells(sheet)
     try:
         start_col = 4
         end_col = min(sheet.shape[1] - 1, 17)
@@ -140,7 +144,7 @@ def extract_grandparents_marriage_info(sheet):
         dziadek_idx = None
         babcia_idx = None
         for row_idx in range(len(sheet)):
-            cell_D = str(sheet.iloc[row_idx, 3]).lower() if pd.notna(sheet.iloc[row_idx, 3]) else ""
+            cell_D = str(sheet[row_idx, 3]).lower() if pd.notna(sheet[row_idx, 3]) else ""
             if "dziadek" in cell_D and "†" not in cell_D and "zm." not in cell_D:
                 dziadek_idx = row_idx
             elif "babcia" in cell_D and "†" not in cell_D and "zm." not in cell_D:
@@ -148,7 +152,7 @@ def extract_grandparents_marriage_info(sheet):
         if dziadek_idx is not None and babcia_idx is not None:
             for row_idx in range(max(0, dziadek_idx - 2), min(len(sheet), babcia_idx + 3)):
                 for col in range(start_col, end_col + 1):
-                    val = sheet.iloc[row_idx, col]
+                    val = sheet[row_idx, col]
                     if pd.notna(val):
                         if isinstance(val, str):
                             m = regex_slub.search(val)
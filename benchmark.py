@@ -0,0 +1,317 @@
+"""
+Pomiar wydajności analizy kartoteki - etap po etapie, z zapisem wyników bazowych.
+
+Każdy etap jest mierzony osobno (szeregowo, w jednym procesie), kilka razy:
+- discovery - wyszukanie plików kartoteki w folderze,
+- read - otwarcie skoroszytów i wczytanie arkuszy (kolumny A-R),
+- header - nazwisko, adresy i daty ślubów z arkuszy,
+- people - wyodrębnienie osób (imiona i daty urodzenia),
+- jubilees - kalendarz rocznic i jubileusze w oknie dni,
+- merge - łączenie wyników (wiek, słownik imion, nieznane imiona),
+- statistics - zliczanie statystyk i raport tekstowy,
+- export_statistics, export_all_results - zapis plików Excel (export_statistics).
+
+Wyniki są zapisywane jako JSON; polecenie compare porównuje dwa wyniki
+i zgłasza etapy wolniejsze od bazowych o więcej niż podany próg.
+
+Przykłady:
+    python benchmark.py run --files 2000 -o benchmarks\\bazowy.json
+    python benchmark.py run --corpus C:\\Testy\\korpus --compare benchmarks\\bazowy.json
+    python benchmark.py compare benchmarks\\bazowy.json benchmarks\\nowy.json --threshold 0.15
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from config import BASE_DIR, DEFAULT_AGE_FROM, DEFAULT_AGE_TO, DEFAULT_JUBILEE_DAYS
+
+# Wersja formatu pliku wyników
+RESULTS_VERSION = 1
+
+# Folder na wyniki pomiarów (obok settings.json)
+BENCHMARK_DIR = os.path.join(BASE_DIR, "benchmarks")
+
+# Domyślny próg spowolnienia (0.10 = 10%) i najmniejsza różnica brana pod uwagę
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_MIN_DELTA = 0.005
+
+STAGES = ["discovery", "read", "header", "people", "jubilees", "merge", "statistics",
+          "export_statistics", "export_all_results"]
+
+def _median(values):
+    # Moduł statistics w tym folderze to statystyki kartoteki, nie biblioteka standardowa
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if not ordered:
+        return 0.0
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+def _timed(function, repeat):
+    """Uruchamia function repeat razy; zwraca (czasy w sekundach, wynik ostatniego uruchomienia)."""
+    runs = []
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        runs.append(time.perf_counter() - start)
+    return runs, value
+
+def run_benchmark(folder_path, repeat=3, params=None, names_file=None):
+    """
+    Mierzy wszystkie etapy analizy folderu i zwraca słownik wyników (do zapisu w JSON).
+
+    params - ustawienia analizy jak w kartoteka_core.default_params.
+    """
+    from file_operations import list_kartoteka_files, load_names
+    from kartoteka_core import evaluate, _merge_params
+    from kartoteka_parser import _read_workbook_sheets, _parse_sheet_header, _extract_people_rows
+    from jubilee_calendar import JubileeCalendar
+    from statistics import Statistics
+    from export_statistics import write_statistics_xlsx, write_all_results_xlsx
+
+    params = _merge_params(params)
+    names_dict = load_names(names_file or os.path.join(folder_path, "imiona.json"))
+    stages = {}
+
+    def record(name, runs, items=None):
+        stages[name] = {"median": _median(runs), "min": min(runs), "runs": runs}
+        if items is not None:
+            stages[name]["items"] = items
+
+    # Wyszukanie plików
+    runs, kartoteka_files = _timed(lambda: list_kartoteka_files(folder_path), repeat)
+    record("discovery", runs, len(kartoteka_files))
+
+    # Otwarcie skoroszytów i wczytanie arkuszy
+    def read_all():
+        workbooks = []
+        for filename, file_path in kartoteka_files:
+            try:
+                with open(file_path, "rb") as f:
+                    workbooks.append((filename, file_path, _read_workbook_sheets(f.read()), None))
+            except Exception as e:
+                workbooks.append((filename, file_path, [], str(e)))
+        return workbooks
+    runs, workbooks = _timed(read_all, repeat)
+    sheet_cells = [(filename, cells) for filename, _, sheets, _ in workbooks for _, cells, error in sheets if error is None]
+    record("read", runs, len(sheet_cells))
+
+    # Nagłówki arkuszy i osoby
+    runs, headers = _timed(lambda: [_parse_sheet_header(cells, filename) for filename, cells in sheet_cells], repeat)
+    record("header", runs, len(headers))
+    runs, people_rows = _timed(lambda: [_extract_people_rows(cells) for _, cells in sheet_cells], repeat)
+    record("people", runs, sum(len(rows) for rows in people_rows))
+
+    # Wyniki w postaci parse_kartoteka_file (dla etapów łączenia)
+    files = []
+    parsed_sheets = iter(zip(headers, people_rows))
+    for filename, file_path, sheets, error in workbooks:
+        parsed = {"file_path": file_path, "filename": filename, "error": error,
+                  "signature": None, "content_hash": None, "sheets": []}
+        for sheet_name, _, sheet_error in sheets:
+            if sheet_error is not None:
+                parsed["sheets"].append({"name": sheet_name, "error": sheet_error})
+                continue
+            header, rows = next(parsed_sheets)
+            sheet = dict(header, people=rows, name=sheet_name, error=None)
+            parsed["sheets"].append(sheet)
+        files.append((filename, file_path, parsed))
+
+    # Jubileusze (kalendarz rocznic i okno dni)
+    today = date.today()
+    def jubilees():
+        calendar = JubileeCalendar.from_files(files, params["jubilee_milestones"])
+        calendar.upcoming(today, params["jubilee_days"],
+                          marriage_year_from=params["marriage_year_from"], marriage_year_to=params["marriage_year_to"])
+        return calendar
+    runs, calendar = _timed(jubilees, repeat)
+    record("jubilees", runs, len(calendar))
+
+    # Łączenie wyników (z gotowym kalendarzem - bez ponownego liczenia jubileuszy)
+    runs, result = _timed(lambda: evaluate(files, folder_path, names_dict, params, calendar=calendar), repeat)
+    record("merge", runs, len(result.people))
+
+    # Statystyki: zliczanie osób, podsumowanie i raport tekstowy
+    def aggregate():
+        aggregated = Statistics()
+        for person in result.people:
+            aggregated.add_person(dict(person))
+        aggregated.get_summary()
+        aggregated.format_statistics(result.people)
+        return aggregated
+    runs, _ = _timed(aggregate, repeat)
+    record("statistics", runs, len(result.people))
+
+    # Eksport do Excela
+    with tempfile.TemporaryDirectory() as temp_dir:
+        runs, _ = _timed(lambda: write_statistics_xlsx(os.path.join(temp_dir, "statystyki.xlsx"), result.statistics), repeat)
+        record("export_statistics", runs)
+        runs, _ = _timed(lambda: write_all_results_xlsx(
+            os.path.join(temp_dir, "wyniki.xlsx"), result.people, result.statistics, result.jubilees,
+            result.marriages, result.unknown, round_birthdays=result.round_birthdays), repeat)
+        record("export_all_results", runs, len(result.people))
+
+    return {
+        "version": RESULTS_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "corpus": {
+            "folder": folder_path,
+            "files": len(kartoteka_files),
+            "sheets": len(sheet_cells),
+            "people": len(result.people),
+        },
+        "params": {key: value for key, value in params.items() if key != "workers"},
+        "repeat": repeat,
+        "stages": stages,
+        "total": sum(stage["median"] for stage in stages.values()),
+    }
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD, min_delta=DEFAULT_MIN_DELTA):
+    """
+    Porównuje mediany etapów; zwraca listę (etap, bazowy, obecny, zmiana, status).
+
+    Status "wolniej" oznacza czas dłuższy o więcej niż threshold (względnie)
+    i jednocześnie o więcej niż min_delta sekund.
+    """
+    rows = []
+    names = [name for name in STAGES if name in baseline["stages"] or name in current["stages"]]
+    names += sorted((set(baseline["stages"]) | set(current["stages"])) - set(names))
+    for name in names:
+        base = baseline["stages"].get(name)
+        now = current["stages"].get(name)
+        if base is None or now is None:
+            rows.append((name, base and base["median"], now and now["median"], None, "brak"))
+            continue
+        base_time, now_time = base["median"], now["median"]
+        change = (now_time - base_time) / base_time if base_time > 0 else 0.0
+        if change > threshold and now_time - base_time > min_delta:
+            status = "wolniej"
+        elif change < -threshold and base_time - now_time > min_delta:
+            status = "szybciej"
+        else:
+            status = "ok"
+        rows.append((name, base_time, now_time, change, status))
+    return rows
+
+def print_results(results, out=sys.stdout):
+    """Wypisuje tabelę czasów etapów."""
+    corpus = results["corpus"]
+    out.write(f"Korpus: {corpus['folder']} - plików {corpus['files']}, arkuszy {corpus['sheets']}, osób {corpus['people']}\n")
+    out.write(f"{'etap':<20} {'mediana [s]':>12} {'min [s]':>10} {'elementów':>10}\n")
+    for name, stage in results["stages"].items():
+        out.write(f"{name:<20} {stage['median']:12.4f} {stage['min']:10.4f} {stage.get('items', ''):>10}\n")
+    out.write(f"{'razem':<20} {results['total']:12.4f}\n")
+
+def print_comparison(baseline, current, rows, out=sys.stdout):
+    """Wypisuje porównanie z wynikiem bazowym."""
+    if baseline["corpus"]["files"] != current["corpus"]["files"] or baseline["corpus"]["people"] != current["corpus"]["people"]:
+        out.write("UWAGA: wyniki dotyczą różnych korpusów - porównanie czasów może być mylące.\n")
+    out.write(f"{'etap':<20} {'bazowy [s]':>11} {'obecny [s]':>11} {'zmiana':>8}  status\n")
+    for name, base_time, now_time, change, status in rows:
+        base_text = f"{base_time:11.4f}" if base_time is not None else f"{'-':>11}"
+        now_text = f"{now_time:11.4f}" if now_time is not None else f"{'-':>11}"
+        change_text = f"{change:+8.1%}" if change is not None else f"{'-':>8}"
+        out.write(f"{name:<20} {base_text} {now_text} {change_text}  {status.upper() if status == 'wolniej' else status}\n")
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+def command_run(args):
+    """Polecenie run: mierzy etapy na podanym albo wygenerowanym korpusie."""
+    params = {
+        "age_from": args.age_from,
+        "age_to": args.age_to,
+        "jubilee_days": args.jubilee_days,
+    }
+    if args.corpus:
+        if not os.path.isdir(args.corpus):
+            print(f"Folder nie istnieje: {args.corpus}", file=sys.stderr)
+            return 1
+        results = run_benchmark(args.corpus, repeat=args.repeat, params=params)
+    else:
+        from synthetic_corpus import generate_corpus
+        with tempfile.TemporaryDirectory(prefix="kartoteka_benchmark_") as corpus_dir:
+            generate_corpus(corpus_dir, workers=0, files=args.files, seed=args.seed)
+            results = run_benchmark(corpus_dir, repeat=args.repeat, params=params)
+        results["corpus"]["folder"] = f"synthetic_corpus (files={args.files}, seed={args.seed})"
+        results["corpus"]["synthetic"] = {"files": args.files, "seed": args.seed}
+
+    print_results(results)
+    output = args.output or os.path.join(BENCHMARK_DIR, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    save_results(results, output)
+    print(f"Zapisano: {output}")
+
+    if args.compare:
+        baseline = load_results(args.compare)
+        rows = compare_results(baseline, results, args.threshold, args.min_delta)
+        print()
+        print_comparison(baseline, results, rows)
+        return 1 if any(row[4] == "wolniej" for row in rows) else 0
+    return 0
+
+def command_compare(args):
+    """Polecenie compare: porównuje dwa zapisane wyniki."""
+    baseline = load_results(args.baseline)
+    current = load_results(args.current)
+    rows = compare_results(baseline, current, args.threshold, args.min_delta)
+    print_comparison(baseline, current, rows)
+    return 1 if any(row[4] == "wolniej" for row in rows) else 0
+
+def build_parser():
+    """Tworzy parser argumentów wiersza poleceń."""
+    thresholds = argparse.ArgumentParser(add_help=False)
+    thresholds.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                            help="próg spowolnienia etapu (0.10 = 10%%)")
+    thresholds.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                            help="najmniejsza różnica czasu w sekundach uznawana za zmianę")
+
+    parser = argparse.ArgumentParser(prog="benchmark", description="Pomiar wydajności analizy kartoteki")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", parents=[thresholds], help="mierzy etapy analizy")
+    run_parser.add_argument("--corpus", help="folder z kartoteką (domyślnie korpus syntetyczny)")
+    run_parser.add_argument("--files", type=int, default=2000, help="liczba plików korpusu syntetycznego")
+    run_parser.add_argument("--seed", type=int, default=0, help="ziarno korpusu syntetycznego")
+    run_parser.add_argument("--repeat", type=int, default=3, help="liczba powtórzeń każdego etapu")
+    run_parser.add_argument("--age-from", type=int, default=DEFAULT_AGE_FROM)
+    run_parser.add_argument("--age-to", type=int, default=DEFAULT_AGE_TO)
+    run_parser.add_argument("--jubilee-days", type=int, default=DEFAULT_JUBILEE_DAYS)
+    run_parser.add_argument("-o", "--output", help="plik wyników JSON (domyślnie folder benchmarks)")
+    run_parser.add_argument("--compare", help="plik wyników bazowych do porównania")
+    run_parser.set_defaults(func=command_run)
+
+    compare_parser = subparsers.add_parser("compare", parents=[thresholds], help="porównuje dwa wyniki")
+    compare_parser.add_argument("baseline", help="wyniki bazowe (JSON)")
+    compare_parser.add_argument("current", help="wyniki porównywane (JSON)")
+    compare_parser.set_defaults(func=command_compare)
+    return parser
+
+def main(argv=None):
+    """Punkt wejścia wiersza poleceń; zwraca kod wyjścia (1 = wykryto spowolnienie)."""
+    args = build_parser().parse_args(argv)
+    if getattr(args, "repeat", 1) < 1:
+        print("Liczba powtórzeń musi być dodatnia.", file=sys.stderr)
+        return 2
+    return args.func(args)
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -22,7 +22,7 @@ echo.
 
 REM Kompiluj do EXE w trybie folderu (onedir) aby pliki były dostępne
 REM Używamy logo.png zamiast nazwy z polskimi znakami
-python -m PyInstaller --onedir --windowed --name="Kartoteka" --icon="logo.ico" --add-data="imiona.json;." --add-data="logo.png;." --add-data="logo.ico;." --hidden-import=statistics --hidden-import=export_statistics --hidden-import=analysis --hidden-import=data_processing --hidden-import=file_operations --hidden-import=gui_dialogs --hidden-import=gui_main --hidden-import=splash_screen --hidden-import=config --hidden-import=numpy --hidden-import=numpy.core._methods --hidden-import=numpy.lib.format --collect-all numpy main.py
+python -m PyInstaller --onedir --windowed --name="Kartoteka" --icon="logo.ico" --add-data="imiona.json;." --add-data="logo.png;." --add-data="logo.ico;." --hidden-import=statistics --hidden-import=export_statistics --hidden-import=analysis --hidden-import=kartoteka_core --hidden-import=kartoteka_parser --hidden-import=parse_cache --hidden-import=folder_watcher --hidden-import=jubilee_calendar --hidden-import=data_processing --hidden-import=file_operations --hidden-import=gui_dialogs --hidden-import=gui_main --hidden-import=splash_screen --hidden-import=startup --hidden-import=profiling --hidden-import=log_view --hidden-import=search_index --hidden-import=event_tree --hidden-import=cProfile --hidden-import=pstats --hidden-import=tracemalloc --hidden-import=config --hidden-import=numpy --hidden-import=numpy.core._methods --hidden-import=numpy.lib.format --collect-all numpy main.py
 
 echo.
 echo ====================================================
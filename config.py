@@ -17,11 +17,18 @@ KATALOG_KARTOTEK = os.path.join(BASE_DIR, "kartotek")
 # Ścieżka do pliku konfiguracji
 CONFIG_FILE = os.path.join(BASE_DIR, "settings.json")
 
+# Ścieżka do pamięci podręcznej wczytanych plików kartoteki
+CACHE_FILE = os.path.join(BASE_DIR, "parse_cache.pkl")
+
 # Domyślne wartości
 DEFAULT_AGE_FROM = 0
 DEFAULT_AGE_TO = 120
 DEFAULT_JUBILEE_DAYS = 30
+DEFAULT_JUBILEE_MILESTONES = (10, 20, 25, 30, 40, 50, 60, 70)  # Lata małżeństwa obchodzone jako jubileusz
+DEFAULT_BIRTHDAY_MILESTONES = (90, 95) + tuple(range(100, 131))  # Okrągłe urodziny: 90, 95, 100 i każde kolejne
 DEFAULT_JSON_FILE = "imiona.json"
+DEFAULT_WORKERS = 0  # Liczba procesów analizy (0 = liczba rdzeni procesora)
+DEFAULT_WATCH_INTERVAL = 5  # Co ile sekund sprawdzać zmiany plików w folderze (0 = wyłączone)
 
 # Stałe kolory dla interfejsu
 COLORS = {
@@ -64,6 +71,24 @@ def save_settings(settings):
         logging.error(f"Błąd zapisywania ustawień: {e}")
         return False
 
+def parse_milestones(settings, key, default, max_value):
+    """
+    Wczytuje listę lat jubileuszy z ustawień (jubilee_milestones, birthday_milestones).
+
+    Zwraca posortowaną krotkę bez powtórzeń; przy braku klucza, błędnej
+    wartości lub liczbach spoza 1..max_value - wartość domyślną.
+    """
+    if key not in settings:
+        return default
+    try:
+        milestones_val = tuple(sorted(set(int(m) for m in settings[key])))
+        if milestones_val and all(1 <= m <= max_value for m in milestones_val):
+            return milestones_val
+        logging.warning(f"{key} poza zakresem: {milestones_val}, użyto domyślnych")
+    except (ValueError, TypeError) as e:
+        logging.warning(f"Błąd wczytania {key}: {e}")
+    return default
+
 def set_window_icon(window):
     """Ustawia niestandardową ikonę okna (zamiast domyślnej ikony Pythona)."""
     try:
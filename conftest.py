@@ -0,0 +1,2 @@
+# test_logo.py to ręczny podgląd logo (otwiera okno Tk), a Kartoteka_Build - spakowana wersja EXE
+collect_ignore = ["test_logo.py", "Kartoteka_Build"]
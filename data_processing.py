@@ -1,6 +1,7 @@
 import re
+import sys
+import logging
 import unicodedata
-import pandas as pd
 from datetime import datetime
 
 def remove_diacritics(text):
@@ -17,9 +18,32 @@ def format_person_name(name):
     parts = re.split(r'([- ])', name)
     return "".join(p.capitalize() if p not in "- " else p for p in parts)
 
+def is_missing(value):
+    """Czy wartość komórki jest pusta (None, NaN, NaT) - jak pd.isna, bez importu pandas."""
+    if value is None:
+        return True
+    try:
+        # NaN i NaT są różne od samych siebie
+        return bool(value != value)
+    except TypeError:
+        # pd.NA nie ma wartości logicznej
+        return True
+
+def is_timestamp(value):
+    """Czy wartość to pd.Timestamp; bez wczytanego pandas takich wartości nie ma."""
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(value, pd.Timestamp)
+
+def sheet_cells(sheet):
+    """Zwraca komórki arkusza jako tablicę 2-D indeksowaną [wiersz, kolumna]."""
+    if hasattr(sheet, "to_numpy"):
+        # DataFrame (np. plik .xls wczytany przez pandas)
+        return sheet.to_numpy(dtype=object)
+    return sheet
+
 def extract_words(cell_value):
     """Ekstrakcja słów z komórki."""
-    if pd.isna(cell_value):
+    if is_missing(cell_value):
         return []
     if isinstance(cell_value, str):
         tokens = re.findall(r'\b[\w-]+\b', cell_value.lower())
@@ -27,7 +51,7 @@ def extract_words(cell_value):
         return tokens
     if isinstance(cell_value, (int, float)):
         return []
-    if isinstance(cell_value, pd.Timestamp):
+    if is_timestamp(cell_value):
         return extract_words(str(cell_value.date()))
     return []
 
@@ -55,10 +79,10 @@ def validate_date_components(day, month, year):
 
 def normalize_date(value):
     """Normalizuje daty do formatu ISO."""
-    if pd.isna(value):
+    if is_missing(value):
         return None
 
-    if isinstance(value, pd.Timestamp):
+    if is_timestamp(value):
         return value.date().isoformat()
 
     if isinstance(value, str):
@@ -79,7 +103,8 @@ def normalize_date(value):
 
 def extract_birth_date(cell):
     """Wyciąga datę urodzenia z komórki."""
-    if isinstance(cell, (pd.Timestamp, datetime)):
+    if isinstance(cell, datetime):
+        # Także pd.Timestamp (podklasa datetime)
         return cell.date()
     if isinstance(cell, str):
         m = re.search(r"(\d{1,2})[./-](\d{1,2})[./-](\d{4})", cell)
@@ -87,7 +112,7 @@ def extract_birth_date(cell):
             d, mth, y = m.groups()
             # Specjalna obsługa daty umownej
             if str(d) == '99' and str(mth) == '99' and str(y) == '9999':
-                print("[INFO] Data 99/99/9999: przypisano wiek równy medianie populacji. Osoba liczona w statystykach.")
+                logging.debug("Data 99/99/9999: przypisano wiek równy medianie populacji. Osoba liczona w statystykach.")
                 return "MEDIANA_WIEKU"
             is_valid, error_msg = validate_date_components(d, mth, y)
             if not is_valid:
@@ -98,9 +123,10 @@ def extract_birth_date(cell):
                 return None
     return None
 
-def calculate_age(birth_date):
-    """Oblicza wiek na podstawie daty urodzenia."""
-    today = datetime.today().date()
+def calculate_age(birth_date, today=None):
+    """Oblicza wiek na podstawie daty urodzenia (today - opcjonalna data odniesienia)."""
+    if today is None:
+        today = datetime.today().date()
     # Jeśli birth_date to liczba (wiek), zwróć ją bez zmian
     if isinstance(birth_date, (int, float)):
         return int(birth_date)
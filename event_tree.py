@@ -0,0 +1,170 @@
+"""
+Drzewo zdarzeń analizy: plik -> arkusz -> zdarzenie (ttk.Treeview).
+
+Węzły plików są wstawiane od razu, a ich zdarzenia dopiero przy pierwszym
+rozwinięciu węzła - przy tysiącach plików i dziesiątkach tysięcy zdarzeń
+drzewo pojawia się natychmiast. Filtry poziomów (błędy, ostrzeżenia,
+informacje) przebudowują tylko listę plików; przy niewielu pasujących
+zdarzeniach wszystkie pliki są rozwijane automatycznie.
+"""
+import tkinter as tk
+from tkinter import ttk
+from collections import Counter
+from config import COLORS
+from kartoteka_core import EVENT_LEVELS
+
+# Etykiety filtrów poziomów
+LEVEL_LABELS = {"ERROR": "Błędy", "WARNING": "Ostrzeżenia", "INFO": "Informacje"}
+LEVEL_COLORS = {"ERROR": COLORS["error"], "WARNING": COLORS["warning"], "INFO": COLORS["text"]}
+
+# Przy tylu pasujących zdarzeniach (lub mniej) pliki są rozwijane od razu
+AUTO_EXPAND_EVENTS = 200
+
+PLACEHOLDER = "placeholder"
+
+class EventTree(tk.Frame):
+    """Panel ze zdarzeniami analizy pogrupowanymi według plików i arkuszy."""
+
+    def __init__(self, master, on_open_file=None, bg=None):
+        super().__init__(master, bg=bg)
+        self.on_open_file = on_open_file  # Funkcja wywoływana ze ścieżką pliku (dwuklik)
+        self.result = None
+        self.file_levels = []  # Liczba zdarzeń każdego poziomu w pliku (Counter, indeks = file_id)
+        self.level_totals = Counter()
+        self._loaded = set()  # Pliki, których zdarzenia są już wstawione do drzewa
+
+        filter_bar = tk.Frame(self, bg=bg)
+        filter_bar.pack(fill="x", pady=(0, 6))
+        tk.Label(filter_bar, text="Pokaż:", bg=bg, font=("Segoe UI", 9, "bold")).pack(side="left")
+        self.level_vars = {}
+        self.level_buttons = {}
+        for level in EVENT_LEVELS:
+            var = tk.BooleanVar(value=True)
+            button = tk.Checkbutton(filter_bar, text=LEVEL_LABELS[level], variable=var, bg=bg,
+                                    fg=LEVEL_COLORS[level], font=("Segoe UI", 9, "bold"),
+                                    command=self.refresh)
+            button.pack(side="left", padx=(6, 0))
+            self.level_vars[level] = var
+            self.level_buttons[level] = button
+        tk.Button(filter_bar, text="Tylko błędy", relief="flat", font=("Segoe UI", 9),
+                  command=self.show_errors_only).pack(side="right")
+
+        self.tree = ttk.Treeview(self, columns=("level", "cell"), selectmode="browse")
+        self.tree.heading("#0", text="Plik / arkusz / zdarzenie", anchor="w")
+        self.tree.heading("level", text="Poziom", anchor="w")
+        self.tree.heading("cell", text="Komórka", anchor="w")
+        self.tree.column("#0", width=520, stretch=True)
+        self.tree.column("level", width=90, stretch=False)
+        self.tree.column("cell", width=80, stretch=False)
+        for level in EVENT_LEVELS:
+            self.tree.tag_configure(level, foreground=LEVEL_COLORS[level])
+        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind("<<TreeviewOpen>>", self._on_open)
+        self.tree.bind("<Double-1>", self._on_double_click)
+
+    def active_levels(self):
+        return {level for level, var in self.level_vars.items() if var.get()}
+
+    def clear(self):
+        """Usuwa zdarzenia poprzedniej analizy."""
+        self.result = None
+        self.file_levels = []
+        self.level_totals = Counter()
+        self._loaded = set()
+        self.tree.delete(*self.tree.get_children())
+        self._update_labels()
+
+    def load(self, result):
+        """Wczytuje zdarzenia z wyniku analizy (AnalysisResult)."""
+        self.result = result
+        events = result.events
+        self.file_levels = [Counter(event.level for event in events[info["start"]:info["end"]])
+                            for info in result.event_files]
+        self.level_totals = Counter(event.level for event in events)
+        self._update_labels()
+        self.refresh()
+
+    def show_errors_only(self):
+        for level, var in self.level_vars.items():
+            var.set(level == "ERROR")
+        self.refresh()
+
+    def refresh(self):
+        """Przebudowuje listę plików według wybranych poziomów (zdarzenia plików - przy rozwinięciu)."""
+        self.tree.delete(*self.tree.get_children())
+        self._loaded = set()
+        if self.result is None:
+            return
+        levels = self.active_levels()
+        matching = 0
+        file_nodes = []
+        for file_id, info in enumerate(self.result.event_files):
+            counts = self.file_levels[file_id]
+            count = sum(counts[level] for level in levels)
+            if not count:
+                continue
+            matching += count
+            worst = next(level for level in EVENT_LEVELS if counts[level])
+            problems = ", ".join(f"{LEVEL_LABELS[level].lower()}: {counts[level]}"
+                                 for level in ("ERROR", "WARNING") if counts[level])
+            node = self.tree.insert("", tk.END, iid=f"f{file_id}", tags=(worst,),
+                                    text=f"{file_id + 1}. {info['name']}" + (f"  ({problems})" if problems else ""),
+                                    values=(worst if worst != "INFO" else "", ""))
+            self.tree.insert(node, tk.END, iid=f"f{file_id}-{PLACEHOLDER}", text="...")
+            file_nodes.append(file_id)
+
+        # Zdarzenia spoza plików (np. dodane imiona) - od razu na najwyższym poziomie
+        last_end = self.result.event_files[-1]["end"] if self.result.event_files else 0
+        for event in self.result.events[last_end:]:
+            if event.level in levels:
+                matching += 1
+                self.tree.insert("", tk.END, text=event.message, values=(event.level, event.cell or ""),
+                                 tags=(event.level,))
+
+        if matching <= AUTO_EXPAND_EVENTS:
+            for file_id in file_nodes:
+                self._populate(file_id)
+                self.tree.item(f"f{file_id}", open=True)
+
+    def _populate(self, file_id):
+        """Wstawia zdarzenia pliku pogrupowane według arkuszy."""
+        if file_id in self._loaded:
+            return
+        self._loaded.add(file_id)
+        node = f"f{file_id}"
+        self.tree.delete(f"{node}-{PLACEHOLDER}")
+        info = self.result.event_files[file_id]
+        levels = self.active_levels()
+        sheet_nodes = {}
+        for event in self.result.events[info["start"]:info["end"]]:
+            if event.level not in levels:
+                continue
+            parent = node
+            if event.sheet is not None:
+                parent = sheet_nodes.get(event.sheet)
+                if parent is None:
+                    parent = self.tree.insert(node, tk.END, text=f"Arkusz: {event.sheet}", open=True)
+                    sheet_nodes[event.sheet] = parent
+            self.tree.insert(parent, tk.END, text=event.message, values=(event.level, event.cell or ""),
+                             tags=(event.level,))
+
+    def _on_open(self, event):
+        item = self.tree.focus()
+        if item.startswith("f") and "-" not in item and item[1:].isdigit():
+            self._populate(int(item[1:]))
+
+    def _on_double_click(self, event):
+        """Dwuklik otwiera plik, do którego należy zdarzenie."""
+        item = self.tree.identify_row(event.y)
+        while item and self.tree.parent(item):
+            item = self.tree.parent(item)
+        if item.startswith("f") and item[1:].isdigit() and self.on_open_file:
+            self.on_open_file(self.result.event_files[int(item[1:])]["path"])
+
+    def _update_labels(self):
+        for level, button in self.level_buttons.items():
+            button.config(text=f"{LEVEL_LABELS[level]} ({self.level_totals[level]})")
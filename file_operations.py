@@ -2,6 +2,20 @@ import json
 import os
 from data_processing import remove_diacritics
 
+def is_kartoteka_filename(filename):
+    """Czy plik o tej nazwie należy do kartoteki (Excel, bez plików blokady i wzoru)."""
+    if filename.startswith("~$") or not filename.lower().endswith((".xls", ".xlsx")):
+        return False
+    return filename.lower() not in ["wzór.xlsx", "wzor.xlsx"]
+
+def list_kartoteka_files(folder_path):
+    """Zwraca listę (nazwa, ścieżka) plików kartoteki w kolejności analizy."""
+    files = []
+    for filename in os.listdir(folder_path):
+        if is_kartoteka_filename(filename):
+            files.append((filename, os.path.join(folder_path, filename)))
+    return files
+
 def load_names(json_file):
     """Wczytuje plik JSON z imionami."""
     try:
@@ -0,0 +1,82 @@
+"""
+Moduł wykrywania zmian w folderze kartoteki.
+
+FolderWatcher okresowo porównuje migawki folderu (czas modyfikacji i rozmiar
+każdego pliku Excel) odczytane przez os.scandir. Nie korzysta z mechanizmów
+powiadomień systemu operacyjnego, więc działa tak samo w Windows, Linuksie
+i na dyskach sieciowych. Samo odpytywanie nie otwiera plików.
+"""
+import os
+import logging
+from file_operations import is_kartoteka_filename
+
+class FolderWatcher:
+    """Wykrywa pliki kartoteki dodane, zmienione i usunięte od poprzedniego sprawdzenia."""
+
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+        self.snapshot = self.take_snapshot() or {}
+
+    def take_snapshot(self):
+        """Zwraca {ścieżka: (czas modyfikacji ns, rozmiar)} albo None, gdy folder jest niedostępny."""
+        snapshot = {}
+        try:
+            with os.scandir(self.folder_path) as entries:
+                for entry in entries:
+                    if not is_kartoteka_filename(entry.name):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # Plik usunięty w trakcie odczytu folderu
+                    snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            logging.warning(f"Nie można odczytać folderu {self.folder_path}: {e}")
+            return None
+        return snapshot
+
+    def watches(self, folder_path):
+        """Czy obserwowany jest podany folder."""
+        return os.path.normcase(os.path.abspath(self.folder_path)) == os.path.normcase(os.path.abspath(folder_path))
+
+    def update(self, file_paths):
+        """
+        Zapisuje w migawce bieżący stan wskazanych plików (np. zapisanych przez program).
+
+        Pliki wczytywane ponownie przez sam program nie są potem zgłaszane
+        przez poll jako zmienione; pliki spoza folderu są pomijane.
+        """
+        folder = os.path.normcase(os.path.abspath(self.folder_path))
+        for file_path in file_paths:
+            if os.path.normcase(os.path.abspath(os.path.dirname(file_path))) != folder:
+                continue
+            name = os.path.basename(file_path)
+            if not is_kartoteka_filename(name):
+                continue
+            path = os.path.join(self.folder_path, name)  # Klucz jak w take_snapshot (entry.path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self.snapshot.pop(path, None)
+                continue
+            self.snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+
+    def poll(self):
+        """
+        Porównuje folder z poprzednią migawką.
+
+        Returns:
+            Krotka list ścieżek (dodane, zmienione, usunięte); przy niedostępnym
+            folderze (np. rozłączony dysk sieciowy) wszystkie listy są puste.
+        """
+        snapshot = self.take_snapshot()
+        if snapshot is None:
+            return [], [], []
+        previous = self.snapshot
+        added = sorted(path for path in snapshot if path not in previous)
+        modified = sorted(path for path in snapshot if path in previous and snapshot[path] != previous[path])
+        deleted = sorted(path for path in previous if path not in snapshot)
+        self.snapshot = snapshot
+        return added, modified, deleted
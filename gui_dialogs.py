@@ -1,15 +1,14 @@
 import tkinter as tk
-from tkinter import scrolledtext, messagebox, filedialog
-import pandas as pd
-import openpyxl
-from openpyxl import load_workbook
+from tkinter import ttk, scrolledtext, messagebox, filedialog
 import logging
 import os
 import re
+import threading
 from datetime import datetime
-from data_processing import format_person_name, remove_diacritics, extract_number_from_text
+from data_processing import format_person_name, remove_diacritics
 from file_operations import save_names_to_json
-from analysis import extract_marriage_info, extract_grandparents_marriage_info
+from kartoteka_core import MarriageIndex, PeopleIndex
+from parse_cache import ParseCache
 
 def open_excel_file_for_editing(selected_name, locations, folder_path):
     """Otwiera okno do edycji pliku Excel dla wybranego imienia."""
@@ -40,6 +39,7 @@ def open_excel_file_for_editing(selected_name, locations, folder_path):
         file_path, sheet_name = selected_location.split(" -> ")
 
         try:
+            import pandas as pd
             xl = pd.ExcelFile(file_path)
             df = xl.parse(sheet_name, header=None)
 
@@ -191,6 +191,8 @@ def edit_unknown_name(all_unknown, names_dict, folder_path, result_text, main_wi
             messagebox.showwarning("Błąd", "Nie wprowadzono poprawionej wersji imienia.")
             return
         corrected_name_fmt = format_person_name(corrected_name)
+        modified_paths = []
+        from openpyxl import load_workbook
 
         for location in list(all_unknown.get(selected_name, [])):
             file_part, sheet_name = location.split(" -> ")
@@ -219,6 +221,7 @@ def edit_unknown_name(all_unknown, names_dict, folder_path, result_text, main_wi
                                 replaced_any = True
                 if replaced_any:
                     workbook.save(full_path)
+                    modified_paths.append(full_path)
                     result_text.insert(tk.END, f"[INFO] Zaktualizowano imię '{selected_name}' na '{corrected_name_fmt}' w pliku: {full_path}, arkusz: {sheet_name}\n")
                 else:
                     result_text.insert(tk.END, f"[INFO] Nie znaleziono dokładnych wystąpień '{selected_name}' w pliku: {full_path}, arkusz: {sheet_name}\n")
@@ -238,8 +241,9 @@ def edit_unknown_name(all_unknown, names_dict, folder_path, result_text, main_wi
         edit_window.focus_force()
         print(f"[DEBUG] apply_correction: main_window={main_window}")
         if main_window:
-            print("[DEBUG] apply_correction: wywołuję analyze_current_settings po poprawce imienia (natychmiast)")
-            main_window.analyze_current_settings(show_dialog=False)
+            # Wczytaj ponownie tylko zmienione pliki - reszta kartoteki zostaje w pamięci
+            logging.debug(f"apply_correction: ponowne wczytanie zmienionych plików ({len(modified_paths)})")
+            main_window.refresh_files(modified_paths)
             # Przywróć okno edycji na wierzch po analizie
             edit_window.lift()
             edit_window.focus_force()
@@ -253,7 +257,8 @@ def edit_unknown_name(all_unknown, names_dict, folder_path, result_text, main_wi
         corrected_name = corrected_name_entry.get().strip()
         key_name = format_person_name(corrected_name) if corrected_name else format_person_name(selected_name)
         gender = gender_var.get()
-        names_dict[remove_diacritics(key_name).strip().lower()] = gender
+        name_key = remove_diacritics(key_name).strip().lower()
+        names_dict[name_key] = gender
 
         # Domyślna ścieżka do pliku imiona.json
         default_json_path = os.path.join(folder_path, "imiona.json") if folder_path else "imiona.json"
@@ -263,8 +268,8 @@ def edit_unknown_name(all_unknown, names_dict, folder_path, result_text, main_wi
                 result_text.insert(tk.END, f"[INFO] Dodano imię '{key_name}' jako '{gender}' do pliku: {default_json_path}\n")
                 zapisano = True
                 if main_window:
-                    print("[DEBUG] add_to_database: wywołuję analyze_current_settings po dodaniu imienia (natychmiast)")
-                    main_window.analyze_current_settings(show_dialog=False)
+                    # Dołącz do wyników wiersze z tym imieniem - bez ponownej analizy
+                    main_window.promote_unknown_name(name_key, gender)
                     edit_window.lift()
                     edit_window.focus_force()
         except Exception as e:
@@ -282,8 +287,8 @@ def edit_unknown_name(all_unknown, names_dict, folder_path, result_text, main_wi
                 if save_names_to_json({key_name: gender}, save_path):
                     result_text.insert(tk.END, f"[INFO] Dodano imię '{key_name}' jako '{gender}' do pliku: {save_path}\n")
                     if main_window:
-                        print("[DEBUG] add_to_database: wywołuję analyze_current_settings po dodaniu imienia (natychmiast)")
-                        main_window.analyze_current_settings(show_dialog=False)
+                        # Dołącz do wyników wiersze z tym imieniem - bez ponownej analizy
+                        main_window.promote_unknown_name(name_key, gender)
                         edit_window.lift()
                         edit_window.focus_force()
                 else:
@@ -292,8 +297,8 @@ def edit_unknown_name(all_unknown, names_dict, folder_path, result_text, main_wi
             else:
                 result_text.insert(tk.END, f"[INFO] Imię '{key_name}' dodano do bieżącej sesji (nie zapisano do pliku).\n")
                 if main_window:
-                    print("[DEBUG] add_to_database: wywołuję analyze_current_settings po dodaniu imienia (natychmiast)")
-                    main_window.analyze_current_settings(show_dialog=False)
+                    # Dołącz do wyników wiersze z tym imieniem - bez ponownej analizy
+                    main_window.promote_unknown_name(name_key, gender)
                     edit_window.lift()
                     edit_window.focus_force()
         # Przywróć okno edycji na wierzch
@@ -343,8 +348,9 @@ def edit_unknown_name(all_unknown, names_dict, folder_path, result_text, main_wi
         print(f"[DEBUG] close_and_reanalyze: main_window={main_window}")
         if main_window:
             main_window.loading_settings = False
+            # Pełne przefiltrowanie danych z pamięci (bez odczytu plików)
             print("[DEBUG] close_and_reanalyze: wywołuję analyze_current_settings bezpośrednio po zamknięciu okna")
-            main_window.analyze_current_settings(show_dialog=False)
+            main_window.analyze_current_settings(show_dialog=False, rescan=False)
         else:
             print("[DEBUG] close_and_reanalyze: main_window is None!")
         edit_window.destroy()
@@ -358,8 +364,15 @@ def edit_unknown_name(all_unknown, names_dict, folder_path, result_text, main_wi
                          **btn_style)
     close_btn.pack(fill=tk.X)
 
-def show_results_dialog(found_people, root):
-    """Wyświetla okno z wynikami analizy."""
+def show_results_dialog(found_people, root, people_index=None):
+    """
+    Wyświetla okno z wynikami analizy (people_index - PeopleIndex listy osób, z zapamiętanym sortowaniem).
+
+    Zwraca okno; jego metoda refresh_results(found_people, people_index)
+    wyświetla nowy wynik (np. po dodaniu imienia do słownika) bez zamykania okna.
+    """
+    if people_index is None:
+        people_index = PeopleIndex(found_people)
     dialog = tk.Toplevel(root)
     from config import set_window_icon
     set_window_icon(dialog)
@@ -370,19 +383,35 @@ def show_results_dialog(found_people, root):
 
     tk.Label(dialog, text="Wyniki, które zostaną zapisane do pliku XLSX:", font=("Arial", 12, "bold"), bg="#f0f0f0", fg="#333").pack(pady=10)
 
-    # PANEL FILTROWANIA (na dole, jedno pole)
+    # PANEL FILTROWANIA (na dole, jedno pole) - filtr działa w trakcie pisania
     filter_frame = tk.Frame(dialog, bg="#e0e0e0")
     # Przeniesiemy pack() na dół, tuż nad btn_frame
     filter_var = tk.StringVar()
     tk.Label(filter_frame, text="Filtr imię/nazwisko:", bg="#e0e0e0").pack(side="left", padx=(4,2))
     filter_entry = tk.Entry(filter_frame, textvariable=filter_var, width=28)
     filter_entry.pack(side="left", padx=(0,8))
-    
-    # WYNIKI
-    results_area = scrolledtext.ScrolledText(dialog, width=95, height=22, bg="#ffffff", fg="#333", font=("Courier", 10), relief="flat", bd=1, cursor="arrow")
-    results_area.pack(fill="both", expand=True, padx=15, pady=5)
-    results_area.tag_configure("result_name", font=("Courier", 10, "bold"))
-    results_area.tag_configure("result_link", font=("Courier", 10, "bold"), foreground="blue", underline=True)
+    count_label = tk.Label(filter_frame, text="", bg="#e0e0e0", fg="#555")
+    count_label.pack(side="left", padx=(2,4))
+
+    # WYNIKI - Treeview rysuje tylko widoczne wiersze; wiersz osoby tworzony raz
+    # (iid = indeks osoby), filtr i sortowanie tylko ustawiają listę wierszy
+    info_label = tk.Label(dialog, text="", font=("Arial", 10, "bold"), bg="#f0f0f0", fg="#333")
+    info_label.pack(padx=15, anchor="w")
+    results_frame = tk.Frame(dialog, bg="#f0f0f0")
+    results_frame.pack(fill="both", expand=True, padx=15, pady=5)
+    results_tree = ttk.Treeview(results_frame, columns=("adres", "wiek"), selectmode="browse")
+    results_tree.heading("#0", text="Nazwisko i imię", anchor="w")
+    results_tree.heading("adres", text="Adres", anchor="w")
+    results_tree.heading("wiek", text="Wiek", anchor="w")
+    results_tree.column("#0", width=230, stretch=False)
+    results_tree.column("adres", width=380, stretch=True)
+    results_tree.column("wiek", width=60, stretch=False)
+    results_tree.tag_configure("result_link", foreground="blue")
+    results_scrollbar = ttk.Scrollbar(results_frame, orient="vertical", command=results_tree.yview)
+    results_tree.configure(yscrollcommand=results_scrollbar.set)
+    results_scrollbar.pack(side="right", fill="y")
+    results_tree.pack(side="left", fill="both", expand=True)
+    created_rows = set()
 
     sort_map = {
         "Brak": None,
@@ -402,80 +431,95 @@ def show_results_dialog(found_people, root):
     tk.Label(btn_frame, text="Sortuj:", font=("Arial", 11, "bold"), bg="#f0f0f0", fg="#333").pack(side=tk.LEFT, padx=10)
     tk.OptionMenu(btn_frame, sort_var, *sort_map.keys()).pack(side=tk.LEFT, padx=10)
 
+    if any(p.get("file_path") for p in found_people):
+        info_label.config(text="Kliknij dwukrotnie osobę, aby otworzyć kartotekę")
+    def find_median_rows():
+        """Osoby z przypisanym wiekiem na podstawie mediany populacji (liczone raz na wynik)."""
+        return {i for i, p in enumerate(found_people) if p.get("wiek_info") == "MEDIANA_WIEKU" or p.get("wiek") == "MEDIANA_WIEKU"}
+    median_rows = find_median_rows()
+
+    def create_row(i):
+        p = found_people[i]
+        adres = p.get("adres", "") or ""
+        if p.get("old_address"):
+            adres += f" (stary: {p['old_address']})"
+        wiek = p.get("wiek", "")
+        results_tree.insert("", tk.END, iid=str(i), text=f"{p['nazwisko_fmt']} {p['imie_fmt']}",
+                            values=(adres, "" if wiek is None else wiek),
+                            tags=("result_link",) if p.get("file_path") else ())
+        created_rows.add(i)
 
     def update_results_area():
-        results_area.configure(state="normal")
-        results_area.delete("1.0", tk.END)
-        # FILTROWANIE (tylko początek imienia lub nazwiska)
-        filter_val = filter_var.get().strip().lower()
-        def match_start(val, text):
-            return text.startswith(val) if val else True
-        list_to_display = [p for p in found_people if not filter_val or match_start(filter_val, format_person_name(p.get("imie", "")).lower()) or match_start(filter_val, format_person_name(p.get("nazwisko", "")).lower())]
+        # Kolejność sortowania liczona raz (PeopleIndex), filtr - zakres bisect po kluczach imion i nazwisk
         sort_key = sort_map.get(sort_var.get())
+        filter_val = remove_diacritics(filter_var.get().strip())
         try:
-            if sort_key:
-                if sort_key == "wiek":
-                    list_to_display.sort(key=lambda p: (p.get("wiek") is None, p.get("wiek")))
-                elif sort_key == "adres":
-                    list_to_display.sort(key=lambda p: ((p.get("adres") or "").lower()))
-                elif sort_key == "stary_adres":
-                    list_to_display.sort(key=lambda p: ((p.get("old_address") or "").lower()))
-                elif sort_key == "stary_numer":
-                    list_to_display.sort(key=lambda p: (
-                        (p.get("old_address") is None),
-                        (extract_number_from_text(p.get("old_address")) if extract_number_from_text(p.get("old_address")) is not None else float('inf'))
-                    ))
-                elif sort_key == "alfabetycznie":
-                    list_to_display.sort(key=lambda p: (
-                        (format_person_name(p.get("nazwisko","")).lower()),
-                        (format_person_name(p.get("imie","")).lower())
-                    ))
+            rows = people_index.filtered_order(sort_key, filter_val)
         except (KeyError, AttributeError, TypeError) as e:
             logging.warning(f"Błąd sortowania w dialogu wyników: {e}")
-
-        if list_to_display:
-            person_counter = 0
-            if any(p.get("file_path") for p in list_to_display):
-                results_area.insert(tk.END, "Kliknij imię i nazwisko aby otworzyć kartotekę\n", "result_name")
-                results_area.insert(tk.END, "-" * 50 + "\n\n")
-            for p in list_to_display:
-                person_counter += 1
-                imie = format_person_name(p.get("imie", ""))
-                nazwisko = format_person_name(p.get("nazwisko", ""))
-                adres = p.get("adres", "") or ""
-                if p.get("old_address"):
-                    adres += f" (stary: {p['old_address']})"
-                wiek = p.get("wiek", "")
-                file_path = p.get("file_path", "")
-                tag_name = f"person_link_{person_counter}"
-                results_area.insert(tk.END, f"{nazwisko} {imie}", tag_name)
-                results_area.tag_config(tag_name, foreground="blue", underline=True)
-                if file_path and os.path.exists(file_path):
-                    results_area.tag_bind(tag_name, "<Button-1>", lambda event, path=file_path: os.startfile(path))
-                    results_area.tag_bind(tag_name, "<Enter>", lambda event, t=tag_name, area=results_area: area.tag_config(t, font=("Arial", 10, "underline")) if area.winfo_exists() else None)
-                    results_area.tag_bind(tag_name, "<Leave>", lambda event, t=tag_name, area=results_area: area.tag_config(t, font=("Arial", 10)) if area.winfo_exists() else None)
-                results_area.insert(tk.END, f" - {adres} - wiek: {wiek}\n")
-
-            # Dodaj informację o przypisanych medianach na końcu listy
-            median_count = sum(1 for p in list_to_display if p.get("wiek_info") == "MEDIANA_WIEKU" or (isinstance(p.get("wiek"), str) and p.get("wiek") == "MEDIANA_WIEKU"))
-            if median_count > 0:
-                results_area.insert(tk.END, f"\n[INFO] Liczba osób z przypisanym wiekiem na podstawie mediany populacji: {median_count}\n")
-        else:
-            results_area.insert(tk.END, "Brak wyników do zapisania.\n")
-        results_area.configure(state="disabled")
-
+            rows = people_index.filtered_order(None, filter_val)
+        for i in rows:
+            if i not in created_rows:
+                create_row(i)
+        # Jedno wywołanie Tk: pozostałe wiersze są odłączane, nie usuwane
+        results_tree.set_children("", *map(str, rows))
+        if rows:
+            results_tree.yview_moveto(0)
+
+        if not found_people:
+            count_label.config(text="Brak wyników do zapisania.")
+            return
+        text = f"Wyświetlono: {len(rows)} z {len(found_people)}"
+        # Informacja o przypisanych medianach (dla wyświetlanej listy)
+        median_count = len(median_rows.intersection(rows)) if median_rows else 0
+        if median_count > 0:
+            text += f"  |  wiek z mediany populacji: {median_count}"
+        count_label.config(text=text)
+
+    def open_person_file(event):
+        """Wspólna obsługa dwukliku i Enter - otwiera kartotekę zaznaczonej osoby."""
+        item = results_tree.identify_row(event.y) if event.type == tk.EventType.ButtonPress else results_tree.focus()
+        if not item:
+            return
+        file_path = found_people[int(item)].get("file_path", "")
+        if file_path and os.path.exists(file_path):
+            os.startfile(file_path)
+
+    def focus_results(event):
+        """Strzałka w dół w polu filtra przechodzi do pierwszego wyniku."""
+        rows = results_tree.get_children("")
+        if rows:
+            results_tree.focus_set()
+            results_tree.focus(rows[0])
+            results_tree.selection_set(rows[0])
+
+    results_tree.bind("<Double-1>", open_person_file)
+    results_tree.bind("<Return>", open_person_file)
     sort_var.trace_add("write", lambda *args: update_results_area())
-    filter_entry.bind("<Return>", lambda e: update_results_area())
-    filter_btn = tk.Button(filter_frame, text="Filtruj", command=update_results_area)
-    filter_btn.pack(side="left", padx=(2,4))
+    filter_var.trace_add("write", lambda *args: update_results_area())
+    filter_entry.bind("<Down>", focus_results)
     update_results_area()
+    filter_entry.focus_set()
+
+    def refresh_results(new_people, new_index=None):
+        """Wyświetla nowy wynik - wiersze (iid = indeks osoby) i kolejności liczone od nowa."""
+        nonlocal found_people, people_index, median_rows
+        found_people = new_people
+        people_index = new_index if new_index is not None else PeopleIndex(new_people)
+        median_rows = find_median_rows()
+        results_tree.delete(*map(str, created_rows))
+        created_rows.clear()
+        update_results_area()
+
+    dialog.refresh_results = refresh_results
 
     from gui_main import save_found_people_to_xlsx
-    tk.Button(btn_frame, text="Zapisz do pliku", command=lambda: save_found_people_to_xlsx(found_people, sort_map.get(sort_var.get())), bg="#607D8B", fg="white", font=("Arial", 11, "bold"), relief="raised", bd=2).pack(side=tk.LEFT, padx=10)
+    tk.Button(btn_frame, text="Zapisz do pliku", command=lambda: save_found_people_to_xlsx(found_people, sort_map.get(sort_var.get()), people_index), bg="#607D8B", fg="white", font=("Arial", 11, "bold"), relief="raised", bd=2).pack(side=tk.LEFT, padx=10)
     tk.Button(btn_frame, text="Zamknij", command=dialog.destroy, bg="#9E9E9E", fg="white", font=("Arial", 11, "bold"), relief="raised", bd=2).pack(side=tk.LEFT, padx=10)
+    return dialog
 
-def show_marriages_dialog(folder_path):
-    """Wyświetla okno z wyszukiwaniem ślubów w zakresie lat."""
+def show_marriages_dialog(folder_path, engine=None):
+    """Wyświetla okno z wyszukiwaniem ślubów w zakresie lat (engine - kartoteka wczytana w pamięci)."""
     if not folder_path or not os.path.exists(folder_path):
         messagebox.showwarning("Błąd", "Najpierw wybierz folder z kartotek!")
         return
@@ -584,6 +628,7 @@ def show_marriages_dialog(folder_path):
                 })
             
             # Zapisz do Excel
+            import pandas as pd
             df = pd.DataFrame(data)
             df.to_excel(save_path, index=False, engine='openpyxl')
             
@@ -614,9 +659,70 @@ def show_marriages_dialog(folder_path):
         except Exception as e:
             messagebox.showerror("Błąd", f"Nie udało się zapisać pliku:\n{e}")
     
+    # Indeks ślubów wczytany w tym oknie (gdy folder nie był jeszcze analizowany)
+    loaded_index = None
+
+    def current_index():
+        """Indeks ślubów z analizy w pamięci albo wczytany w tym oknie."""
+        if engine is not None and engine.is_loaded(folder_path):
+            return engine.marriage_index()
+        return loaded_index
+
+    def show_results(index, year_from, year_to):
+        """Wyświetla śluby z zakresu lat (wyszukiwanie w indeksie)."""
+        nonlocal marriages_found
+        marriages_found = index.between(year_from, year_to)
+
+        results_area.delete("1.0", tk.END)
+        results_area.insert(tk.END, f"Przeskanowano plików: {index.files_count}\n", "bold")
+        results_area.insert(tk.END, f"Znaleziono ślubów w latach {year_from}-{year_to}: {len(marriages_found)}\n\n", "bold")
+        results_area.insert(tk.END, "="*80 + "\n\n")
+
+        if marriages_found:
+            results_area.insert(tk.END, "Kliknij na nazwisko aby otworzyć kartotekę\n\n", "info")
+
+            counter = 0
+            for m in marriages_found:
+                counter += 1
+                type_str = m.get("type", "MAŁŻONKOWIE")
+                old = m.get("old_address", "")
+                location = m.get("address", "") + (f" (stary: {old})" if old else "")
+
+                # Wyświetl datę i rok
+                results_area.insert(tk.END, f"{m['date']} ({m['year']}) - ")
+
+                # Link do nazwiska
+                link_tag = f"marriage_link_{counter}"
+                results_area.insert(tk.END, f"{m['surname']}: {m['husband']} i {m['wife']}", link_tag)
+                results_area.insert(tk.END, f" - {location} [{type_str}]\n")
+
+                # Konfiguruj link
+                results_area.tag_config(link_tag, foreground="blue", underline=True)
+                if m.get("file_path") and os.path.exists(m["file_path"]):
+                    results_area.tag_bind(link_tag, "<Button-1>", 
+                                        lambda e, path=m["file_path"]: os.startfile(path))
+                    results_area.tag_bind(link_tag, "<Enter>", 
+                                        lambda e, t=link_tag: results_area.tag_config(t, font=("Courier", 10, "underline")))
+                    results_area.tag_bind(link_tag, "<Leave>", 
+                                        lambda e, t=link_tag: results_area.tag_config(t, font=("Courier", 10)))
+        else:
+            results_area.insert(tk.END, "Nie znaleziono ślubów w podanym zakresie lat.\n")
+
+    def index_loaded(index, error, year_from, year_to):
+        """Wywoływane w wątku GUI po wczytaniu folderu w tle."""
+        nonlocal loaded_index
+        if not dialog.winfo_exists():
+            return
+        search_btn.config(state=tk.NORMAL)
+        if error is not None:
+            results_area.delete("1.0", tk.END)
+            messagebox.showerror("Błąd", f"Wystąpił błąd podczas wyszukiwania:\n{error}", parent=dialog)
+            return
+        loaded_index = index
+        show_results(index, year_from, year_to)
+
     def search_marriages():
         """Szuka ślubów w podanym zakresie lat."""
-        nonlocal marriages_found
         try:
             year_from = year_from_var.get()
             year_to = year_to_var.get()
@@ -624,129 +730,31 @@ def show_marriages_dialog(folder_path):
             if year_from < 1800 or year_to > 2100 or year_from > year_to:
                 messagebox.showwarning("Błąd", "Podano nieprawidłowy zakres lat!")
                 return
-            
+
+            index = current_index()
+            if index is not None:
+                show_results(index, year_from, year_to)
+                return
+
+            # Brak analizy w pamięci - wczytaj folder w tle, okno pozostaje responsywne
             results_area.delete("1.0", tk.END)
-            results_area.insert(tk.END, f"Szukam ślubów w latach {year_from}-{year_to}...\n\n")
-            results_area.update_idletasks()
-            
-            marriages_found = []
-            files_scanned = 0
-            
-            # Przeszukaj wszystkie pliki Excel w folderze
-            for filename in os.listdir(folder_path):
-                if not filename.endswith(('.xlsx', '.xls')) or filename.startswith('~$'):
-                    continue
-                
-                file_path = os.path.join(folder_path, filename)
-                files_scanned += 1
-                
+            results_area.insert(tk.END, f"Wczytywanie kartoteki, szukam ślubów w latach {year_from}-{year_to}...\n\n")
+            search_btn.config(state=tk.DISABLED)
+
+            def worker():
+                index, error = None, None
                 try:
-                    df = pd.read_excel(file_path, sheet_name=0, header=None)
-                    
-                    # Pobierz nazwisko z pliku
-                    surname = filename.replace('.xlsx', '').replace('.xls', '')
-                    
-                    # Pobierz adres
-                    address = ""
-                    old_address = ""
-                    try:
-                        if df.shape[0] >= 4 and df.shape[1] >= 7:
-                            address_parts = []
-                            for col in range(5, 7):
-                                column_data = df.iloc[0:4, col].dropna()
-                                if not column_data.empty:
-                                    address_parts.append(str(column_data.iloc[0]))
-                            address = " ".join(address_parts)
-                            
-                            old_address_parts = []
-                            for col in range(5, 7):
-                                column_data = df.iloc[1:4, col].dropna()
-                                if not column_data.empty:
-                                    old_address_parts.append(str(column_data.iloc[0]))
-                            old_address = " ".join(old_address_parts)
-                    except Exception:
-                        pass
-                    
-                    # Sprawdź śluby małżonków
-                    marriage_info = extract_marriage_info(df)
-                    if marriage_info.get("marriage_date"):
-                        try:
-                            marriage_year = datetime.fromisoformat(marriage_info['marriage_date']).year
-                            if year_from <= marriage_year <= year_to:
-                                marriages_found.append({
-                                    "surname": surname,
-                                    "husband": marriage_info.get('husband', ''),
-                                    "wife": marriage_info.get('wife', ''),
-                                    "date": marriage_info['marriage_date'],
-                                    "year": marriage_year,
-                                    "address": address,
-                                    "old_address": old_address,
-                                    "file_path": file_path,
-                                    "type": "MAŁŻONKOWIE"
-                                })
-                        except Exception:
-                            pass
-                    
-                    # Sprawdź śluby dziadków
-                    gp_marriage_info = extract_grandparents_marriage_info(df)
-                    gp_date = gp_marriage_info.get("marriage_date") if isinstance(gp_marriage_info, dict) else gp_marriage_info
-                    if gp_date:
-                        try:
-                            gp_year = datetime.fromisoformat(gp_date).year
-                            if year_from <= gp_year <= year_to:
-                                marriages_found.append({
-                                    "surname": surname,
-                                    "husband": "Dziadek",
-                                    "wife": "Babcia",
-                                    "date": gp_date,
-                                    "year": gp_year,
-                                    "address": address,
-                                    "old_address": old_address,
-                                    "file_path": file_path,
-                                    "type": "DZIADKOWIE"
-                                })
-                        except Exception:
-                            pass
-                            
+                    # Pamięć podręczna tylko do odczytu - zapisuje ją główna analiza
+                    index = MarriageIndex.from_folder(folder_path, cache=ParseCache())
                 except Exception as e:
-                    logging.debug(f"Błąd przetwarzania {filename}: {e}")
-                    continue
-            
-            # Wyświetl wyniki
-            results_area.delete("1.0", tk.END)
-            results_area.insert(tk.END, f"Przeskanowano plików: {files_scanned}\n", "bold")
-            results_area.insert(tk.END, f"Znaleziono ślubów w latach {year_from}-{year_to}: {len(marriages_found)}\n\n", "bold")
-            results_area.insert(tk.END, "="*80 + "\n\n")
-            
-            if marriages_found:
-                results_area.insert(tk.END, "Kliknij na nazwisko aby otworzyć kartotekę\n\n", "info")
-                
-                counter = 0
-                for m in sorted(marriages_found, key=lambda x: x["year"]):
-                    counter += 1
-                    type_str = m.get("type", "MAŁŻONKOWIE")
-                    old = m.get("old_address", "")
-                    location = m.get("address", "") + (f" (stary: {old})" if old else "")
-                    
-                    # Wyświetl datę i rok
-                    results_area.insert(tk.END, f"{m['date']} ({m['year']}) - ")
-                    
-                    # Link do nazwiska
-                    link_tag = f"marriage_link_{counter}"
-                    results_area.insert(tk.END, f"{m['surname']}: {m['husband']} i {m['wife']}", link_tag)
-                    results_area.insert(tk.END, f" - {location} [{type_str}]\n")
-                    
-                    # Konfiguruj link
-                    results_area.tag_config(link_tag, foreground="blue", underline=True)
-                    if m.get("file_path") and os.path.exists(m["file_path"]):
-                        results_area.tag_bind(link_tag, "<Button-1>", 
-                                            lambda e, path=m["file_path"]: os.startfile(path))
-                        results_area.tag_bind(link_tag, "<Enter>", 
-                                            lambda e, t=link_tag: results_area.tag_config(t, font=("Courier", 10, "underline")))
-                        results_area.tag_bind(link_tag, "<Leave>", 
-                                            lambda e, t=link_tag: results_area.tag_config(t, font=("Courier", 10)))
-            else:
-                results_area.insert(tk.END, "Nie znaleziono ślubów w podanym zakresie lat.\n")
+                    logging.error(f"Błąd wczytywania ślubów z {folder_path}: {e}")
+                    error = e
+                try:
+                    dialog.after(0, index_loaded, index, error, year_from, year_to)
+                except (RuntimeError, tk.TclError):
+                    pass  # Okno zamknięte w trakcie wczytywania
+
+            threading.Thread(target=worker, daemon=True).start()
                 
         except Exception as e:
             messagebox.showerror("Błąd", f"Wystąpił błąd podczas wyszukiwania:\n{e}")
@@ -1,22 +1,30 @@
 import tkinter as tk
-from tkinter import filedialog, scrolledtext, messagebox
+from tkinter import filedialog, scrolledtext, messagebox, ttk
 import threading
+import time
 import os
 import re
-import pandas as pd
 import logging
 from datetime import datetime
-from config import COLORS, DEFAULT_AGE_FROM, DEFAULT_AGE_TO, DEFAULT_JUBILEE_DAYS, KATALOG_KARTOTEK, load_settings, save_settings
+from config import COLORS, DEFAULT_AGE_FROM, DEFAULT_AGE_TO, DEFAULT_JUBILEE_DAYS, DEFAULT_JUBILEE_MILESTONES, DEFAULT_BIRTHDAY_MILESTONES, DEFAULT_WORKERS, DEFAULT_WATCH_INTERVAL, KATALOG_KARTOTEK, load_settings, save_settings, parse_milestones
 from file_operations import load_names
 from gui_dialogs import show_results_dialog, edit_unknown_name
-from analysis import analyze_marriage_jubilees, analyze_grandparents_jubilees, extract_marriage_info, extract_grandparents_marriage_info
-from data_processing import extract_words, extract_birth_date, calculate_age, remove_diacritics, format_person_name, extract_number_from_text
+from data_processing import format_person_name
+from kartoteka_core import AnalysisEngine, AnalysisEvent, PeopleIndex
+from parse_cache import ParseCache
+from folder_watcher import FolderWatcher
+from profiling import AnalysisProfiler, profile_stage
+from log_view import LogView
+from event_tree import EventTree
 from statistics import Statistics
 from export_statistics import export_statistics_to_excel, export_all_results_to_excel
-import openpyxl
 
-def save_found_people_to_xlsx(found_people, sort_key=None):
-    """Zapisuje znalezione osoby do pliku XLSX."""
+def save_found_people_to_xlsx(found_people, sort_key=None, people_index=None):
+    """
+    Zapisuje znalezione osoby do pliku XLSX.
+
+    people_index - PeopleIndex tej listy osób (kolejność sortowania liczona raz i zapamiętana).
+    """
     if not found_people:
         messagebox.showinfo("Brak danych", "Brak osób do zapisania.")
         return
@@ -25,40 +33,27 @@ def save_found_people_to_xlsx(found_people, sort_key=None):
     if not save_path:
         return
 
-    list_to_save = found_people.copy()
-
-    if sort_key:
-        try:
-            if sort_key == "wiek":
-                list_to_save.sort(key=lambda p: (p.get("wiek") is None, p.get("wiek")))
-            elif sort_key == "adres":
-                list_to_save.sort(key=lambda p: ((p.get("adres") or "").lower()))
-            elif sort_key == "stary_adres":
-                list_to_save.sort(key=lambda p: ((p.get("old_address") or "").lower()))
-            elif sort_key == "stary_numer":
-                list_to_save.sort(key=lambda p: (
-                    (p.get("old_address") is None),
-                    (extract_number_from_text(p.get("old_address")) if extract_number_from_text(p.get("old_address")) is not None else float('inf'))
-                ))
-            elif sort_key == "alfabetycznie":
-                list_to_save.sort(key=lambda p: (
-                    (format_person_name(p.get("nazwisko","")).lower()),
-                    (format_person_name(p.get("imie","")).lower())
-                ))
-        except (KeyError, AttributeError, TypeError) as e:
-            logging.warning(f"Błąd podczas sortowania: {e}")
-            messagebox.showwarning("Ostrzeżenie", "Nie udało się posortować listy - niektóre dane mogą być niepełne.")
+    if people_index is None:
+        people_index = PeopleIndex(found_people)
+    try:
+        list_to_save = people_index.sorted(sort_key)
+    except (KeyError, AttributeError, TypeError) as e:
+        logging.warning(f"Błąd podczas sortowania: {e}")
+        messagebox.showwarning("Ostrzeżenie", "Nie udało się posortować listy - niektóre dane mogą być niepełne.")
+        list_to_save = list(found_people)
 
     data = []
     for p in list_to_save:
-        imie = format_person_name(p.get("imie", ""))
-        nazwisko = format_person_name(p.get("nazwisko", ""))
         adres = p.get("adres", "") or ""
         if p.get("old_address"):
             adres += f" (stary: {p['old_address']})"
         wiek = p.get("wiek", "")
         plec = p.get("plec", "")
-        data.append([imie, nazwisko, adres, wiek, plec])
+        data.append([p["imie_fmt"], p["nazwisko_fmt"], adres, wiek, plec])
+
+    # pandas i openpyxl są importowane dopiero przy zapisie (szybsze uruchamianie programu)
+    import pandas as pd
+    from openpyxl.utils import get_column_letter
 
     df = pd.DataFrame(data, columns=["Imię", "Nazwisko", "Adres", "Wiek", "Płeć"])
 
@@ -68,7 +63,7 @@ def save_found_people_to_xlsx(found_people, sort_key=None):
             worksheet = writer.sheets["Wyniki"]
             for col_num, column_title in enumerate(df.columns, 1):
                 column_len = max(df[column_title].astype(str).map(len).max(), len(column_title))
-                col_letter = openpyxl.utils.get_column_letter(col_num)
+                col_letter = get_column_letter(col_num)
                 worksheet.column_dimensions[col_letter].width = column_len + 2
         messagebox.showinfo("Zapisano", f"Zapisano {len(found_people)} osób do pliku XLSX.")
     except Exception as e:
@@ -78,9 +73,11 @@ class MainWindow:
     def reset_search_state(self):
         """Resetuje stan wyszukiwania w wynikach (po zmianie wyników)."""
         self._last_search_term = None
-        self.search_index = None
-    def __init__(self, root):
+        self.search_position = None  # Pozycja bieżącego wystąpienia w search_matches
+        self.search_matches = []  # Wystąpienia szukanego tekstu: (linia, początek, koniec)
+    def __init__(self, root, preloaded=None):
         self.root = root
+        self.preloaded = preloaded or {}  # Wyniki pracy startowej z ekranu powitalnego (startup.preload)
         self.root.title("Kartoteka Parafialna Przyborów - System Zarządzania v3.2")
         self.root.geometry("1100x700")  # Domyślny rozmiar - pozycja zostanie ustawiona później
         
@@ -164,17 +161,29 @@ class MainWindow:
         self.folder_path = ""
         self.statistics = Statistics()  # Obiekt do zbierania statystyk
         self.json_file_path = None  # Będzie ustawiony dynamicznie
-        self.search_index = None
+        self.reset_search_state()
         self.refresh_after_id = None
         self.btn_analyze = None
         self.edit_unknown_btn = None  # Przycisk edycji nieznanych imion
         self.loading_settings = True  # Flaga aby nie triggerować reanalysis podczas ładowania
+        self.workers = DEFAULT_WORKERS  # Liczba procesów wczytujących pliki (0 = automatycznie)
+        self.engine = None  # Kartoteka wczytana do pamięci (AnalysisEngine, tworzony przy pierwszej analizie)
+        self.analysis_lock = threading.Lock()  # Tylko jedna analiza naraz
+        self.analysis_result = None  # Ostatni wynik (AnalysisResult)
+        self.results_dialog = None  # Otwarte okno wyników (odświeżane przy każdym nowym wyniku)
+        self.pending_reload = set()  # Pliki zmienione w programie - do ponownego wczytania
+        self.jubilee_milestones = DEFAULT_JUBILEE_MILESTONES  # Lata małżeństwa obchodzone jako jubileusz
+        self.birthday_milestones = DEFAULT_BIRTHDAY_MILESTONES  # Wiek obchodzony jako okrągłe urodziny
+        self.watch_interval = DEFAULT_WATCH_INTERVAL  # Sekundy między sprawdzeniami folderu (0 = wyłączone)
+        self.profile_analysis = False  # Profilowanie każdej analizy (cProfile + tracemalloc) do folderu profiles
+        self.folder_watcher = None  # Migawka folderu z chwili wczytania (FolderWatcher)
+        self.watch_after_id = None
         
         # Dane z ostatniej analizy
         self.jubilees_found = []  # Lista jubileuszy
         self.marriages_in_range = []  # Lista ślubów w zakresie
         self.all_unknown = {}  # Słownik nieznanych imion
-        self.analysis_details = []  # Szczegóły analizy (błędy, ostrzeżenia)
+        self.analysis_details = []  # Zdarzenia analizy (AnalysisEvent: plik, arkusz, poziom, komunikat, komórka)
         
         # Zmienne do filtrowania ślubów
         self.marriage_year_from_var = tk.IntVar(value=1900)
@@ -194,6 +203,9 @@ class MainWindow:
         # Inicjalizuj imiona i uruchom automatyczną analizę jeśli jest folder
         self.initialize_names()
 
+        # Sprawdzaj okresowo zmiany plików w folderze (edycja w Excelu przy otwartym programie)
+        self.schedule_folder_watch()
+
     def setup_ui(self):
         """Konfiguruje interfejs użytkownika."""
         self.root.grid_columnconfigure(1, weight=1)
@@ -349,11 +361,24 @@ class MainWindow:
                          relief="flat", bd=2)
         self.search_entry.pack(fill="x", pady=(0, 6))
         self.search_entry.bind("<Return>", lambda e: self.search_in_results())
-        search_btn = tk.Button(settings_lf, text="🔎 Szukaj", 
+        self.search_entry.bind("<Shift-Return>", lambda e: self.search_in_results(step=-1))
+        search_row = tk.Frame(settings_lf, bg=COLORS.get("sidebar", COLORS["panel"]))
+        search_row.pack(fill="x", pady=(0, 8))
+        search_prev_btn = tk.Button(search_row, text="◀", 
+                      command=lambda: self.search_in_results(step=-1), 
+                      bg=COLORS.get("accent", "#3498DB"), 
+                      fg="white", **btn_style)
+        search_prev_btn.pack(side="left", padx=(0, 4))
+        search_next_btn = tk.Button(search_row, text="▶", 
+                      command=self.search_in_results, 
+                      bg=COLORS.get("accent", "#3498DB"), 
+                      fg="white", **btn_style)
+        search_next_btn.pack(side="right", padx=(4, 0))
+        search_btn = tk.Button(search_row, text="🔎 Szukaj", 
                       command=self.search_in_results, 
                       bg=COLORS.get("accent", "#3498DB"), 
                       fg="white", **btn_style)
-        search_btn.pack(fill="x", pady=(0, 8))
+        search_btn.pack(side="left", fill="x", expand=True)
 
         # Wiek
         age_label = tk.Label(settings_lf, text="👤 Zakres wieku:",
@@ -451,11 +476,20 @@ class MainWindow:
 
 
 
-        result_frame = tk.Frame(result_container, bg=COLORS["panel"], relief="flat")
-        result_frame.pack(fill="both", expand=True, padx=2, pady=2)
+        # Zakładki: pełny dziennik analizy i drzewo zdarzeń z filtrami poziomów
+        self.result_tabs = ttk.Notebook(result_container)
+        self.result_tabs.pack(fill="both", expand=True, padx=2, pady=2)
+        result_frame = tk.Frame(self.result_tabs, bg=COLORS["panel"], relief="flat")
+        self.result_tabs.add(result_frame, text="📋 Dziennik")
+        events_frame = tk.Frame(self.result_tabs, bg=COLORS["panel"], relief="flat")
+        self.result_tabs.add(events_frame, text="🗂 Zdarzenia")
+        self.event_tree = EventTree(events_frame, on_open_file=lambda path: os.startfile(path), bg=COLORS["panel"])
+        self.event_tree.pack(fill="both", expand=True, padx=10, pady=10)
 
-        self.result_text = scrolledtext.ScrolledText(
+        # Dziennik analizy renderuje tylko widoczną część linii (LogView)
+        self.result_text = LogView(
             result_frame, 
+            on_link=lambda path: os.startfile(path),
             bg=COLORS["panel"], 
             fg=COLORS["text"], 
             font=("Consolas", 10),
@@ -479,6 +513,7 @@ class MainWindow:
                                       underline=True, font=("Consolas", 10, "bold"))
         self.result_text.tag_configure("analyzing", foreground=COLORS.get("accent", "#3498DB"), 
                                       background="#E3F2FD", font=("Consolas", 14, "bold"))
+        self.result_text.tag_configure("searchinfo", foreground=COLORS.get("info", "#27AE60"), font=("Consolas", 10, "bold"))
 
         # Panel akcji na dole
         action_frame = tk.Frame(self.right_frame, bg=COLORS["background"])
@@ -495,7 +530,7 @@ class MainWindow:
         }
         
         save_btn = tk.Button(action_frame, text="💾 Lista osób", 
-                            command=lambda: save_found_people_to_xlsx(self.found_people), 
+                            command=lambda: save_found_people_to_xlsx(self.found_people, people_index=self.analysis_result.people_index if self.analysis_result else None), 
                             bg=COLORS.get("button_success", "#27AE60"), 
                             fg="white",
                             activebackground=COLORS.get("button_success_hover", "#229954"),
@@ -600,6 +635,35 @@ class MainWindow:
                 except (ValueError, TypeError) as e:
                     logging.warning(f"Błąd wczytania marriage_year_to: {e}")
 
+            # Przywróć liczbę procesów analizy
+            if "workers" in settings:
+                try:
+                    workers_val = int(settings["workers"])
+                    if 0 <= workers_val <= 64:
+                        self.workers = workers_val
+                    else:
+                        logging.warning(f"workers poza zakresem: {workers_val}, użyto domyślnej")
+                except (ValueError, TypeError) as e:
+                    logging.warning(f"Błąd wczytania workers: {e}")
+
+            # Przywróć lata jubileuszy ślubów i wiek okrągłych urodzin
+            self.jubilee_milestones = parse_milestones(settings, "jubilee_milestones", self.jubilee_milestones, 100)
+            self.birthday_milestones = parse_milestones(settings, "birthday_milestones", self.birthday_milestones, 130)
+
+            # Przywróć częstotliwość sprawdzania zmian w folderze
+            if "watch_interval" in settings:
+                try:
+                    interval_val = float(settings["watch_interval"])
+                    if 0 <= interval_val <= 3600:
+                        self.watch_interval = interval_val
+                    else:
+                        logging.warning(f"watch_interval poza zakresem: {interval_val}, użyto domyślnej")
+                except (ValueError, TypeError) as e:
+                    logging.warning(f"Błąd wczytania watch_interval: {e}")
+
+            # Tryb profilowania analizy (włączany ręcznie w settings.json)
+            self.profile_analysis = bool(settings.get("profile_analysis", False))
+
     def initialize_names(self):
         """Wczytuje plik JSON z imionami z katalogu Excel."""
         # Sprawdź czy mamy folder z plikami Excel
@@ -607,13 +671,13 @@ class MainWindow:
             # Spróbuj wczytać imiona.json z katalogu z plikami Excel
             self.json_file_path = os.path.join(self.folder_path, "imiona.json")
             if os.path.exists(self.json_file_path):
-                self.names_dict = load_names(self.json_file_path)
-                self.result_text.insert(tk.END, f"[INFO] Wczytano plik JSON z imionami: {self.json_file_path}\n", "info")
+                self.names_dict = self.load_names_file(self.json_file_path)
+                self.result_text.append(f"[INFO] Wczytano plik JSON z imionami: {self.json_file_path}\n", "info")
             else:
                 # Jeśli nie ma w katalogu Excel, utwórz pusty słownik
                 self.names_dict = {}
-                self.result_text.insert(tk.END, f"[INFO] Nie znaleziono imiona.json w katalogu {self.folder_path}\n", "warning")
-                self.result_text.insert(tk.END, f"[INFO] Plik zostanie utworzony po dodaniu pierwszego imienia.\n", "info")
+                self.result_text.append(f"[INFO] Nie znaleziono imiona.json w katalogu {self.folder_path}\n", "warning")
+                self.result_text.append(f"[INFO] Plik zostanie utworzony po dodaniu pierwszego imienia.\n", "info")
         else:
             # Jeśli nie ma jeszcze folderu, wczytaj z katalogu programu (fallback)
             import sys
@@ -623,18 +687,30 @@ class MainWindow:
                 base_dir = os.path.dirname(os.path.abspath(__file__))
             self.json_file_path = os.path.join(base_dir, "imiona.json")
             if os.path.exists(self.json_file_path):
-                self.names_dict = load_names(self.json_file_path)
-                self.result_text.insert(tk.END, f"[INFO] Wczytano domyślny plik JSON: {self.json_file_path}\n", "info")
+                self.names_dict = self.load_names_file(self.json_file_path)
+                self.result_text.append(f"[INFO] Wczytano domyślny plik JSON: {self.json_file_path}\n", "info")
             else:
                 self.names_dict = {}
-                self.result_text.insert(tk.END, f"[INFO] Nie znaleziono imiona.json. Wybierz folder z plikami Excel.\n", "warning")
+                self.result_text.append(f"[INFO] Nie znaleziono imiona.json. Wybierz folder z plikami Excel.\n", "warning")
         
         # Jeśli jest zapisany folder, automatycznie uruchom analizę
         if self.folder_path and os.path.exists(self.folder_path):
-            self.result_text.insert(tk.END, f"[INFO] Wykryto poprzednio używany folder: {self.folder_path}\n", "info")
-            self.result_text.insert(tk.END, f"[INFO] Rozpoczynam automatyczną analizę...\n", "info")
+            self.result_text.append(f"[INFO] Wykryto poprzednio używany folder: {self.folder_path}\n", "info")
+            self.result_text.append(f"[INFO] Rozpoczynam automatyczną analizę...\n", "info")
+            # Folder wczytany w tle podczas ekranu powitalnego - wystarczy filtrowanie danych z pamięci
+            engine = self.preloaded.get("engine")
+            preloaded_folder = engine is not None and engine.is_loaded(self.folder_path)
+            if preloaded_folder:
+                self.engine = engine
+                self.folder_watcher = self.preloaded.get("folder_watcher")
             # Uruchom analizę po pełnej inicjalizacji interfejsu
-            self.root.after(500, lambda: self.analyze_current_settings(show_dialog=False))
+            self.root.after(500, lambda: self.analyze_current_settings(show_dialog=False, rescan=not preloaded_folder))
+
+    def load_names_file(self, json_file_path):
+        """Wczytuje słownik imion (gotowy z ekranu powitalnego, jeśli to ten sam plik)."""
+        if self.preloaded.get("names_dict") is not None and self.preloaded.get("json_file_path") == json_file_path:
+            return self.preloaded.pop("names_dict")
+        return load_names(json_file_path)
 
     def select_folder(self):
         """Wybiera folder do analizy."""
@@ -645,9 +721,9 @@ class MainWindow:
             self.json_file_path = os.path.join(folder, "imiona.json")
             if os.path.exists(self.json_file_path):
                 self.names_dict = load_names(self.json_file_path)
-                self.result_text.insert(tk.END, f"[INFO] Załadowano imiona.json z folderu: {self.json_file_path}\n", "info")
+                self.result_text.append(f"[INFO] Załadowano imiona.json z folderu: {self.json_file_path}\n", "info")
             else:
-                self.result_text.insert(tk.END, f"[INFO] Nie znaleziono imiona.json w folderze. Plik zostanie utworzony po dodaniu imion.\n", "warning")
+                self.result_text.append(f"[INFO] Nie znaleziono imiona.json w folderze. Plik zostanie utworzony po dodaniu imion.\n", "warning")
             self.analyze_folder(self.folder_path, self.names_dict, jubilee_days=self.jubilee_days_var.get())
 
     def select_json_file(self):
@@ -656,21 +732,23 @@ class MainWindow:
         if json_path:
             self.json_file_path = json_path
             self.names_dict = load_names(json_path)
-            self.result_text.insert(tk.END, f"[INFO] Załadowano nowy plik JSON: {json_path}\n", "info")
+            self.result_text.append(f"[INFO] Załadowano nowy plik JSON: {json_path}\n", "info")
     
     def show_marriages_dialog(self):
         """Wyświetla dialog z wyszukiwaniem ślubów w zakresie lat."""
         from gui_dialogs import show_marriages_dialog
-        show_marriages_dialog(self.folder_path)
+        show_marriages_dialog(self.folder_path, self.engine)
 
     
     def on_closing(self):
         """Obsługuje zamknięcie okna - zapisuje ustawienia."""
         try:
             # Anuluj zaplanowane zadania
-            if self.refresh_after_id is not None:
+            for after_id in (self.refresh_after_id, self.watch_after_id):
+                if after_id is None:
+                    continue
                 try:
-                    self.root.after_cancel(self.refresh_after_id)
+                    self.root.after_cancel(after_id)
                 except (ValueError, tk.TclError):
                     pass
             
@@ -685,6 +763,11 @@ class MainWindow:
                 "jubilee_days": self.jubilee_days_var.get(),
                 "marriage_year_from": self.marriage_year_from_var.get(),
                 "marriage_year_to": self.marriage_year_to_var.get(),
+                "workers": self.workers,
+                "jubilee_milestones": list(self.jubilee_milestones),
+                "birthday_milestones": list(self.birthday_milestones),
+                "watch_interval": self.watch_interval,
+                "profile_analysis": self.profile_analysis,
                 "window_geometry": window_geometry
             }
             save_settings(settings)
@@ -724,66 +807,41 @@ class MainWindow:
         except Exception as e:
             messagebox.showerror("Błąd", f"Nie udało się otworzyć pliku: {e}")
 
-    def search_in_results(self):
-        """Wyszukuje tekst w wynikach. Enter przechodzi do następnego wystąpienia."""
+    def search_in_results(self, step=1):
+        """
+        Wyszukuje tekst w wynikach (indeks słów, bez znaczenia wielkości liter i polskich znaków).
+
+        Enter przechodzi do następnego wystąpienia, Shift+Enter do poprzedniego.
+        """
         search_term = self.search_entry.get().strip()
-        # Inicjalizacja atrybutów pomocniczych
-        if not hasattr(self, '_last_search_term'):
-            self._last_search_term = None
-        if not hasattr(self, 'search_index'):
-            self.search_index = None
 
-        # Jeśli pole puste, usuń komunikat i resetuj indeksy
+        # Jeśli pole puste, usuń komunikat i podświetlenia
         if not search_term:
-            self.result_text.delete("1.0", "2.0")
-            self.result_text.tag_remove("highlight", "1.0", tk.END)
-            self._last_search_term = None
-            self.search_index = None
+            self.result_text.set_notice(None)
+            self.result_text.clear_matches()
+            self.reset_search_state()
             return
 
-        import re
-        pattern = rf'\m{re.escape(search_term)}\M'  # \m i \M to granice słowa w Tkinter
-
-        # Jeśli zmienił się tekst wyszukiwania, licz od nowa i podświetl pierwsze
+        # Jeśli zmienił się tekst wyszukiwania, pobierz wystąpienia z indeksu i podświetl wszystkie
         if self._last_search_term != search_term:
-            # Zlicz wystąpienia
-            count = 0
-            temp_index = "1.0"
-            while True:
-                temp_index = self.result_text.search(pattern, temp_index, stopindex=tk.END, nocase=True, regexp=True)
-                if not temp_index:
-                    break
-                count += 1
-                temp_index = f"{temp_index}+{len(search_term)}c"
-            self.result_text.delete("1.0", "2.0")
-            if count == 0:
-                self.result_text.insert("1.0", f"[WYSZUKIWANIE] Nie znaleziono: '{search_term}'\n", "searchinfo")
-                self.result_text.tag_remove("highlight", "1.0", tk.END)
-                self._last_search_term = search_term
-                self.search_index = None
-                return
-            else:
-                self.result_text.insert("1.0", f"[WYSZUKIWANIE] Znaleziono {count} wystąpień dla: '{search_term}'\n", "searchinfo")
-            self.search_index = "1.0"
+            self.search_matches = self.result_text.search(search_term)
             self._last_search_term = search_term
-        # Szukaj następnego wystąpienia od aktualnego indeksu
-        idx = self.result_text.search(pattern, self.search_index, stopindex=tk.END, nocase=True, regexp=True)
-        if not idx:
-            # Jeśli nie znaleziono dalej, zacznij od początku
-            idx = self.result_text.search(pattern, "1.0", stopindex=tk.END, nocase=True, regexp=True)
-            if not idx:
-                self.result_text.tag_remove("highlight", "1.0", tk.END)
-                self.search_index = None
+            self.search_position = None
+            self.result_text.set_matches(self.search_matches)
+            if not self.search_matches:
+                self.result_text.set_notice(f"[WYSZUKIWANIE] Nie znaleziono: '{search_term}'", "searchinfo")
                 return
-        end_index = f"{idx}+{len(search_term)}c"
-        self.result_text.tag_remove("highlight", "1.0", tk.END)
-        self.result_text.tag_add("highlight", idx, end_index)
-        self.result_text.tag_configure("highlight", background="yellow", foreground="black")
-        self.result_text.see(idx)
-        # Ustaw następny indeks na pozycję po znalezionym
-        self.search_index = end_index
-        # Styl komunikatu na górze
-        self.result_text.tag_configure("searchinfo", foreground=COLORS.get("info", "#27AE60"), font=("Consolas", 10, "bold"))
+        if not self.search_matches:
+            return
+
+        # Następne (lub poprzednie) wystąpienie, po ostatnim - od początku
+        count = len(self.search_matches)
+        if self.search_position is None:
+            self.search_position = 0 if step > 0 else count - 1
+        else:
+            self.search_position = (self.search_position + step) % count
+        self.result_text.show_match(self.search_position)
+        self.result_text.set_notice(f"[WYSZUKIWANIE] Wystąpienie {self.search_position + 1} z {count} dla: '{search_term}'", "searchinfo")
 
     def apply_settings(self):
         """Stosuje ustawienia wieku i jubileuszy po naciśnięciu Enter."""
@@ -809,14 +867,14 @@ class MainWindow:
                 messagebox.showwarning("Błąd", "Podano nieprawidłowy zakres lat ślubów (od musi być mniejsze lub równe do).")
                 return
             
-            # Wykonaj analizę z nowymi ustawieniami
-            self.analyze_current_settings(show_dialog=False)
+            # Zmieniły się tylko filtry - przefiltruj dane z pamięci bez czytania plików
+            self.analyze_current_settings(show_dialog=False, rescan=False)
             
         except tk.TclError:
             messagebox.showerror("Błąd", "Wprowadź poprawne liczby całkowite w polach.")
 
-    def analyze_current_settings(self, show_dialog=False):
-        """Analizuje z bieżącymi ustawieniami."""
+    def analyze_current_settings(self, show_dialog=False, rescan=True):
+        """Analizuje z bieżącymi ustawieniami (rescan=False - bez ponownego wczytywania plików)."""
         print(f"[DEBUG] analyze_current_settings: wywołano (show_dialog={show_dialog}) o {datetime.now()}")
         if not self.folder_path:
             folder = filedialog.askdirectory(title="Wybierz folder z plikami Excel")
@@ -834,22 +892,7 @@ class MainWindow:
                 messagebox.showwarning("Błąd", "Podano nieprawidłowy zakres wieku.")
                 return
 
-            def worker():
-                try:
-                    self.analyze_folder(self.folder_path, self.names_dict, age_from, age_to, jubilee_days=jubilee_days, show_dialog=show_dialog)
-                except Exception as e:
-                    logging.error(f"Błąd w wątku analizy: {e}")
-                    self.root.after(0, self._show_analysis_error, str(e))
-                finally:
-                    self.root.after(0, self._restore_ui_after_analysis)
-
-            if self.btn_analyze:
-                self.btn_analyze.config(state=tk.DISABLED)
-            self.root.config(cursor="watch")
-            self.root.update_idletasks()
-
-            t = threading.Thread(target=worker, daemon=True)
-            t.start()
+            self.analyze_folder(self.folder_path, self.names_dict, age_from, age_to, jubilee_days=jubilee_days, show_dialog=show_dialog, rescan=rescan)
 
         except Exception as e:
             messagebox.showerror("Błąd", f"Wystąpił błąd podczas uruchamiania analizy: {e}")
@@ -1032,342 +1075,145 @@ class MainWindow:
             self.all_unknown
         )
     
-    def analyze_folder(self, selected_folder, names_dict_local, age_from=None, age_to=None, jubilee_days=None, show_dialog=False):
-        """Główna funkcja analizy folderów."""
+    def analyze_folder(self, selected_folder, names_dict_local, age_from=None, age_to=None, jubilee_days=None, show_dialog=False, rescan=True):
+        """
+        Główna funkcja analizy folderów - uruchamia rdzeń analizy w wątku roboczym.
+
+        Przy rescan=False folder wczytany wcześniej nie jest czytany ponownie -
+        dane z pamięci są tylko filtrowane z nowymi ustawieniami.
+        """
         self.folder_path = selected_folder
-        self.found_people.clear()
-        self.statistics.start_analysis()  # Rozpocznij zbieranie statystyk
 
         if not names_dict_local:
-            self.result_text.insert(tk.END, "[ERROR] Lista imion jest pusta. Sprawdź plik JSON.\n", "error")
+            self.result_text.append("[ERROR] Lista imion jest pusta. Sprawdź plik JSON.\n", "error")
             return
 
-        self.result_text.delete(1.0, tk.END)
-        self.result_text.insert(tk.END, "\n\n   ⌛ TRWA ANALIZA... PROSZĘ CZEKAĆ ⌛\n\n", "analyzing")
-        self.result_text.update_idletasks()
-        # Bufor na szczegóły analizy
-        analysis_details = []
-        total_m = 0
-        total_k = 0
-        error_count = 0
-        warning_count = 0
-        all_unknown = {}
-        unknown_names = set()  # Zbiór nieznanych imion
-        scanned_files_count = 0
-        jubilees_found = []
-        marriages_in_range = []  # Lista ślubów w zakresie lat
-
-        if age_from is None:
-            age_from = self.age_from_var.get()
-        if age_to is None:
-            age_to = self.age_to_var.get()
-        if jubilee_days is None:
-            jubilee_days = self.jubilee_days_var.get()
+        # Analiza już trwa - spróbuj ponownie po jej zakończeniu
+        if not self.analysis_lock.acquire(blocking=False):
+            self.root.after(200, lambda: self.analyze_folder(selected_folder, names_dict_local, age_from, age_to, jubilee_days, show_dialog, rescan))
+            return
 
+        # Parametry odczytywane w wątku GUI (zmienne tkinter nie są bezpieczne wątkowo)
+        params = {
+            "age_from": age_from if age_from is not None else self.age_from_var.get(),
+            "age_to": age_to if age_to is not None else self.age_to_var.get(),
+            "jubilee_days": jubilee_days if jubilee_days is not None else self.jubilee_days_var.get(),
+            "marriage_year_from": self.marriage_year_from_var.get(),
+            "marriage_year_to": self.marriage_year_to_var.get(),
+            "jubilee_milestones": self.jubilee_milestones,
+            "birthday_milestones": self.birthday_milestones,
+            "workers": self.workers,
+        }
+        names_snapshot = dict(names_dict_local)
+        reload_paths, self.pending_reload = self.pending_reload, set()
+        profile = self.profile_analysis
 
-        for filename in os.listdir(self.folder_path):
-            if filename.startswith("~$") or not filename.lower().endswith((".xls", ".xlsx")):
-                continue
-            if filename.lower() in ["wzór.xlsx", "wzor.xlsx"]:
-                continue
-            file_path = os.path.join(self.folder_path, filename)
-            lp = scanned_files_count + 1
-            analysis_details.append((f"{lp}. [INFO] Analiza pliku: {filename}\n", "link", file_path))
-            scanned_files_count += 1
-            self.statistics.add_file()  # Zlicz plik
-            # ...existing code...
+        self.result_text.clear()
+        self.event_tree.clear()
+        self.result_text.append("\n\n   ⌛ TRWA ANALIZA... PROSZĘ CZEKAĆ ⌛\n\n", "analyzing")
+        if self.btn_analyze:
+            self.btn_analyze.config(state=tk.DISABLED)
+        self.root.config(cursor="watch")
+        self.root.update_idletasks()
 
+        def worker():
+            profiler = None
             try:
-                xl = pd.ExcelFile(file_path)
+                workers = params["workers"]
+                if profile:
+                    # Profil obejmuje tylko ten wątek i proces - pliki wczytywane szeregowo
+                    profiler = AnalysisProfiler(info={
+                        "Folder": selected_folder,
+                        "Ponowne wczytanie": "tak" if rescan else "nie",
+                        "Ustawienia": {key: value for key, value in params.items() if key != "workers"},
+                    })
+                    profiler.start()
+                    workers = 1
+                if self.engine is None:
+                    self.engine = AnalysisEngine(ParseCache())
+                if rescan or not self.engine.is_loaded(selected_folder):
+                    # Migawka przed wczytaniem - zmiany w trakcie wczytywania też zostaną wykryte
+                    self.folder_watcher = FolderWatcher(selected_folder)
+                    with profile_stage(profiler, "wczytanie folderu"):
+                        self.engine.scan(selected_folder, workers=workers)
+                elif reload_paths:
+                    with profile_stage(profiler, "wczytanie zmienionych"):
+                        self.engine.reload_files(reload_paths, workers=workers)
+                with profile_stage(profiler, "analiza"):
+                    result = self.engine.evaluate(names_snapshot, params)
+                if profiler is not None:
+                    paths, profiler = profiler.finish(), None
+                    result.events.append(AnalysisEvent(None, None, "INFO", f"Profil analizy zapisano: {paths[1] if paths else 'błąd zapisu (szczegóły w logu)'}"))
+                self.root.after(0, self.show_analysis_result, result, show_dialog)
             except Exception as e:
-                analysis_details.append((f"[ERROR] Nie można wczytać pliku: {e}\n", "error", None))
-                error_count += 1
-                continue
-
-            file_m = 0
-            file_k = 0
-
-            for sheet_name in xl.sheet_names:
-                try:
-                    df = xl.parse(sheet_name, header=None)
-                except Exception as e:
-                    analysis_details.append((f"[ERROR] Nie można wczytać arkusza {sheet_name}: {e}\n", "error", None))
-                    error_count += 1
-                    self.statistics.add_error()  # Zlicz błąd
-                    continue
-
-                self.statistics.add_sheet()  # Zlicz arkusz
-                analysis_details.append((f"  [INFO] Analiza arkusza: {sheet_name}\n", "info", None))
-
-                # Wyodrębnij nazwisko, adres i inne dane
-                surname = ""
-                try:
-                    if df.shape[0] >= 7 and df.shape[1] >= 2:
-                        surname_parts = []
-                        for col in range(0, 2):
-                            column_data = df.iloc[1:7, col].dropna()
-                            if not column_data.empty:
-                                surname_parts.append(str(column_data.iloc[0]))
-                        surname = " ".join(surname_parts)
-                        if surname:
-                            analysis_details.append((f"    [INFO] Nazwisko: {surname}\n", "info", None))
-                except Exception as e:
-                    logging.debug(f"Nie można wyodrębnić nazwiska z {filename}: {e}")
-                    surname = ""
-
-                address = ""
-                try:
-                    if df.shape[0] >= 4 and df.shape[1] >= 5:
-                        address_parts = []
-                        for col in range(2, 5):
-                            column_data = df.iloc[1:4, col].dropna()
-                            if not column_data.empty:
-                                address_parts.append(str(column_data.iloc[0]))
-                        address = " ".join(address_parts)
-                        if address:
-                            analysis_details.append((f"    [INFO] Adres: {address}\n", "info", None))
-                except Exception as e:
-                    logging.debug(f"Nie można wyodrębnić adresu z {filename}: {e}")
-
-                old_address = ""
-                try:
-                    if df.shape[0] >= 4 and df.shape[1] >= 7:
-                        old_address_parts = []
-                        for col in range(5, 7):
-                            column_data = df.iloc[1:4, col].dropna()
-                            if not column_data.empty:
-                                old_address_parts.append(str(column_data.iloc[0]))
-                        old_address = " ".join(old_address_parts)
-                        if old_address:
-                            analysis_details.append((f"    [INFO] Adres stary: {old_address}\n", "info", None))
-                except Exception as e:
-                    logging.debug(f"Nie można wyodrębnić starego adresu z {filename}: {e}")
-
-                # Wyodrębnij i wyświetl informacje o ślubie małżonków
-                try:
-                    marriage_info = extract_marriage_info(df)
-                    if marriage_info.get("husband") and marriage_info.get("wife"):
-                        analysis_details.append((f"    [INFO] Mąż: {marriage_info['husband']}, Żona: {marriage_info['wife']}\n", "info", None))
-                    if marriage_info.get("marriage_date"):
-                        analysis_details.append((f"    [INFO] Data ślubu: {marriage_info['marriage_date']}\n", "info", None))
-                        
-                        # Dodaj rok ślubu do statystyk
-                        try:
-                            from datetime import datetime
-                            marriage_year = datetime.fromisoformat(marriage_info['marriage_date']).year
-                            self.statistics.add_marriage_year(marriage_year)
-                        except Exception:
-                            pass
-                        
-                        # Sprawdź czy ślub jest w zakresie lat
-                        try:
-                            from datetime import datetime
-                            marriage_year = datetime.fromisoformat(marriage_info['marriage_date']).year
-                            if self.marriage_year_from_var.get() <= marriage_year <= self.marriage_year_to_var.get():
-                                marriages_in_range.append({
-                                    "surname": surname,
-                                    "husband": marriage_info['husband'],
-                                    "wife": marriage_info['wife'],
-                                    "date": marriage_info['marriage_date'],
-                                    "year": marriage_year,
-                                    "address": address,
-                                    "old_address": old_address,
-                                    "file_path": file_path
-                                })
-                        except Exception:
-                            pass
-                except Exception as e:
-                    logging.debug(f"Nie można wyodrębnić danych małżonków z {filename}: {e}")
-
-                # Wyodrębnij i wyświetl informacje o ślubie dziadków
-                try:
-                    gp_marriage_info = extract_grandparents_marriage_info(df)
-                    gp_marriage_date = gp_marriage_info.get("marriage_date") if isinstance(gp_marriage_info, dict) else gp_marriage_info
-                    if gp_marriage_date:
-                        analysis_details.append((f"    [INFO] Data ślubu dziadków: {gp_marriage_date}\n", "info", None))
-                        
-                        # Dodaj rok ślubu dziadków do statystyk
-                        try:
-                            from datetime import datetime
-                            gp_marriage_year = datetime.fromisoformat(gp_marriage_date).year
-                            self.statistics.add_marriage_year(gp_marriage_year)
-                        except Exception:
-                            pass
-                        
-                        # Sprawdź czy ślub dziadków jest w zakresie lat
-                        try:
-                            from datetime import datetime
-                            gp_marriage_year = datetime.fromisoformat(gp_marriage_date).year
-                            if self.marriage_year_from_var.get() <= gp_marriage_year <= self.marriage_year_to_var.get():
-                                marriages_in_range.append({
-                                    "surname": surname,
-                                    "husband": "Dziadek",
-                                    "wife": "Babcia",
-                                    "date": gp_marriage_date,
-                                    "year": gp_marriage_year,
-                                    "address": address,
-                                    "old_address": old_address,
-                                    "file_path": file_path,
-                                    "type": "DZIADKOWIE"
-                                })
-                        except Exception:
-                            pass
-                except Exception as e:
-                    logging.debug(f"Nie można wyodrębnić danych dziadków z {filename}: {e}")
+                logging.error(f"Błąd w wątku analizy: {e}")
+                self.root.after(0, self._show_analysis_error, str(e))
+                self.root.after(0, self._restore_ui_after_analysis)
+            finally:
+                if profiler is not None:
+                    profiler.finish()
+                self.analysis_lock.release()
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def refresh_files(self, file_paths):
+        """Analizuje ponownie po edycji plików - wczytywane są tylko zmienione pliki."""
+        if self.folder_watcher is not None:
+            # Migawka przed wczytaniem - następne sprawdzenie folderu nie wczyta tych plików drugi raz
+            self.folder_watcher.update(file_paths)
+        self.pending_reload.update(file_paths)
+        self.analyze_current_settings(show_dialog=False, rescan=False)
+
+    def schedule_folder_watch(self):
+        """Planuje kolejne sprawdzenie zmian w folderze kartoteki."""
+        if self.watch_after_id is not None:
+            self.root.after_cancel(self.watch_after_id)
+            self.watch_after_id = None
+        if self.watch_interval > 0:
+            self.watch_after_id = self.root.after(int(self.watch_interval * 1000), self.check_folder_changes)
+
+    def check_folder_changes(self):
+        """Wczytuje ponownie pliki dodane, zmienione lub usunięte w folderze od ostatniej analizy."""
+        self.watch_after_id = None
+        try:
+            watcher = self.folder_watcher
+            if (watcher is not None and self.folder_path and watcher.watches(self.folder_path)
+                    and not self.analysis_lock.locked()):
+                added, modified, deleted = watcher.poll()
+                if added or modified or deleted:
+                    logging.info(f"Zmiany w folderze kartoteki: dodane={len(added)}, zmienione={len(modified)}, usunięte={len(deleted)}")
+                    self.refresh_files(added + modified + deleted)
+        except Exception as e:
+            logging.error(f"Błąd sprawdzania zmian w folderze: {e}")
+        finally:
+            self.schedule_folder_watch()
 
-                try:
-                    mar_list = analyze_marriage_jubilees(df, file_path, surname, window_days=jubilee_days, marriage_year_from=self.marriage_year_from_var.get(), marriage_year_to=self.marriage_year_to_var.get())
-                    for j in mar_list:
-                        j["old_address"] = old_address
-                        self.statistics.add_jubilee()  # Zlicz jubileusz
-                    jubilees_found.extend(mar_list)
-
-                    gp_list = analyze_grandparents_jubilees(df, file_path, surname, window_days=jubilee_days, marriage_year_from=self.marriage_year_from_var.get(), marriage_year_to=self.marriage_year_to_var.get())
-                    for j in gp_list:
-                        j["old_address"] = old_address
-                        self.statistics.add_jubilee()  # Zlicz jubileusz
-                    jubilees_found.extend(gp_list)
-                except Exception as e:
-                    logging.error(f"BŁĄD analizy jubileuszy w {filename}: {e}")
-                    analysis_details.append((f"    [ERROR] Nie można przeanalizować jubileuszy: {str(e)}\n", "error", None))
-                    error_count += 1
-                    self.statistics.add_error()  # Zlicz błąd
-
-                sheet_people = []
-                for row_idx, row in df.iterrows():
-                    if len(row) < 3:
-                        continue
-                    name_cell = row.iloc[1]
-                    birth_cell = row.iloc[2]
-
-                    tokens = extract_words(name_cell)
-                    if not tokens:
-                        continue
-
-                    given_name = tokens[0]
-                    second_member = tokens[1] if len(tokens) > 1 else None
-
-                    # Sprawdź czy brak daty urodzenia
-                    if pd.isna(birth_cell) or (isinstance(birth_cell, str) and birth_cell.strip() == ""):
-                        analysis_details.append((f"    [WARNING] Brak daty urodzenia dla '{given_name}'\n", "warning", None))
-                        warning_count += 1
-                        self.statistics.add_warning()  # Zlicz ostrzeżenie
-                        continue
-
-                    # Sprawdź czy w komórce jest wzorzec daty, ale nie jest poprawny
-                    if pd.notna(birth_cell) and isinstance(birth_cell, str):
-                        date_pattern = re.search(r"(\d{1,2})[./-](\d{1,2})[./-](\d{4})", birth_cell)
-                        if date_pattern:
-                            from data_processing import validate_date_components
-                            d, m, y = date_pattern.groups()
-                            is_valid, error_msg = validate_date_components(d, m, y)
-                            if not is_valid:
-                                # Specjalna obsługa daty umownej 99/99/9999: warning zamiast error
-                                if str(d) == '99' and str(m) == '99' and str(y) == '9999':
-                                    analysis_details.append((f"    [WARNING] Błędna data dla '{given_name}': {birth_cell} - {error_msg}\n", "warning", None))
-                                    warning_count += 1
-                                    self.statistics.add_warning()  # Zlicz ostrzeżenie
-                                else:
-                                    analysis_details.append((f"    [ERROR] Błędna data dla '{given_name}': {birth_cell} - {error_msg}\n", "error", None))
-                                    error_count += 1
-                                    self.statistics.add_error()  # Zlicz błąd
-
-                    birth_date = extract_birth_date(birth_cell)
-                    if not birth_date:
-                        analysis_details.append((f"    [WARNING] Nie można odczytać daty urodzenia dla '{given_name}': {birth_cell}\n", "warning", None))
-                        warning_count += 1
-                        self.statistics.add_warning()  # Zlicz ostrzeżenie
-                        continue
-                    
-                    # Dodaj rok urodzenia do statystyk
-                    try:
-                        birth_year = birth_date.year
-                        self.statistics.add_birth_year(birth_year)
-                    except Exception:
-                        pass
-
-                    # Specjalna obsługa daty umownej: przypisz medianę wieku lub 40
-                    if birth_date == "MEDIANA_WIEKU":
-                        # Wylicz medianę z dotychczasowych osób
-                        ages_so_far = self.statistics.ages
-                        if ages_so_far:
-                            sorted_ages = sorted(ages_so_far)
-                            count = len(sorted_ages)
-                            if count % 2 == 0:
-                                med = (sorted_ages[count // 2 - 1] + sorted_ages[count // 2]) / 2
-                            else:
-                                med = sorted_ages[count // 2]
-                            age = int(round(med))
-                        else:
-                            age = 40
-                    else:
-                        age = calculate_age(birth_date)
-                    if age is None or not (age_from <= age <= age_to):
-                        continue
-
-                    normalized_word = remove_diacritics(given_name.strip().lower())
-                    if normalized_word in names_dict_local:
-                        plec = names_dict_local[normalized_word]
-
-                        if plec == "K":
-                            file_k += 1
-                        elif plec == "M":
-                            file_m += 1
-
-                        final_surname = format_person_name(second_member) if second_member else surname
-
-                        person_entry = {
-                            "imie": given_name,
-                            "nazwisko": final_surname,
-                            "adres": address,
-                            "old_address": old_address,
-                            "wiek": age,
-                            "plec": plec,
-                            "file": filename,
-                            "file_path": file_path
-                        }
-                        self.found_people.append(person_entry)
-                        sheet_people.append(person_entry)
-                        self.statistics.add_person(person_entry)  # Dodaj osobę do statystyk
-                    else:
-                        # Nieznane imię - dodaj do zbioru i zapisz ostrzeżenie
-                        if normalized_word not in unknown_names:
-                            unknown_names.add(normalized_word)
-                            analysis_details.append((f"    [WARNING] Nieznane imię '{given_name}' - dodaj do słownika imiona.json\n", "warning", None))
-                            warning_count += 1
-                            self.statistics.add_warning()  # Zlicz ostrzeżenie
-                            self.statistics.add_unknown_name()  # Zlicz nieznane imię
-                        
-                        # Dodaj lokalizację nieznanegoienia do słownika all_unknown
-                        location_key = f"{file_path} -> {sheet_name}"
-                        if normalized_word not in all_unknown:
-                            all_unknown[normalized_word] = []
-                        if location_key not in all_unknown[normalized_word]:
-                            all_unknown[normalized_word].append(location_key)
-
-                # Wyświetl znalezione osoby z arkusza
-                if sheet_people:
-                    analysis_details.append((f"    Znalezione osoby w arkuszu {sheet_name}:\n", "info", None))
-                    for person in sheet_people:
-                        imie = format_person_name(person.get("imie", ""))
-                        nazwisko = format_person_name(person.get("nazwisko", ""))
-                        wiek = person.get("wiek", "")
-                        plec = person.get("plec", "")
-                        plec_str = "K" if plec == "K" else "M"
-                        analysis_details.append((f"      - {imie} {nazwisko}, wiek: {wiek}, płeć: {plec_str}\n", None, None))
-                    # Dodaj rodzinę na podstawie liczby osób w arkuszu
-                    self.statistics.add_family_by_size(len(sheet_people))
-
-            total_k += file_k
-            total_m += file_m
-            
-            # Dodaj podsumowanie pliku do bufora z podświetleniem zer
-            analysis_details.append((f"  [INFO] Wynik dla pliku: Kobiety=", "bold", None))
-            analysis_details.append((f"{file_k}", "error" if file_k == 0 else "bold", None))
-            analysis_details.append((f", Mężczyźni=", "bold", None))
-            analysis_details.append((f"{file_m}", "error" if file_m == 0 else "bold", None))
-            analysis_details.append(("\n", "bold", None))
-            analysis_details.append(("-"*50 + "\n", None, None))
+    def promote_unknown_name(self, normalized_word, gender):
+        """Dołącza do wyników osoby z imieniem właśnie dodanym do słownika (bez ponownej analizy)."""
+        if self.analysis_result is None or self.analysis_lock.locked():
+            # Brak wyniku lub analiza w toku - przefiltruj dane z pamięci z nowym słownikiem
+            self.analyze_current_settings(show_dialog=False, rescan=False)
+            return
+        added = self.analysis_result.promote_name(normalized_word, gender)
+        logging.info(f"Dodano imię '{normalized_word}' ({gender}) - dołączone osoby: {added}")
+        self.show_analysis_result(self.analysis_result)
+
+    def show_analysis_result(self, result, show_dialog=False):
+        """Wyświetla wynik analizy (AnalysisResult) - wywoływane w wątku GUI."""
+        render_start = time.perf_counter()
+        self.analysis_result = result
+        self.found_people = result.people
+        self.statistics = result.statistics
+        jubilees_found = result.jubilees
+        marriages_in_range = result.marriages
+        all_unknown = result.unknown
+        analysis_details = result.events
+        jubilee_days = result.params["jubilee_days"]
+        scanned_files_count = result.files_scanned
+        total_k = result.total_females
+        total_m = result.total_males
+        error_count = result.error_count
+        warning_count = result.warning_count
 
         # Przygotuj podsumowanie końcowe
         final_summary_lines = []
@@ -1375,70 +1221,60 @@ class MainWindow:
         
         if all_unknown:
             final_summary_lines.append(f"[RESULT] Wszystkie nieznane imiona wyświetlono w wynikach.\n")
-
-        # Zakończ zbieranie statystyk
-        # self.statistics.update_family_stats(self.found_people)  # Już niepotrzebne, rodziny liczone na bieżąco
-        self.statistics.end_analysis()
         
         # Usuń komunikat analizy i wstaw wyniki
-        self.result_text.delete(1.0, tk.END)
+        self.result_text.clear()
         
         # Wstaw początek podsumowania
         for line in final_summary_lines:
-            self.result_text.insert(tk.END, line, "bold")
+            self.result_text.append(line, "bold")
         
         # Wstaw sumę z podświetleniem zer
-        self.result_text.insert(tk.END, "[RESULT] Suma wszystkich plików: ", "bold")
-        self.result_text.insert(tk.END, "Kobiety=", "bold")
-        self.result_text.insert(tk.END, f"{total_k}", "error" if total_k == 0 else "bold")
-        self.result_text.insert(tk.END, ", Mężczyźni=", "bold")
-        self.result_text.insert(tk.END, f"{total_m}", "error" if total_m == 0 else "bold")
-        self.result_text.insert(tk.END, ", Razem=", "bold")
-        self.result_text.insert(tk.END, f"{total_k + total_m}", "bold")
-        self.result_text.insert(tk.END, "\n", "bold")
+        self.result_text.append("[RESULT] Suma wszystkich plików: ", "bold")
+        self.result_text.append("Kobiety=", "bold")
+        self.result_text.append(f"{total_k}", "error" if total_k == 0 else "bold")
+        self.result_text.append(", Mężczyźni=", "bold")
+        self.result_text.append(f"{total_m}", "error" if total_m == 0 else "bold")
+        self.result_text.append(", Razem=", "bold")
+        self.result_text.append(f"{total_k + total_m}", "bold")
+        self.result_text.append("\n", "bold")
         
         # Wstaw informacje o błędach i ostrzeżeniach NA CZERWONO
         if error_count > 0 or warning_count > 0:
-            self.result_text.insert(tk.END, "[WARNING] Znaleziono: ", "warning")
+            self.result_text.append("[WARNING] Znaleziono: ", "warning")
             if error_count > 0:
-                self.result_text.insert(tk.END, f"{error_count} błędów", "error")
+                self.result_text.append(f"{error_count} błędów", "error")
             if error_count > 0 and warning_count > 0:
-                self.result_text.insert(tk.END, ", ", "bold")
+                self.result_text.append(", ", "bold")
             if warning_count > 0:
-                self.result_text.insert(tk.END, f"{warning_count} ostrzeżeń", "warning")
-            self.result_text.insert(tk.END, "\n", "bold")
+                self.result_text.append(f"{warning_count} ostrzeżeń", "warning")
+            self.result_text.append("\n", "bold")
         
-        self.result_text.insert(tk.END, "=" * 50 + "\n\n", "bold")
+        self.result_text.append("=" * 50 + "\n\n", "bold")
         
         # Wstaw sekcję jubileuszy
-        self.result_text.insert(tk.END, "-" * 60 + "\n", "bold")
+        self.result_text.append("-" * 60 + "\n", "bold")
         if jubilees_found:
-            self.result_text.insert(tk.END, f"[JUBILEUSZE ŚLUBÓW – NAJBLIŻSZE {jubilee_days} DNI]\n", "bold")
+            self.result_text.append(f"[JUBILEUSZE ŚLUBÓW – NAJBLIŻSZE {jubilee_days} DNI]\n", "bold")
             for j in sorted(jubilees_found, key=lambda x: x["days"]):
                 type_str = j.get("type", "MAŁŻONKOWIE").upper()
                 old = j.get("old_address", "")
                 name_paren = f"{j.get('surname','')}" + (f", {old}" if old else "")
-                self.result_text.insert(tk.END, f"{j['date']} – {j['years']} lat – {j['husband']} i {j['wife']} ({name_paren}) [{type_str}] za {j['days']} dni\n")
+                self.result_text.append(f"{j['date']} – {j['years']} lat – {j['husband']} i {j['wife']} ({name_paren}) [{type_str}] za {j['days']} dni\n")
         else:
-            self.result_text.insert(tk.END, f"[INFO] Nie znaleziono nadchodzących jubileuszy w ciągu {jubilee_days} dni.\n", "info")
-        self.result_text.insert(tk.END, "-" * 60 + "\n\n", "bold")
+            self.result_text.append(f"[INFO] Nie znaleziono nadchodzących jubileuszy w ciągu {jubilee_days} dni.\n", "info")
+        if result.round_birthdays:
+            self.result_text.append(f"[OKRĄGŁE URODZINY – NAJBLIŻSZE {jubilee_days} DNI]\n", "bold")
+            for b in result.round_birthdays:
+                old = b.get("old_address", "")
+                name_paren = f"{b.get('adres', '')}" + (f", {old}" if old else "")
+                self.result_text.append(f"{b['date']} – {b['wiek']} lat – {format_person_name(b['imie'])} {b['nazwisko']} ({name_paren}) za {b['days']} dni\n")
+        self.result_text.append("-" * 60 + "\n\n", "bold")
         
-        # Wstaw szczegóły analizy z bufora
-        file_link_counter = 0
-        for detail_text, tag, link_path in analysis_details:
-            if tag:
-                self.result_text.insert(tk.END, detail_text, tag)
-            else:
-                self.result_text.insert(tk.END, detail_text)
-            
-            # Jeśli to link do pliku, dodaj obsługę kliknięcia
-            if link_path:
-                file_link_counter += 1
-                start_index = self.result_text.index(f"{tk.END} - 2 lines")
-                end_index = self.result_text.index(f"{tk.END} - 1 lines")
-                self.result_text.tag_add(f"file-link-{file_link_counter}", start_index, end_index)
-                self.result_text.tag_configure(f"file-link-{file_link_counter}", foreground="blue", underline=True)
-                self.result_text.tag_bind(f"file-link-{file_link_counter}", "<Button-1>", lambda e, path=link_path: os.startfile(path))
+        # Wstaw szczegóły analizy (linki do plików - jeden tag i mapa linia -> ścieżka)
+        for detail_text, tag, link_path in result.event_log():
+            self.result_text.append(detail_text, tag, link=link_path)
+        self.event_tree.load(result)
 
         # Usuwanie starego przycisku edycji jeśli istnieje
         if hasattr(self, 'edit_unknown_btn') and self.edit_unknown_btn and self.edit_unknown_btn.winfo_exists():
@@ -1447,15 +1283,15 @@ class MainWindow:
         
         if all_unknown:
             # Dodaj separator przed przyciskiem w wynikach
-            self.result_text.insert(tk.END, "\n" + "="*60 + "\n", "bold")
-            self.result_text.insert(tk.END, "⚠️ UWAGA: Znaleziono nieznane imiona!\n", "warning")
-            self.result_text.insert(tk.END, f"Liczba nieznanych imion: {len(all_unknown)}\n\n", "info")
+            self.result_text.append("\n" + "="*60 + "\n", "bold")
+            self.result_text.append("⚠️ UWAGA: Znaleziono nieznane imiona!\n", "warning")
+            self.result_text.append(f"Liczba nieznanych imion: {len(all_unknown)}\n\n", "info")
             
             for name, locations in all_unknown.items():
-                self.result_text.insert(tk.END, f"  • {name} ({len(locations)} wystąpień)\n")
+                self.result_text.append(f"  • {name} ({len(locations)} wystąpień)\n")
             
-            self.result_text.insert(tk.END, "\n👉 Przewiń panel boczny w dół i kliknij przycisk 'Edytuj nieznane imiona'\n", "info")
-            self.result_text.insert(tk.END, "="*60 + "\n\n", "bold")
+            self.result_text.append("\n👉 Przewiń panel boczny w dół i kliknij przycisk 'Edytuj nieznane imiona'\n", "info")
+            self.result_text.append("="*60 + "\n\n", "bold")
             
             if hasattr(self, 'analysis_section'):
                 # Styl przycisku edycji
@@ -1493,13 +1329,21 @@ class MainWindow:
         self.marriages_in_range = marriages_in_range
         self.all_unknown = all_unknown
         self.analysis_details = analysis_details
-
+        self.result_text.flush()
+        # Ustawiany, nie dodawany - wynik jest wyświetlany ponownie po każdym dodanym imieniu
+        self.statistics.set_stage_time("render", time.perf_counter() - render_start)
 
         # Resetuj stan wyszukiwania po każdej analizie
         self.reset_search_state()
+        results_dialog_open = self.results_dialog is not None and self.results_dialog.winfo_exists()
         if show_dialog:
-            show_results_dialog(self.found_people, self.root)
+            if results_dialog_open:
+                self.results_dialog.destroy()
+            self.results_dialog = show_results_dialog(self.found_people, self.root, self.analysis_result.people_index)
             self.reset_search_state()
+        elif results_dialog_open:
+            # Lista osób zmieniła się (dodane imię, ponowna analiza) - stare indeksy osób w oknie są nieaktualne
+            self.results_dialog.refresh_results(self.found_people, self.analysis_result.people_index)
 
         if self.btn_analyze:
             self.btn_analyze.config(state=tk.NORMAL)
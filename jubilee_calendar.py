@@ -0,0 +1,193 @@
+"""
+Kalendarz rocznic ślubów i indeks okrągłych urodzin dla całej kartoteki.
+
+Każdy ślub jest zapisany pod kluczem dnia roku (miesiąc i dzień w kalendarzu
+roku przestępnego, więc 29 lutego ma własny klucz) razem z latami, w których
+przypada jego jubileusz. Pytania "najbliższe N dni" (także przez przełom roku),
+"wszystkie jubileusze w roku" czy stan na dowolny dzień są zakresem kluczy
+wyszukanym przez bisect - bez ponownego przeglądania arkuszy.
+
+BirthdayIndex trzyma daty urodzenia jako posortowaną tablicę kluczy
+rok_urodzenia * 1000 + dzień_roku, więc osoby kończące dany wiek w oknie dat
+to jeden zakres kluczy na każdy wiek - bez przeglądania całej populacji.
+"""
+import bisect
+from array import array
+from datetime import date, datetime, timedelta
+from config import DEFAULT_JUBILEE_MILESTONES, DEFAULT_BIRTHDAY_MILESTONES
+
+def day_key(month, day):
+    """Klucz dnia roku (1-366) w kalendarzu roku przestępnego."""
+    return date(2000, month, day).timetuple().tm_yday
+
+_FEB_28 = day_key(2, 28)
+_FEB_29 = day_key(2, 29)
+
+def _is_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+class JubileeCalendar:
+    """Rocznice ślubów posortowane według dnia roku."""
+
+    def __init__(self, milestones=DEFAULT_JUBILEE_MILESTONES):
+        self.milestones = tuple(sorted(set(int(m) for m in milestones)))
+        self.keys = []  # Klucze dnia roku (posortowane)
+        self.entries = []  # (numer kolejny, data ślubu, lata jubileuszy, dane jubileuszu)
+
+    @classmethod
+    def from_files(cls, files, milestones=DEFAULT_JUBILEE_MILESTONES):
+        """Buduje kalendarz z wczytanych plików (lista krotek jak z load_folder)."""
+        calendar = cls(milestones)
+        records = []
+        for _, _, parsed in files:
+            if parsed["error"] is not None:
+                continue
+            for sheet in parsed["sheets"]:
+                if sheet["error"] is not None:
+                    continue
+                # Kolejność jak w analizie: najpierw małżonkowie, potem dziadkowie
+                records.append((sheet["jubilee_date"], sheet["surname"], sheet["husband"], sheet["wife"], "MAŁŻONKOWIE", sheet["old_address"]))
+                records.append((sheet["gp_marriage_date"], sheet["surname"], "Dziadek", "Babcia", "DZIADKOWIE", sheet["old_address"]))
+        for marriage_date_str, surname, husband, wife, jub_type, old_address in records:
+            calendar.add(marriage_date_str, {
+                "surname": surname,
+                "husband": husband,
+                "wife": wife,
+                "type": jub_type,
+                "old_address": old_address
+            })
+        calendar.sort()
+        return calendar
+
+    def add(self, marriage_date_str, info):
+        """Dodaje ślub (data ISO); po dodaniu wszystkich wywołaj sort()."""
+        if not marriage_date_str:
+            return
+        try:
+            marriage_date = datetime.fromisoformat(marriage_date_str).date()
+        except (ValueError, TypeError):
+            return
+        jubilee_years = frozenset(marriage_date.year + m for m in self.milestones)
+        self.entries.append((len(self.entries), marriage_date, jubilee_years, info))
+
+    def sort(self):
+        """Porządkuje wpisy według dnia roku (w obrębie dnia - w kolejności dodania)."""
+        self.entries.sort(key=lambda e: (day_key(e[1].month, e[1].day), e[0]))
+        self.keys = [day_key(e[1].month, e[1].day) for e in self.entries]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def between(self, start, end, as_of=None, marriage_year_from=None, marriage_year_to=None):
+        """
+        Zwraca jubileusze przypadające w dniach start..end (włącznie), według daty.
+
+        W latach nieprzestępnych rocznica ślubu z 29 lutego przypada 28 lutego.
+        "days" to liczba dni od as_of (domyślnie od start) do rocznicy.
+        """
+        if as_of is None:
+            as_of = start
+        found = []
+        for year in range(start.year, end.year + 1):
+            first = start if year == start.year else date(year, 1, 1)
+            last = end if year == end.year else date(year, 12, 31)
+            if first > last:
+                continue
+            low = day_key(first.month, first.day)
+            high = day_key(last.month, last.day)
+            if not _is_leap(year) and high == _FEB_28:
+                high = _FEB_29
+            for i in range(bisect.bisect_left(self.keys, low), bisect.bisect_right(self.keys, high)):
+                _, marriage_date, jubilee_years, info = self.entries[i]
+                if year not in jubilee_years:
+                    continue
+                if marriage_year_from is not None and marriage_date.year < marriage_year_from:
+                    continue
+                if marriage_year_to is not None and marriage_date.year > marriage_year_to:
+                    continue
+                if self.keys[i] == _FEB_29 and not _is_leap(year):
+                    anniversary = date(year, 2, 28)
+                else:
+                    anniversary = date(year, marriage_date.month, marriage_date.day)
+                jubilee = {
+                    "years": year - marriage_date.year,
+                    "date": anniversary.isoformat(),
+                    "surname": info["surname"],
+                    "husband": info["husband"],
+                    "wife": info["wife"],
+                    "days": (anniversary - as_of).days,
+                    "type": info["type"],
+                    "old_address": info["old_address"]
+                }
+                found.append(jubilee)
+        return found
+
+    def upcoming(self, as_of, window_days, **filters):
+        """Jubileusze w ciągu window_days dni od as_of (także przez przełom roku)."""
+        return self.between(as_of, as_of + timedelta(days=int(window_days)), as_of=as_of, **filters)
+
+    def in_year(self, year, **filters):
+        """Wszystkie jubileusze przypadające w danym roku."""
+        return self.between(date(year, 1, 1), date(year, 12, 31), **filters)
+
+class BirthdayIndex:
+    """Daty urodzenia całej kartoteki - wyszukiwanie osób kończących okrągły wiek."""
+
+    def __init__(self, milestones=DEFAULT_BIRTHDAY_MILESTONES):
+        self.milestones = tuple(sorted(set(int(m) for m in milestones)))
+        self.keys = array("l")  # rok_urodzenia * 1000 + dzień roku (posortowane)
+        self.people = []  # Dane osób w kolejności kluczy
+        self._pending = []
+
+    def add(self, birth_date, person):
+        """Dodaje osobę (data urodzenia jako date); po dodaniu wszystkich wywołaj sort()."""
+        key = birth_date.year * 1000 + day_key(birth_date.month, birth_date.day)
+        self._pending.append((key, len(self._pending), birth_date, person))
+
+    def sort(self):
+        """Porządkuje indeks według roku i dnia urodzenia (w obrębie dnia - w kolejności dodania)."""
+        self._pending.sort(key=lambda p: (p[0], p[1]))
+        self.keys = array("l", (p[0] for p in self._pending))
+        self.people = [(p[2], p[3]) for p in self._pending]
+        self._pending = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def between(self, start, end, as_of=None, milestones=None):
+        """
+        Zwraca osoby kończące wiek z listy milestones w dniach start..end (włącznie).
+
+        Urodzeni 29 lutego obchodzą urodziny w latach nieprzestępnych 28 lutego.
+        Wynik jest posortowany według daty urodzin.
+        """
+        if as_of is None:
+            as_of = start
+        if milestones is None:
+            milestones = self.milestones
+        found = []
+        for year in range(start.year, end.year + 1):
+            first = start if year == start.year else date(year, 1, 1)
+            last = end if year == end.year else date(year, 12, 31)
+            if first > last:
+                continue
+            low = day_key(first.month, first.day)
+            high = day_key(last.month, last.day)
+            if not _is_leap(year) and high == _FEB_28:
+                high = _FEB_29
+            for age in milestones:
+                birth_year = year - age
+                for i in range(bisect.bisect_left(self.keys, birth_year * 1000 + low),
+                               bisect.bisect_right(self.keys, birth_year * 1000 + high)):
+                    birth_date, person = self.people[i]
+                    if birth_date.month == 2 and birth_date.day == 29 and not _is_leap(year):
+                        birthday = date(year, 2, 28)
+                    else:
+                        birthday = date(year, birth_date.month, birth_date.day)
+                    found.append(dict(person, wiek=age, date=birthday.isoformat(), days=(birthday - as_of).days))
+        found.sort(key=lambda b: b["date"])
+        return found
+
+    def upcoming(self, as_of, window_days, milestones=None):
+        """Osoby kończące okrągły wiek w ciągu window_days dni od as_of."""
+        return self.between(as_of, as_of + timedelta(days=int(window_days)), as_of=as_of, milestones=milestones)
@@ -0,0 +1,304 @@
+"""
+Analiza kartoteki z wiersza poleceń - bez interfejsu graficznego.
+
+Korzysta z tego samego rdzenia co program okienkowy (kartoteka_core): pliki są
+wczytywane równolegle, z pamięcią podręczną wczytanych plików. Moduł nie
+importuje tkinter, więc działa np. w nocnym zadaniu harmonogramu bez wyświetlacza.
+
+Przykłady:
+    python -m kartoteka analyze C:\\Kartoteka --format json -o wynik.json
+    python -m kartoteka analyze C:\\Kartoteka --jubilee-days 60 --format csv --table jubilees
+    python -m kartoteka analyze C:\\Kartoteka --age-from 18 --format xlsx -o raport.xlsx
+    python -m kartoteka analyze C:\\Kartoteka --profile -o wynik.json
+    python -m kartoteka importtime --module gui_main --top 20
+"""
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+from datetime import datetime
+from config import BASE_DIR, DEFAULT_AGE_FROM, DEFAULT_AGE_TO, DEFAULT_JUBILEE_DAYS, DEFAULT_JUBILEE_MILESTONES, DEFAULT_BIRTHDAY_MILESTONES, DEFAULT_WORKERS, load_settings, parse_milestones
+
+# Biblioteki, których import wydłuża uruchamianie (wczytywane dopiero przy analizie lub eksporcie)
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl")
+
+# Tabele dostępne w formacie CSV: nazwa -> kolumny
+CSV_TABLES = {
+    "people": ["imie", "nazwisko", "adres", "old_address", "wiek", "plec", "file", "file_path"],
+    "jubilees": ["date", "years", "husband", "wife", "surname", "old_address", "type", "days"],
+    "birthdays": ["date", "wiek", "imie", "nazwisko", "adres", "old_address", "days", "file_path"],
+    "marriages": ["year", "date", "husband", "wife", "surname", "address", "old_address", "type", "file_path"],
+    "unknown": ["name", "location"],
+    "statistics": ["key", "value"],
+}
+
+def _flatten_summary(summary, prefix=""):
+    """Spłaszcza podsumowanie statystyk do par (klucz, wartość)."""
+    rows = []
+    for key, value in summary.items():
+        if isinstance(value, dict):
+            rows.extend(_flatten_summary(value, f"{prefix}{key}."))
+        elif isinstance(value, list):
+            # Listy słowników (np. najwolniejsze pliki) - klucze z numerem pozycji
+            for i, item in enumerate(value, 1):
+                rows.extend(_flatten_summary(item, f"{prefix}{key}.{i}.") if isinstance(item, dict) else [(f"{prefix}{key}.{i}", item)])
+        else:
+            rows.append((f"{prefix}{key}", value))
+    return rows
+
+def result_to_dict(result):
+    """Zamienia AnalysisResult na słownik gotowy do zapisu w JSON (bez pól pomocniczych osób)."""
+    from kartoteka_core import PERSON_DERIVED_KEYS
+    return {
+        "folder": result.folder_path,
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "params": dict(result.params),
+        "files_scanned": result.files_scanned,
+        "total_females": result.total_females,
+        "total_males": result.total_males,
+        "error_count": result.error_count,
+        "warning_count": result.warning_count,
+        "statistics": result.statistics.get_summary(),
+        "people": [{key: value for key, value in person.items() if key not in PERSON_DERIVED_KEYS} for person in result.people],
+        "jubilees": sorted(result.jubilees, key=lambda j: j["days"]),
+        "round_birthdays": result.round_birthdays,
+        "marriages": sorted(result.marriages, key=lambda m: m["year"]),
+        "unknown": result.unknown,
+    }
+
+def table_rows(result, table):
+    """Zwraca wiersze (słowniki) wybranej tabeli wyniku."""
+    if table == "people":
+        return result.people
+    if table == "jubilees":
+        return sorted(result.jubilees, key=lambda j: j["days"])
+    if table == "birthdays":
+        return result.round_birthdays
+    if table == "marriages":
+        return sorted(result.marriages, key=lambda m: m["year"])
+    if table == "unknown":
+        return [{"name": name, "location": location} for name, locations in sorted(result.unknown.items()) for location in locations]
+    if table == "statistics":
+        return [{"key": key, "value": value} for key, value in _flatten_summary(result.statistics.get_summary())]
+    raise ValueError(f"Nieznana tabela: {table}")
+
+def write_json(result, out):
+    """Zapisuje pełny wynik jako JSON."""
+    json.dump(result_to_dict(result), out, ensure_ascii=False, indent=2, default=str)
+    out.write("\n")
+
+def write_csv(result, out, table):
+    """Zapisuje jedną tabelę wyniku jako CSV (separator ';' jak w polskim Excelu)."""
+    writer = csv.DictWriter(out, fieldnames=CSV_TABLES[table], delimiter=";", extrasaction="ignore")
+    writer.writeheader()
+    for row in table_rows(result, table):
+        writer.writerow(row)
+
+def write_xlsx(result, output_path):
+    """Zapisuje pełny raport Excel (jak przycisk eksportu w programie)."""
+    from export_statistics import write_all_results_xlsx
+    write_all_results_xlsx(output_path, result.people, result.statistics, result.jubilees,
+                           result.marriages, result.unknown, round_birthdays=result.round_birthdays)
+
+def resolve_names_file(folder, names_path=None):
+    """Ustala plik imion: podany, imiona.json w folderze kartoteki albo obok programu."""
+    if names_path:
+        return names_path
+    for candidate in (os.path.join(folder, "imiona.json"), os.path.join(BASE_DIR, "imiona.json")):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+def profiled_analyze(args, names_dict, params, cache):
+    """Analiza z profilowaniem (cProfile + tracemalloc); raport trafia do folderu profiles."""
+    from kartoteka_core import AnalysisEngine
+    from profiling import AnalysisProfiler
+
+    info = {"Folder": args.folder, "Ustawienia": {key: value for key, value in params.items() if key != "workers"}}
+    with AnalysisProfiler("cli", output_dir=args.profile_dir, info=info) as profiler:
+        engine = AnalysisEngine(cache)
+        # Profil obejmuje tylko bieżący proces - pliki wczytywane szeregowo
+        with profiler.stage("wczytanie folderu"):
+            engine.scan(args.folder, workers=1)
+        with profiler.stage("analiza"):
+            result = engine.evaluate(names_dict, params)
+    if profiler.report_paths:
+        print(f"Profil analizy zapisano: {profiler.report_paths[1]}", file=sys.stderr)
+    return result
+
+def command_analyze(args):
+    """Polecenie analyze: analizuje folder i zapisuje wynik."""
+    from file_operations import load_names
+    from kartoteka_core import analyze
+    from parse_cache import ParseCache
+
+    if not os.path.isdir(args.folder):
+        logging.error(f"Folder nie istnieje: {args.folder}")
+        return 1
+    if args.format == "xlsx" and not args.output:
+        logging.error("Format xlsx wymaga podania pliku wynikowego (--output)")
+        return 2
+
+    names_file = resolve_names_file(args.folder, args.names)
+    names_dict = load_names(names_file) if names_file else {}
+    if not names_dict:
+        logging.error("Lista imion jest pusta. Sprawdź plik JSON (--names).")
+        return 1
+
+    # Lata jubileuszy i okrągłych urodzin z settings.json - jak w programie okienkowym
+    settings = load_settings()
+    params = {
+        "age_from": args.age_from,
+        "age_to": args.age_to,
+        "jubilee_days": args.jubilee_days,
+        "marriage_year_from": args.marriage_year_from,
+        "marriage_year_to": args.marriage_year_to,
+        "workers": args.workers,
+        "jubilee_milestones": parse_milestones(settings, "jubilee_milestones", DEFAULT_JUBILEE_MILESTONES, 100),
+        "birthday_milestones": parse_milestones(settings, "birthday_milestones", DEFAULT_BIRTHDAY_MILESTONES, 130),
+    }
+    cache = None if args.no_cache else ParseCache()
+    if args.profile:
+        result = profiled_analyze(args, names_dict, params, cache)
+    else:
+        result = analyze(args.folder, names_dict, params, cache=cache)
+    logging.info(f"Przeanalizowano plików: {result.files_scanned}, osób: {len(result.people)}, "
+                 f"błędów: {result.error_count}, ostrzeżeń: {result.warning_count}")
+
+    if args.format == "xlsx":
+        write_xlsx(result, args.output)
+        return 0
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8-sig" if args.format == "csv" else "utf-8", newline="") as out:
+            if args.format == "json":
+                write_json(result, out)
+            else:
+                write_csv(result, out, args.table)
+    elif args.format == "json":
+        write_json(result, sys.stdout)
+    else:
+        write_csv(result, sys.stdout, args.table)
+    return 0
+
+def import_times(module):
+    """
+    Mierzy import modułu w osobnym procesie (python -X importtime).
+
+    Zwraca listę (nazwa, czas_własny_us, czas_łączny_us, poziom) w kolejności importu;
+    poziom 0 oznacza moduł importowany bezpośrednio.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else f"kod wyjścia {completed.returncode}")
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Nagłówek
+        name = parts[2].rstrip()
+        level = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(parts[0]), int(parts[1]), level))
+    return entries
+
+def command_importtime(args):
+    """Polecenie importtime: podsumowanie czasu importu modułu programu."""
+    if getattr(sys, "frozen", False):
+        logging.error("Pomiar importu wymaga uruchomienia ze źródeł (python -m kartoteka).")
+        return 1
+    try:
+        entries = import_times(args.module)
+    except RuntimeError as e:
+        logging.error(f"Nie można zaimportować modułu {args.module}: {e}")
+        return 1
+
+    total = sum(cumulative for _, _, cumulative, level in entries if level == 0)
+    print(f"Import {args.module}: {total / 1000:.1f} ms, modułów: {len(entries)}")
+    print()
+    print(f"Najwolniejsze moduły (czas własny, top {args.top}):")
+    print(f"{'własny [ms]':>12} {'łączny [ms]':>12}  moduł")
+    for name, self_us, cumulative, _ in sorted(entries, key=lambda e: e[1], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:12.1f} {cumulative / 1000:12.1f}  {name}")
+    print()
+
+    loaded = {name: cumulative for name, _, cumulative, _ in entries}
+    heavy_loaded = [name for name in HEAVY_MODULES if name in loaded]
+    print("Ciężkie biblioteki:")
+    for name in HEAVY_MODULES:
+        if name in loaded:
+            print(f"  {name}: wczytana ({loaded[name] / 1000:.1f} ms)")
+        else:
+            print(f"  {name}: nie wczytana")
+    if args.fail_on_heavy and heavy_loaded:
+        return 1
+    return 0
+
+def build_parser():
+    """Tworzy parser argumentów wiersza poleceń."""
+    # Domyślne wartości z settings.json (jak w programie okienkowym)
+    settings = load_settings()
+
+    # Opcje wspólne dla wszystkich poleceń
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-v", "--verbose", action="store_true", help="wypisuj komunikaty informacyjne")
+
+    parser = argparse.ArgumentParser(prog="kartoteka", description="Kartoteka Parafialna - analiza z wiersza poleceń")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    analyze_parser = subparsers.add_parser("analyze", parents=[common], help="analizuje folder z kartotekami")
+    analyze_parser.add_argument("folder", help="folder z plikami Excel")
+    analyze_parser.add_argument("--age-from", type=int, default=settings.get("age_from", DEFAULT_AGE_FROM))
+    analyze_parser.add_argument("--age-to", type=int, default=settings.get("age_to", DEFAULT_AGE_TO))
+    analyze_parser.add_argument("--jubilee-days", type=int, default=settings.get("jubilee_days", DEFAULT_JUBILEE_DAYS))
+    analyze_parser.add_argument("--marriage-year-from", type=int, default=settings.get("marriage_year_from", 1900))
+    analyze_parser.add_argument("--marriage-year-to", type=int, default=settings.get("marriage_year_to", datetime.now().year))
+    analyze_parser.add_argument("--workers", type=int, default=settings.get("workers", DEFAULT_WORKERS),
+                                help="liczba procesów wczytujących pliki (0 = liczba rdzeni, 1 = szeregowo)")
+    analyze_parser.add_argument("--names", help="plik JSON z imionami (domyślnie imiona.json w folderze kartoteki)")
+    analyze_parser.add_argument("--no-cache", action="store_true", help="nie używaj pamięci podręcznej wczytanych plików")
+    analyze_parser.add_argument("--format", choices=["json", "csv", "xlsx"], default="json")
+    analyze_parser.add_argument("--table", choices=sorted(CSV_TABLES), default="jubilees",
+                                help="tabela zapisywana w formacie CSV (domyślnie jubilees)")
+    analyze_parser.add_argument("-o", "--output", help="plik wynikowy (domyślnie standardowe wyjście)")
+    # Bez domyślnej wartości z settings.json - profilowanie w programie okienkowym nie obejmuje analiz z wiersza poleceń
+    analyze_parser.add_argument("--profile", action="store_true",
+                                help="profiluj analizę (cProfile + tracemalloc), raport w folderze profiles")
+    analyze_parser.add_argument("--profile-dir", help="folder raportów profilowania (domyślnie profiles obok programu)")
+    analyze_parser.set_defaults(func=command_analyze)
+
+    importtime_parser = subparsers.add_parser("importtime", parents=[common],
+                                              help="mierzy czas importu modułu programu (python -X importtime)")
+    importtime_parser.add_argument("--module", default="gui_main", help="mierzony moduł (domyślnie gui_main)")
+    importtime_parser.add_argument("--top", type=int, default=15, help="liczba najwolniejszych modułów w raporcie")
+    importtime_parser.add_argument("--fail-on-heavy", action="store_true",
+                                   help="kod wyjścia 1, gdy moduł wczytuje pandas, numpy lub openpyxl")
+    importtime_parser.set_defaults(func=command_importtime)
+    return parser
+
+def main(argv=None):
+    """Punkt wejścia wiersza poleceń; zwraca kod wyjścia."""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(levelname)s: %(message)s",
+        stream=sys.stderr
+    )
+    if args.command == "analyze" and (args.age_from < 0 or args.age_to < 0 or args.age_from > args.age_to):
+        logging.error("Podano nieprawidłowy zakres wieku.")
+        return 2
+    return args.func(args)
+
+if __name__ == "__main__":
+    # Wymagane przez pulę procesów analizy w skompilowanym EXE (PyInstaller)
+    multiprocessing.freeze_support()
+    sys.exit(main())
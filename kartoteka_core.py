@@ -0,0 +1,802 @@
+"""
+Rdzeń analizy kartoteki - niezależny od interfejsu graficznego.
+
+Funkcja analyze wczytuje folder z kartotekami i zwraca obiekt AnalysisResult
+(osoby, jubileusze, śluby, nieznane imiona, log zdarzeń i statystyki).
+AnalysisEngine trzyma wczytane pliki w pamięci, aby zmiana ustawień
+wymagała tylko ponownego filtrowania.
+Moduł nie importuje tkinter, więc można go profilować, testować i uruchamiać
+bez wyświetlacza. MainWindow jedynie wyświetla gotowy wynik.
+"""
+import os
+import bisect
+from array import array
+from time import perf_counter
+from collections import Counter
+from datetime import datetime
+from config import DEFAULT_AGE_FROM, DEFAULT_AGE_TO, DEFAULT_JUBILEE_DAYS, DEFAULT_JUBILEE_MILESTONES, DEFAULT_BIRTHDAY_MILESTONES, DEFAULT_WORKERS
+from jubilee_calendar import JubileeCalendar, BirthdayIndex
+from data_processing import calculate_age, remove_diacritics, format_person_name, extract_number_from_text
+from file_operations import list_kartoteka_files
+from statistics import Statistics
+
+# Poziomy zdarzeń analizy (od najważniejszego) i tagi formatowania w panelu wyników
+EVENT_LEVELS = ("ERROR", "WARNING", "INFO")
+EVENT_TAGS = {"ERROR": "error", "WARNING": "warning", "INFO": "info"}
+
+# Pola osoby wyliczane raz przy analizie (wyświetlanie, sortowanie, filtr) - nie trafiają do eksportu JSON
+PERSON_DERIVED_KEYS = ("imie_fmt", "nazwisko_fmt", "imie_klucz", "nazwisko_klucz", "stary_numer")
+
+def person_derived_fields(given_name, surname, old_address):
+    """
+    Pola osoby liczone raz, przy wyodrębnieniu z arkusza.
+
+    imie_fmt/nazwisko_fmt - do wyświetlenia (format_person_name),
+    imie_klucz/nazwisko_klucz - do sortowania i filtra (małe litery, bez polskich znaków),
+    stary_numer - pierwsza liczba ze starego adresu (None, gdy brak).
+    """
+    imie = format_person_name(given_name)
+    nazwisko = format_person_name(surname)
+    return {
+        "imie_fmt": imie,
+        "nazwisko_fmt": nazwisko,
+        "imie_klucz": remove_diacritics(imie),
+        "nazwisko_klucz": remove_diacritics(nazwisko),
+        "stary_numer": extract_number_from_text(old_address),
+    }
+
+# Klucze sortowania listy osób (okno wyników, zapis do XLSX)
+PEOPLE_SORT_KEYS = {
+    "wiek": lambda p: (p.get("wiek") is None, p.get("wiek")),
+    "adres": lambda p: (p.get("adres") or "").lower(),
+    "stary_adres": lambda p: (p.get("old_address") or "").lower(),
+    "stary_numer": lambda p: (p.get("old_address") is None,
+                              p["stary_numer"] if p["stary_numer"] is not None else float("inf")),
+    "alfabetycznie": lambda p: (p["nazwisko_klucz"], p["imie_klucz"]),
+}
+
+class PeopleIndex:
+    """
+    Lista osób z kolejnościami sortowania liczonymi raz.
+
+    Każda kolejność to permutacja indeksów listy (array) zapamiętywana przy
+    pierwszym użyciu - ponowne sortowanie i zapis to tylko przejście po
+    permutacji. Filtr po początku imienia lub nazwiska korzysta z posortowanych
+    kluczy (imie_klucz, nazwisko_klucz) i bisect - zakres pasujących osób
+    bez przeglądania całej listy. Lista osób nie może się zmieniać (po zmianie
+    - nowy PeopleIndex).
+    """
+    PREFIX_FIELDS = ("imie_klucz", "nazwisko_klucz")
+
+    def __init__(self, people):
+        self.people = people
+        self._orders = {}  # Klucz sortowania -> permutacja indeksów people
+        self._prefix_keys = None  # [(posortowane klucze, array indeksów osób)] dla PREFIX_FIELDS
+
+    def order(self, sort_key):
+        """Permutacja indeksów osób dla klucza z PEOPLE_SORT_KEYS (None - kolejność analizy)."""
+        if not sort_key:
+            return range(len(self.people))
+        order = self._orders.get(sort_key)
+        if order is None:
+            key = PEOPLE_SORT_KEYS[sort_key]
+            people = self.people
+            order = self._orders[sort_key] = array("l", sorted(range(len(people)), key=lambda i: key(people[i])))
+        return order
+
+    def sorted(self, sort_key=None):
+        """Lista osób w kolejności sortowania."""
+        people = self.people
+        return [people[i] for i in self.order(sort_key)]
+
+    def _build_prefix_keys(self):
+        people = self.people
+        self._prefix_keys = []
+        for field in self.PREFIX_FIELDS:
+            ids = sorted(range(len(people)), key=lambda i: people[i][field])
+            self._prefix_keys.append(([people[i][field] for i in ids], array("l", ids)))
+
+    def prefix_matches(self, prefix):
+        """
+        Indeksy osób, których imię lub nazwisko zaczyna się od prefix (set).
+
+        prefix musi być znormalizowany jak klucze (remove_diacritics).
+        """
+        if self._prefix_keys is None:
+            self._build_prefix_keys()
+        matches = set()
+        for keys, ids in self._prefix_keys:
+            start = bisect.bisect_left(keys, prefix)
+            end = bisect.bisect_left(keys, prefix + "\U0010ffff", start)
+            matches.update(ids[start:end])
+        return matches
+
+    def filtered_order(self, sort_key=None, prefix=""):
+        """Indeksy osób w kolejności sortowania, ograniczone do pasujących do prefix (pusty - wszystkie)."""
+        order = self.order(sort_key)
+        if not prefix:
+            return order
+        matches = self.prefix_matches(prefix)
+        if len(matches) == len(self.people):
+            return order
+        return [i for i in order if i in matches]
+
+# Początek komunikatu zdarzenia znalezionej osoby (zdarzenia kończące arkusz)
+FOUND_PERSON_PREFIX = "Znaleziona osoba: "
+
+class AnalysisEvent:
+    """
+    Zdarzenie analizy: plik, arkusz, poziom, komunikat i opcjonalna komórka.
+
+    file_id to indeks pliku w AnalysisResult.event_files (None dla zdarzeń
+    spoza plików), sheet - nazwa arkusza (None dla zdarzeń całego pliku),
+    cell - adres komórki w arkuszu, np. "C12".
+    """
+    __slots__ = ("file_id", "sheet", "level", "message", "cell")
+
+    def __init__(self, file_id, sheet, level, message, cell=None):
+        self.file_id = file_id
+        self.sheet = sheet
+        self.level = level
+        self.message = message
+        self.cell = cell
+
+    def text(self):
+        """Treść zdarzenia z poziomem i komórką, np. "[ERROR] Błędna data ... (komórka C12)"."""
+        cell = f" (komórka {self.cell})" if self.cell else ""
+        return f"[{self.level}] {self.message}{cell}"
+
+    def __repr__(self):
+        return f"AnalysisEvent({self.file_id!r}, {self.sheet!r}, {self.level!r}, {self.message!r}, {self.cell!r})"
+
+def found_person_event(file_id, sheet_name, person, sheet_row):
+    """Zdarzenie INFO znalezionej osoby (komórka z imieniem w kolumnie B)."""
+    plec_str = "K" if person.get("plec") == "K" else "M"
+    return AnalysisEvent(file_id, sheet_name, "INFO",
+                         f"{FOUND_PERSON_PREFIX}{person['imie_fmt']} {person['nazwisko_fmt']}, wiek: {person.get('wiek', '')}, płeć: {plec_str}",
+                         f"B{sheet_row}")
+
+class AnalysisResult:
+    """Wynik analizy folderu kartoteki."""
+
+    def __init__(self, folder_path="", params=None):
+        self.folder_path = folder_path
+        self.params = params or default_params()
+        self.people = []  # Znalezione osoby
+        self.jubilees = []  # Nadchodzące jubileusze
+        self.birthdays = BirthdayIndex(self.params.get("birthday_milestones", DEFAULT_BIRTHDAY_MILESTONES))  # Daty urodzenia całej kartoteki
+        self.round_birthdays = []  # Nadchodzące okrągłe urodziny (90, 95, 100+)
+        self.marriages = []  # Śluby w zakresie lat
+        self.unknown = {}  # Nieznane imiona -> lista lokalizacji
+        self.events = []  # Zdarzenia analizy (AnalysisEvent) w kolejności plików
+        # Przeanalizowane pliki (indeks = file_id): name, path, start/end - zakres zdarzeń pliku w events,
+        # females/males - liczba osób (None, gdy pliku nie można było wczytać), sheets - nazwy arkuszy w kolejności
+        self.event_files = []
+        self.statistics = Statistics()
+        self.files_scanned = 0
+        self.total_females = 0
+        self.total_males = 0
+        self.error_count = 0
+        self.warning_count = 0
+        # Indeks do aktualizacji wyniku bez ponownej analizy (promote_name)
+        self.person_order = []  # Numer kolejny wiersza każdej osoby z people
+        self.unknown_rows = {}  # Nieznane imię -> [(numer wiersza, dane osoby, (plik, arkusz), file_id, wiersz arkusza)]
+        self.unknown_events = {}  # Nieznane imię -> zdarzenie ostrzeżenia "Nieznane imię" w events
+        self.sheet_sizes = {}  # (plik, arkusz) -> liczba znalezionych osób
+        self._people_index = None
+
+    @property
+    def people_index(self):
+        """Kolejności sortowania osób (PeopleIndex, tworzony przy pierwszym użyciu)."""
+        if self._people_index is None:
+            self._people_index = PeopleIndex(self.people)
+        return self._people_index
+
+    def promote_name(self, normalized_word, gender):
+        """
+        Przenosi wiersze z imieniem właśnie dodanym do słownika do znalezionych osób.
+
+        Aktualizuje people, statystyki, liczniki i unknown na miejscu - bez odczytu
+        plików i bez ponownej analizy. Zwraca liczbę dodanych osób.
+        Wiek osób z datą 99/99/9999 policzony wcześniej nie jest przeliczany.
+        """
+        rows = self.unknown_rows.pop(normalized_word, None)
+        self.unknown.pop(normalized_word, None)
+        warning_event = self.unknown_events.pop(normalized_word, None)
+        if not rows:
+            return 0
+
+        self._people_index = None  # Lista osób się zmienia - kolejności sortowania liczone od nowa
+        added_per_sheet = Counter()
+        found_events = {}  # file_id -> {arkusz: [zdarzenia "Znaleziona osoba"]}
+        for row_number, entry, sheet_key, file_id, sheet_row in rows:
+            person_entry = dict(entry, plec=gender)
+            # Zachowaj kolejność osób taką jak przy pełnej analizie
+            position = bisect.bisect(self.person_order, row_number)
+            self.person_order.insert(position, row_number)
+            self.people.insert(position, person_entry)
+            self.statistics.add_person(person_entry)
+            added_per_sheet[sheet_key] += 1
+            found_events.setdefault(file_id, {}).setdefault(sheet_key[1], []).append(
+                found_person_event(file_id, sheet_key[1], person_entry, sheet_row))
+            file_info = self.event_files[file_id]
+            if gender == "K":
+                self.total_females += 1
+                file_info["females"] += 1
+            elif gender == "M":
+                self.total_males += 1
+                file_info["males"] += 1
+
+        # Arkusz zmienia kategorię wielkości rodziny
+        for sheet_key, added in added_per_sheet.items():
+            old_size = self.sheet_sizes.get(sheet_key, 0)
+            if old_size:
+                self.statistics.add_family_by_size(old_size, count=-1)
+            self.sheet_sizes[sheet_key] = old_size + added
+            self.statistics.add_family_by_size(old_size + added)
+
+        # Ostrzeżenie o nieznanym imieniu przestaje obowiązywać - log jak przy pełnej analizie
+        self.statistics.resolve_unknown_name()
+        self.warning_count -= 1
+        self._update_events(warning_event, found_events)
+        self.events.append(AnalysisEvent(None, None, "INFO", f"Dodano imię '{normalized_word}' ({gender}) - dołączone osoby: {len(rows)}"))
+        return len(rows)
+
+    def _update_events(self, removed_event, found_events):
+        """
+        Usuwa zdarzenie z events i dołącza zdarzenia znalezionych osób pod ich arkusze.
+
+        found_events: file_id -> {arkusz: [zdarzenia]}. Zdarzenia "Znaleziona osoba"
+        kończą zdarzenia arkusza i są uporządkowane według wierszy (jak w evaluate);
+        zakresy start/end plików w event_files są przeliczane.
+        """
+        events = self.events
+        changed = set(found_events)
+        if removed_event is not None:
+            changed.add(removed_event.file_id)
+        last_end = self.event_files[-1]["end"] if self.event_files else 0
+        new_events = []
+        for file_id, file_info in enumerate(self.event_files):
+            segment = events[file_info["start"]:file_info["end"]]
+            file_info["start"] = len(new_events)
+            if file_id in changed:
+                # Zdarzenia pliku według arkuszy (w kolejności arkuszy w pliku)
+                groups = {None: []}
+                for event in segment:
+                    if event is not removed_event:
+                        groups.setdefault(event.sheet, []).append(event)
+                for sheet, added in found_events.get(file_id, {}).items():
+                    group = groups.setdefault(sheet, [])
+                    tail = len(group)
+                    while tail and group[tail - 1].message.startswith(FOUND_PERSON_PREFIX):
+                        tail -= 1
+                    group[tail:] = sorted(group[tail:] + added, key=lambda event: int(event.cell[1:]))
+                segment = groups[None] + [event for sheet in file_info["sheets"] for event in groups.get(sheet, ())]
+            new_events.extend(segment)
+            file_info["end"] = len(new_events)
+        # Zdarzenia spoza plików
+        new_events.extend(event for event in events[last_end:] if event is not removed_event)
+        self.events = new_events
+
+    def event_log(self):
+        """
+        Log analizy do wyświetlenia jako tekst: fragmenty (tekst, tag, ścieżka_pliku).
+
+        Wiersz nagłówka pliku ma ścieżkę pliku (link), zdarzenia arkusza są
+        grupowane pod nagłówkiem arkusza, a plik kończy podsumowanie liczby osób.
+        """
+        events = self.events
+        end = 0
+        for file_id, file_info in enumerate(self.event_files):
+            yield (f"{file_id + 1}. [INFO] Analiza pliku: {file_info['name']}\n", "link", file_info["path"])
+            sheet = None
+            for event in events[file_info["start"]:file_info["end"]]:
+                if event.sheet is None:
+                    yield (f"  {event.text()}\n", EVENT_TAGS[event.level], None)
+                    continue
+                if event.sheet != sheet:
+                    sheet = event.sheet
+                    yield (f"  [INFO] Analiza arkusza: {sheet}\n", "info", None)
+                yield (f"    {event.text()}\n", EVENT_TAGS[event.level], None)
+            end = file_info["end"]
+            if file_info["females"] is None:
+                continue
+            # Podsumowanie pliku z podświetleniem zer
+            file_k, file_m = file_info["females"], file_info["males"]
+            yield ("  [INFO] Wynik dla pliku: Kobiety=", "bold", None)
+            yield (f"{file_k}", "error" if file_k == 0 else "bold", None)
+            yield (", Mężczyźni=", "bold", None)
+            yield (f"{file_m}", "error" if file_m == 0 else "bold", None)
+            yield ("\n", "bold", None)
+            yield ("-" * 50 + "\n", None, None)
+        # Zdarzenia po analizie (dodane imiona, profil analizy)
+        for event in events[end:]:
+            yield (f"{event.text()}\n", EVENT_TAGS[event.level], None)
+
+def default_params():
+    """Zwraca domyślne parametry analizy."""
+    return {
+        "age_from": DEFAULT_AGE_FROM,
+        "age_to": DEFAULT_AGE_TO,
+        "jubilee_days": DEFAULT_JUBILEE_DAYS,
+        "jubilee_milestones": DEFAULT_JUBILEE_MILESTONES,
+        "birthday_milestones": DEFAULT_BIRTHDAY_MILESTONES,
+        "marriage_year_from": 1900,
+        "marriage_year_to": datetime.now().year,
+        "workers": DEFAULT_WORKERS,
+    }
+
+def _merge_params(params):
+    """Uzupełnia parametry analizy wartościami domyślnymi."""
+    merged_params = default_params()
+    if params:
+        merged_params.update({k: v for k, v in params.items() if v is not None})
+    return merged_params
+
+def load_folder(folder_path, workers=None, cache=None):
+    """
+    Wczytuje wszystkie pliki kartoteki z folderu.
+
+    Pliki są wczytywane równolegle (pula procesów), a wynik ma stałą kolejność
+    plików: lista krotek (nazwa_pliku, ścieżka, wynik parse_kartoteka_file).
+    """
+    # Moduł wczytujący (pandas, numpy, openpyxl) jest importowany dopiero przy wczytywaniu
+    from kartoteka_parser import parse_files
+    kartoteka_files = list_kartoteka_files(folder_path)
+    file_paths = [file_path for _, file_path in kartoteka_files]
+    parsed_files = parse_files(file_paths, workers=workers, cache=cache)
+    if cache is not None:
+        cache.prune(folder_path, file_paths)
+        cache.save()
+    return [(filename, file_path, parsed) for (filename, file_path), parsed in zip(kartoteka_files, parsed_files)]
+
+def analyze(folder_path, names_dict, params=None, cache=None):
+    """
+    Analizuje wszystkie pliki kartoteki w folderze.
+
+    Args:
+        folder_path: Folder z plikami Excel
+        names_dict: Słownik imion (znormalizowane imię -> płeć "K"/"M")
+        params: Parametry analizy (patrz default_params); brakujące klucze mają wartości domyślne
+        cache: Opcjonalna pamięć podręczna wczytanych plików (ParseCache)
+
+    Returns:
+        AnalysisResult
+    """
+    params = _merge_params(params)
+    scan_start = perf_counter()
+    files = load_folder(folder_path, workers=params["workers"], cache=cache)
+    return evaluate(files, folder_path, names_dict, params, scan_seconds=perf_counter() - scan_start)
+
+def evaluate(files, folder_path, names_dict, params=None, calendar=None, scan_seconds=0.0, read_paths=None):
+    """
+    Filtruje wczytane pliki: wiek, słownik imion, jubileusze, śluby i statystyki.
+
+    Nie czyta plików z dysku - działa na wyniku load_folder, więc zmiana
+    ustawień (zakres wieku, dni jubileuszy, lata ślubów) trwa milisekundy.
+    calendar - gotowy JubileeCalendar tych plików (gdy brak, jest budowany).
+    scan_seconds - czas wczytania plików przed filtrowaniem, wliczany do czasu analizy.
+    read_paths - pliki wczytane z dysku w tej analizie (tylko ich czasy trafiają do
+    statystyk); None - wszystkie pliki spoza pamięci podręcznej.
+    """
+    params = _merge_params(params)
+
+    result = AnalysisResult(folder_path, params)
+    statistics = result.statistics
+    statistics.start_analysis(scan_seconds)  # Rozpocznij zbieranie statystyk (z czasem wczytania plików)
+
+    age_from = params["age_from"]
+    age_to = params["age_to"]
+    jubilee_days = params["jubilee_days"]
+    marriage_year_from = params["marriage_year_from"]
+    marriage_year_to = params["marriage_year_to"]
+
+    people = result.people
+    events = result.events
+    jubilees_found = result.jubilees
+    marriages_in_range = result.marriages
+    all_unknown = result.unknown
+    birthdays = result.birthdays
+    person_order = result.person_order
+    unknown_rows = result.unknown_rows
+    row_number = 0  # Numer kolejny wiersza osoby w całej kartotece
+    unknown_names = set()  # Zbiór nieznanych imion
+    total_m = 0
+    total_k = 0
+    error_count = 0
+    warning_count = 0
+    scanned_files_count = 0
+    today = datetime.today().date()  # Jedna data odniesienia dla wieku wszystkich osób
+    normalized_names = {}  # Imię z kartoteki -> klucz słownika imion (liczony raz na imię)
+
+    event_files = result.event_files
+    for filename, file_path, parsed in files:
+        file_id = len(event_files)
+        file_info = {"name": filename, "path": file_path, "start": len(events), "end": len(events),
+                     "females": None, "males": None, "sheets": [sheet["name"] for sheet in parsed["sheets"]]}
+        event_files.append(file_info)
+        scanned_files_count += 1
+        statistics.add_file()  # Zlicz plik
+        if parsed.get("cached") or (read_paths is not None and file_path not in read_paths):
+            statistics.add_file_not_read()
+        elif parsed.get("timings"):
+            statistics.add_file_timings(file_path, parsed["timings"], len(parsed["sheets"]))
+
+        if parsed["error"] is not None:
+            events.append(AnalysisEvent(file_id, None, "ERROR", f"Nie można wczytać pliku: {parsed['error']}"))
+            error_count += 1
+            file_info["end"] = len(events)
+            continue
+
+        file_m = 0
+        file_k = 0
+
+        for sheet in parsed["sheets"]:
+            sheet_name = sheet["name"]
+            if sheet["error"] is not None:
+                events.append(AnalysisEvent(file_id, sheet_name, "ERROR", f"Nie można wczytać arkusza: {sheet['error']}"))
+                error_count += 1
+                statistics.add_error()  # Zlicz błąd
+                continue
+
+            statistics.add_sheet()  # Zlicz arkusz
+
+            surname = sheet["surname"]
+            if surname:
+                events.append(AnalysisEvent(file_id, sheet_name, "INFO", f"Nazwisko: {surname}"))
+            address = sheet["address"]
+            if address:
+                events.append(AnalysisEvent(file_id, sheet_name, "INFO", f"Adres: {address}"))
+            old_address = sheet["old_address"]
+            if old_address:
+                events.append(AnalysisEvent(file_id, sheet_name, "INFO", f"Adres stary: {old_address}"))
+
+            # Informacje o ślubie małżonków
+            if sheet["husband"] and sheet["wife"]:
+                events.append(AnalysisEvent(file_id, sheet_name, "INFO", f"Mąż: {sheet['husband']}, Żona: {sheet['wife']}"))
+            if sheet["marriage_date"]:
+                events.append(AnalysisEvent(file_id, sheet_name, "INFO", f"Data ślubu: {sheet['marriage_date']}"))
+                try:
+                    marriage_year = datetime.fromisoformat(sheet["marriage_date"]).year
+                    statistics.add_marriage_year(marriage_year)
+                    if marriage_year_from <= marriage_year <= marriage_year_to:
+                        marriages_in_range.append({
+                            "surname": surname,
+                            "husband": sheet["husband"],
+                            "wife": sheet["wife"],
+                            "date": sheet["marriage_date"],
+                            "year": marriage_year,
+                            "address": address,
+                            "old_address": old_address,
+                            "file_path": file_path
+                        })
+                except Exception:
+                    pass
+
+            # Informacje o ślubie dziadków
+            gp_marriage_date = sheet["gp_marriage_date"]
+            if gp_marriage_date:
+                events.append(AnalysisEvent(file_id, sheet_name, "INFO", f"Data ślubu dziadków: {gp_marriage_date}"))
+                try:
+                    gp_marriage_year = datetime.fromisoformat(gp_marriage_date).year
+                    statistics.add_marriage_year(gp_marriage_year)
+                    if marriage_year_from <= gp_marriage_year <= marriage_year_to:
+                        marriages_in_range.append({
+                            "surname": surname,
+                            "husband": "Dziadek",
+                            "wife": "Babcia",
+                            "date": gp_marriage_date,
+                            "year": gp_marriage_year,
+                            "address": address,
+                            "old_address": old_address,
+                            "file_path": file_path,
+                            "type": "DZIADKOWIE"
+                        })
+                except Exception:
+                    pass
+
+            sheet_people = []
+            for given_name, second_member, birth_text, date_issue, birth_date, sheet_row in sheet["people"]:
+                date_cell = f"C{sheet_row}"
+                # Brak daty urodzenia
+                if birth_text is None:
+                    events.append(AnalysisEvent(file_id, sheet_name, "WARNING", f"Brak daty urodzenia dla '{given_name}'", date_cell))
+                    warning_count += 1
+                    statistics.add_warning()  # Zlicz ostrzeżenie
+                    continue
+
+                # Wzorzec daty w komórce, ale data niepoprawna
+                if date_issue:
+                    issue_tag, error_msg = date_issue
+                    if issue_tag == "warning":
+                        events.append(AnalysisEvent(file_id, sheet_name, "WARNING", f"Błędna data dla '{given_name}': {birth_text} - {error_msg}", date_cell))
+                        warning_count += 1
+                        statistics.add_warning()  # Zlicz ostrzeżenie
+                    else:
+                        events.append(AnalysisEvent(file_id, sheet_name, "ERROR", f"Błędna data dla '{given_name}': {birth_text} - {error_msg}", date_cell))
+                        error_count += 1
+                        statistics.add_error()  # Zlicz błąd
+
+                if not birth_date:
+                    events.append(AnalysisEvent(file_id, sheet_name, "WARNING", f"Nie można odczytać daty urodzenia dla '{given_name}': {birth_text}", date_cell))
+                    warning_count += 1
+                    statistics.add_warning()  # Zlicz ostrzeżenie
+                    continue
+
+                # Dodaj rok urodzenia do statystyk
+                try:
+                    birth_year = birth_date.year
+                    statistics.add_birth_year(birth_year)
+                except Exception:
+                    pass
+
+                # Specjalna obsługa daty umownej: przypisz medianę wieku lub 40
+                if birth_date == "MEDIANA_WIEKU":
+                    # Mediana z dotychczasowych osób (40 gdy brak)
+                    age = statistics.get_current_median_age()
+                else:
+                    age = calculate_age(birth_date, today)
+                    # Indeks urodzin obejmuje całą kartotekę (niezależnie od filtra wieku)
+                    birthdays.add(birth_date, {
+                        "imie": given_name,
+                        "nazwisko": format_person_name(second_member) if second_member else surname,
+                        "adres": address,
+                        "old_address": old_address,
+                        "file_path": file_path
+                    })
+                if age is None or not (age_from <= age <= age_to):
+                    continue
+                row_number += 1
+
+                normalized_word = normalized_names.get(given_name)
+                if normalized_word is None:
+                    normalized_word = remove_diacritics(given_name.strip().lower())
+                    normalized_names[given_name] = normalized_word
+                if normalized_word in names_dict:
+                    plec = names_dict[normalized_word]
+
+                    if plec == "K":
+                        file_k += 1
+                    elif plec == "M":
+                        file_m += 1
+
+                    final_surname = format_person_name(second_member) if second_member else surname
+
+                    person_entry = {
+                        "imie": given_name,
+                        "nazwisko": final_surname,
+                        "adres": address,
+                        "old_address": old_address,
+                        "wiek": age,
+                        "plec": plec,
+                        "file": filename,
+                        "file_path": file_path
+                    }
+                    person_entry.update(person_derived_fields(given_name, final_surname, old_address))
+                    people.append(person_entry)
+                    person_order.append(row_number)
+                    sheet_people.append((person_entry, sheet_row))
+                    statistics.add_person(person_entry)  # Dodaj osobę do statystyk
+                else:
+                    # Nieznane imię - dodaj do zbioru i zapisz ostrzeżenie
+                    if normalized_word not in unknown_names:
+                        unknown_names.add(normalized_word)
+                        unknown_event = AnalysisEvent(file_id, sheet_name, "WARNING", f"Nieznane imię '{given_name}' - dodaj do słownika imiona.json", f"B{sheet_row}")
+                        events.append(unknown_event)
+                        result.unknown_events[normalized_word] = unknown_event
+                        warning_count += 1
+                        statistics.add_warning()  # Zlicz ostrzeżenie
+                        statistics.add_unknown_name()  # Zlicz nieznane imię
+                    
+                    # Dodaj lokalizację nieznanegoienia do słownika all_unknown
+                    location_key = f"{file_path} -> {sheet_name}"
+                    if normalized_word not in all_unknown:
+                        all_unknown[normalized_word] = []
+                    if location_key not in all_unknown[normalized_word]:
+                        all_unknown[normalized_word].append(location_key)
+
+                    # Zapamiętaj wiersz - po dodaniu imienia do słownika trafi do osób
+                    final_surname = format_person_name(second_member) if second_member else surname
+                    unknown_entry = {
+                        "imie": given_name,
+                        "nazwisko": final_surname,
+                        "adres": address,
+                        "old_address": old_address,
+                        "wiek": age,
+                        "plec": None,
+                        "file": filename,
+                        "file_path": file_path
+                    }
+                    unknown_entry.update(person_derived_fields(given_name, final_surname, old_address))
+                    unknown_rows.setdefault(normalized_word, []).append((row_number, unknown_entry, (file_path, sheet_name), file_id, sheet_row))
+
+            # Wyświetl znalezione osoby z arkusza
+            if sheet_people:
+                for person, sheet_row in sheet_people:
+                    events.append(found_person_event(file_id, sheet_name, person, sheet_row))
+                # Dodaj rodzinę na podstawie liczby osób w arkuszu
+                statistics.add_family_by_size(len(sheet_people))
+                result.sheet_sizes[(file_path, sheet_name)] = len(sheet_people)
+
+        total_k += file_k
+        total_m += file_m
+        file_info["females"] = file_k
+        file_info["males"] = file_m
+        file_info["end"] = len(events)
+
+    # Jubileusze z kalendarza rocznic - jedno wyszukiwanie dla całej kartoteki
+    jubilee_start = perf_counter()
+    if calendar is None:
+        calendar = JubileeCalendar.from_files(files, params["jubilee_milestones"])
+    jubilees_found.extend(calendar.upcoming(today, jubilee_days, marriage_year_from=marriage_year_from, marriage_year_to=marriage_year_to))
+    for _ in jubilees_found:
+        statistics.add_jubilee()  # Zlicz jubileusz
+
+    # Okrągłe urodziny w tym samym oknie dni co jubileusze
+    birthdays.sort()
+    result.round_birthdays = birthdays.upcoming(today, jubilee_days)
+    statistics.add_stage_time("jubilee", perf_counter() - jubilee_start)
+
+    statistics.end_analysis()
+
+    result.files_scanned = scanned_files_count
+    result.total_females = total_k
+    result.total_males = total_m
+    result.error_count = error_count
+    result.warning_count = warning_count
+    return result
+
+class MarriageIndex:
+    """
+    Śluby małżonków i dziadków ze wszystkich arkuszy, posortowane według roku.
+
+    Wyszukanie ślubów z zakresu lat to dwa wyszukiwania binarne (bisect) -
+    bez odczytu plików.
+    """
+
+    def __init__(self, records, files_count=0):
+        self.records = sorted(records, key=lambda m: m["year"])
+        self.years = [m["year"] for m in self.records]
+        self.files_count = files_count
+
+    @classmethod
+    def from_files(cls, files):
+        """Buduje indeks z wczytanych plików (lista krotek jak z load_folder)."""
+        records = []
+        for filename, file_path, parsed in files:
+            if parsed["error"] is not None:
+                continue
+            for sheet in parsed["sheets"]:
+                if sheet["error"] is not None:
+                    continue
+                couples = (
+                    (sheet["marriage_date"], sheet["husband"], sheet["wife"], "MAŁŻONKOWIE"),
+                    (sheet["gp_marriage_date"], "Dziadek", "Babcia", "DZIADKOWIE"),
+                )
+                for date, husband, wife, marriage_type in couples:
+                    if not date:
+                        continue
+                    try:
+                        year = datetime.fromisoformat(date).year
+                    except (ValueError, TypeError):
+                        continue
+                    records.append({
+                        "surname": sheet["surname"] or os.path.splitext(filename)[0],
+                        "husband": husband,
+                        "wife": wife,
+                        "date": date,
+                        "year": year,
+                        "address": sheet["address"],
+                        "old_address": sheet["old_address"],
+                        "file_path": file_path,
+                        "type": marriage_type
+                    })
+        return cls(records, files_count=len(files))
+
+    @classmethod
+    def from_folder(cls, folder_path, cache=None, workers=None):
+        """Wczytuje folder i buduje indeks (pamięć podręczna jest tylko odczytywana)."""
+        from kartoteka_parser import parse_files
+        kartoteka_files = list_kartoteka_files(folder_path)
+        parsed_files = parse_files([file_path for _, file_path in kartoteka_files], workers=workers, cache=cache)
+        return cls.from_files([(filename, file_path, parsed) for (filename, file_path), parsed in zip(kartoteka_files, parsed_files)])
+
+    def between(self, year_from, year_to):
+        """Zwraca śluby z lat year_from..year_to (włącznie), posortowane według roku."""
+        start = bisect.bisect_left(self.years, year_from)
+        end = bisect.bisect_right(self.years, year_to)
+        return self.records[start:end]
+
+    def __len__(self):
+        return len(self.records)
+
+class AnalysisEngine:
+    """
+    Przechowuje wczytaną kartotekę w pamięci między analizami.
+
+    scan wczytuje folder (z pamięci podręcznej lub z plików), a evaluate
+    ponownie filtruje dane w pamięci - bez odczytu plików.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.folder_path = None
+        self.files = []  # (nazwa_pliku, ścieżka, wynik parse_kartoteka_file)
+        self._marriage_index = None  # (lista files, MarriageIndex) - budowany przy pierwszym użyciu
+        self._jubilee_calendar = None  # (lista files, jubileusze, JubileeCalendar)
+        self.scan_seconds = 0.0  # Czas wczytania plików, jeszcze niewliczony do wyniku evaluate
+        self.read_paths = set()  # Pliki wczytane z dysku od ostatniego evaluate (pomiar czasów etapów)
+
+    def is_loaded(self, folder_path):
+        """Czy folder jest już wczytany do pamięci."""
+        return self.folder_path is not None and os.path.normcase(os.path.abspath(self.folder_path)) == os.path.normcase(os.path.abspath(folder_path))
+
+    def scan(self, folder_path, workers=None):
+        """Wczytuje wszystkie pliki folderu do pamięci."""
+        scan_start = perf_counter()
+        self.files = load_folder(folder_path, workers=workers, cache=self.cache)
+        self.folder_path = folder_path
+        self.read_paths.update(file_path for _, file_path, parsed in self.files if not parsed.get("cached"))
+        self.scan_seconds += perf_counter() - scan_start
+
+    def reload_files(self, file_paths, workers=None):
+        """
+        Odświeża wczytany folder po zmianach plików (edycja, dodanie, usunięcie).
+
+        Wczytywane są tylko wskazane pliki oraz pliki nowe w folderze; pozostałe
+        zostają w pamięci, a kolejność plików jest taka jak przy pełnym wczytaniu.
+        """
+        from kartoteka_parser import parse_files
+        scan_start = perf_counter()
+        changed = set(file_paths)
+        loaded = {file_path: parsed for _, file_path, parsed in self.files}
+        kartoteka_files = list_kartoteka_files(self.folder_path)
+        to_parse = [file_path for _, file_path in kartoteka_files if file_path in changed or file_path not in loaded]
+        reparsed = dict(zip(to_parse, parse_files(to_parse, workers=workers, cache=self.cache)))
+        self.read_paths.update(file_path for file_path, parsed in reparsed.items() if not parsed.get("cached"))
+        self.files = [
+            (filename, file_path, reparsed[file_path] if file_path in reparsed else loaded[file_path])
+            for filename, file_path in kartoteka_files
+        ]
+        if self.cache is not None:
+            self.cache.prune(self.folder_path, [file_path for _, file_path in kartoteka_files])
+            self.cache.save()
+        self.scan_seconds += perf_counter() - scan_start
+
+    def marriage_index(self):
+        """Zwraca indeks ślubów wczytanego folderu (przebudowywany po zmianie plików)."""
+        files = self.files
+        if self._marriage_index is None or self._marriage_index[0] is not files:
+            self._marriage_index = (files, MarriageIndex.from_files(files))
+        return self._marriage_index[1]
+
+    def jubilee_calendar(self, milestones=DEFAULT_JUBILEE_MILESTONES):
+        """Zwraca kalendarz rocznic wczytanego folderu (przebudowywany po zmianie plików)."""
+        files = self.files
+        milestones = tuple(milestones)
+        cached = self._jubilee_calendar
+        if cached is None or cached[0] is not files or cached[1] != milestones:
+            self._jubilee_calendar = cached = (files, milestones, JubileeCalendar.from_files(files, milestones))
+        return cached[2]
+
+    def evaluate(self, names_dict, params=None):
+        """
+        Analizuje wczytane dane z podanymi ustawieniami.
+
+        Czas wczytania plików od poprzedniego evaluate (scan, reload_files)
+        jest wliczany do czasu analizy, a czasy etapów są liczone tylko dla plików
+        wtedy wczytanych; samo ponowne filtrowanie mierzy tylko filtrowanie.
+        """
+        params = _merge_params(params)
+        calendar = self.jubilee_calendar(params["jubilee_milestones"])
+        scan_seconds, self.scan_seconds = self.scan_seconds, 0.0
+        read_paths, self.read_paths = self.read_paths, set()
+        return evaluate(self.files, self.folder_path, names_dict, params, calendar=calendar,
+                        scan_seconds=scan_seconds, read_paths=read_paths)
+
+    def analyze(self, folder_path, names_dict, params=None, rescan=True):
+        """Analizuje folder; bez rescan wczytany wcześniej folder nie jest czytany ponownie."""
+        params = _merge_params(params)
+        if rescan or not self.is_loaded(folder_path):
+            self.scan(folder_path, workers=params["workers"])
+        return self.evaluate(names_dict, params)
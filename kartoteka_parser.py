@@ -0,0 +1,472 @@
+"""
+Moduł do wczytywania kartotek (plików Excel) - także równolegle w puli procesów.
+
+Każdy plik jest przetwarzany niezależnie przez parse_kartoteka_file, która zwraca
+słownik z danymi wyodrębnionymi z arkuszy (nazwisko, adresy, śluby, osoby).
+Wynik zawiera wyłącznie proste typy, więc można go przesłać między procesami.
+Łączenie wyników (wiek, słownik imion, statystyki) odbywa się w procesie głównym,
+zawsze w kolejności plików - dzięki temu wynik jest identyczny z analizą szeregową.
+"""
+import io
+import os
+import re
+import hashlib
+import logging
+from time import perf_counter
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import openpyxl
+import pandas as pd
+from pandas.io.parsers import TextParser
+from analysis import extract_marriage_info, extract_grandparents_marriage_info
+from data_processing import extract_words, extract_birth_date, validate_date_components, sheet_cells
+from file_operations import is_kartoteka_filename, list_kartoteka_files
+
+# Poniżej tej liczby plików uruchamianie procesów kosztuje więcej niż zysk
+MIN_FILES_FOR_POOL = 8
+
+# Ekstraktory korzystają tylko z kolumn A-R (nazwisko, adresy, osoby, dziadkowie)
+READ_MAX_COLUMN = 18
+
+# Teksty traktowane przez pandas.read_excel jako brak wartości (oraz błędy Excela)
+_NA_STRINGS = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+    "#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#GETTING_DATA",
+])
+
+# Tekst, który pandas mógłby zamienić na liczbę
+_NUMERIC_TEXT = re.compile(r"^\s*[+-]?(?:\d|\.\d|inf)", re.IGNORECASE)
+
+# Etapy wczytywania pliku mierzone w parse_kartoteka_file (klucze słownika "timings")
+FILE_TIMING_STAGES = ("open", "parse", "extract", "people")
+
+# Od tej liczby wierszy osoby są wyodrębniane operacjami na całych kolumnach
+VECTORIZE_MIN_ROWS = 64
+
+# Wzorce jak w extract_words i extract_birth_date
+_WORD_RE = re.compile(r"\b[\w-]+\b")
+_DATE_RE = re.compile(r"(\d{1,2})[./-](\d{1,2})[./-](\d{4})")
+
+def resolve_worker_count(workers, files_count):
+    """Ustala liczbę procesów roboczych (0 lub None = liczba rdzeni)."""
+    try:
+        workers = int(workers or 0)
+    except (ValueError, TypeError):
+        workers = 0
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    if files_count < MIN_FILES_FOR_POOL:
+        return 1
+    return max(1, min(workers, files_count))
+
+def _convert_column_pandas(values):
+    """Ustala typy kolumny dokładnie tak jak pandas (przypadki nietypowe)."""
+    column = [["" if value is None or (isinstance(value, str) and value in _NA_STRINGS) else value]
+              for value in values]
+    frame = TextParser(column, header=None, skip_blank_lines=False).read()
+    return list(frame.iloc[:, 0].to_numpy(dtype=object))
+
+def _convert_column(values):
+    """
+    Ustala typy wartości kolumny tak, jak robi to pandas.read_excel(header=None).
+
+    Puste komórki i teksty NA stają się NaN, kolumna liczbowa z brakami - float,
+    kolumna samych dat - Timestamp. Wartości logiczne i teksty wyglądające na
+    liczby są przekazywane do parsera pandas, aby wynik był identyczny.
+    """
+    has_na = False
+    has_float = False
+    all_numeric = True
+    all_datetime = True
+    for value in values:
+        if value is None or (isinstance(value, str) and value in _NA_STRINGS):
+            has_na = True
+        elif isinstance(value, bool) or (isinstance(value, str) and _NUMERIC_TEXT.match(value)):
+            return _convert_column_pandas(values)
+        elif isinstance(value, (int, float)):
+            all_datetime = False
+            if isinstance(value, float):
+                has_float = True
+            elif abs(value) >= 2 ** 63:
+                return _convert_column_pandas(values)
+        else:
+            all_numeric = False
+            if not isinstance(value, datetime):
+                all_datetime = False
+
+    all_datetime = all_datetime and not all_numeric
+    na = pd.NaT if all_datetime else np.nan
+    converted = [na if value is None or (isinstance(value, str) and value in _NA_STRINGS) else value
+                 for value in values]
+    if all_datetime:
+        return [value if value is na else pd.Timestamp(value) for value in converted]
+    if all_numeric and (has_na or has_float):
+        return [float(value) for value in converted]
+    return converted
+
+def _normalize_cell(value):
+    """Odpowiednik konwersji komórki w pandas: liczby całkowite jako int."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value == "":
+        return None
+    return value
+
+def read_sheet_window(ws, max_col=READ_MAX_COLUMN):
+    """
+    Wczytuje kolumny A-R arkusza (openpyxl, tryb read_only) do tablicy 2-D.
+
+    Komórki spoza zakresu są tylko sprawdzane, czy nie są puste. Puste końcowe
+    wiersze i kolumny są obcinane, a typy w kolumnach ustalane jak w
+    pandas.read_excel - ekstraktory widzą te same wartości co w DataFrame.
+    """
+    if hasattr(ws, "reset_dimensions"):
+        ws.reset_dimensions()
+    rows = []
+    last_row_with_data = -1
+    wider = False  # Czy arkusz ma dane poza zakresem kolumn
+    for values in ws.iter_rows(values_only=True):
+        row = [_normalize_cell(value) for value in values[:max_col]]
+        while row and row[-1] is None:
+            row.pop()
+        # Wiersz z danymi tylko poza zakresem też wyznacza wysokość arkusza (jak w pandas)
+        if any(value is not None and value != "" for value in values[max_col:]):
+            wider = True
+            last_row_with_data = len(rows)
+        elif row:
+            last_row_with_data = len(rows)
+        rows.append(row)
+    rows = rows[:last_row_with_data + 1]
+    if not rows:
+        return np.empty((0, 0), dtype=object)
+
+    width = max_col if wider else max(len(row) for row in rows)
+    cells = np.empty((len(rows), width), dtype=object)
+    for col in range(width):
+        column = [row[col] if col < len(row) else None for row in rows]
+        cells[:, col] = _convert_column(column)
+    return cells
+
+def _read_workbook_sheets(data, timings=None):
+    """
+    Zwraca listę (nazwa_arkusza, komórki albo None, błąd) dla pliku Excel.
+
+    timings - opcjonalny słownik czasów; do kluczy "open" (otwarcie skoroszytu)
+    i "parse" (wczytanie arkuszy) dodawany jest czas w sekundach.
+    """
+    sheets = []
+    start = perf_counter()
+    if data[:2] == b"PK":
+        # .xlsx - tylko potrzebne kolumny, strumieniowo
+        wb = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True, keep_links=False)
+        opened = perf_counter()
+        try:
+            for sheet_name in wb.sheetnames:
+                try:
+                    sheets.append((sheet_name, read_sheet_window(wb[sheet_name]), None))
+                except Exception as e:
+                    sheets.append((sheet_name, None, str(e)))
+        finally:
+            wb.close()
+    else:
+        # .xls i inne formaty - pełny odczyt przez pandas
+        xl = pd.ExcelFile(io.BytesIO(data))
+        opened = perf_counter()
+        try:
+            for sheet_name in xl.sheet_names:
+                try:
+                    sheets.append((sheet_name, sheet_cells(xl.parse(sheet_name, header=None)), None))
+                except Exception as e:
+                    sheets.append((sheet_name, None, str(e)))
+        finally:
+            xl.close()
+    if timings is not None:
+        timings["open"] += opened - start
+        timings["parse"] += perf_counter() - opened
+    return sheets
+
+def _first_values(cells, row_from, row_to, col_from, col_to):
+    """Łączy pierwsze niepuste wartości z kolejnych kolumn w zakresie wierszy."""
+    parts = []
+    for col in range(col_from, col_to):
+        for value in cells[row_from:row_to, col]:
+            if not pd.isna(value):
+                parts.append(str(value))
+                break
+    return " ".join(parts)
+
+def _jubilee_marriage_date(cells):
+    """Zwraca datę ślubu w postaci, w jakiej analizują ją jubileusze małżonków."""
+    if cells.shape[0] >= 10 and cells.shape[1] >= 4:
+        husband = cells[8, 1] if not pd.isna(cells[8, 1]) else None
+        wife = cells[9, 1] if not pd.isna(cells[9, 1]) else None
+        marriage_date_husband = cells[8, 3] if not pd.isna(cells[8, 3]) else None
+        marriage_date_wife = cells[9, 3] if not pd.isna(cells[9, 3]) else None
+        if husband and wife:
+            marriage_date = marriage_date_husband or marriage_date_wife
+            if isinstance(marriage_date, (pd.Timestamp, datetime)):
+                return marriage_date.date().isoformat()
+            if isinstance(marriage_date, str):
+                return marriage_date.split()[0]
+    return None
+
+def _extract_people_rows(cells):
+    """
+    Wyodrębnia wiersze z osobami (kolumna B - imię, kolumna C - data urodzenia).
+
+    Każdy wiersz to krotka (imię, drugi_człon, tekst_daty, problem_z_datą, data_urodzenia, wiersz):
+    - tekst_daty jest None gdy brak daty urodzenia,
+    - problem_z_datą to None albo (tag, komunikat) dla błędnego wzorca daty,
+    - data_urodzenia to date, "MEDIANA_WIEKU" albo None,
+    - wiersz to numer wiersza w arkuszu Excel (od 1).
+    Duże arkusze są przetwarzane operacjami na całych kolumnach.
+    """
+    if cells.shape[1] < 3:
+        return []
+    if cells.shape[0] >= VECTORIZE_MIN_ROWS:
+        return _extract_people_vectorized(cells)
+    return _extract_people_scalar(cells)
+
+def _extract_people_scalar(cells):
+    """Wyodrębnia osoby wiersz po wierszu (małe arkusze)."""
+    rows = []
+    for row_number, (name_cell, birth_cell) in enumerate(zip(cells[:, 1], cells[:, 2]), start=1):
+        tokens = extract_words(name_cell)
+        if not tokens:
+            continue
+
+        given_name = tokens[0]
+        second_member = tokens[1] if len(tokens) > 1 else None
+
+        if pd.isna(birth_cell) or (isinstance(birth_cell, str) and birth_cell.strip() == ""):
+            rows.append((given_name, second_member, None, None, None, row_number))
+            continue
+
+        date_issue = None
+        if isinstance(birth_cell, str):
+            date_pattern = re.search(r"(\d{1,2})[./-](\d{1,2})[./-](\d{4})", birth_cell)
+            if date_pattern:
+                d, m, y = date_pattern.groups()
+                is_valid, error_msg = validate_date_components(d, m, y)
+                if not is_valid:
+                    # Data umowna 99/99/9999 to ostrzeżenie, pozostałe to błędy
+                    if str(d) == '99' and str(m) == '99' and str(y) == '9999':
+                        date_issue = ("warning", error_msg)
+                    else:
+                        date_issue = ("error", error_msg)
+
+        rows.append((given_name, second_member, f"{birth_cell}", date_issue, extract_birth_date(birth_cell), row_number))
+    return rows
+
+def _extract_people_vectorized(cells):
+    """Wyodrębnia osoby operacjami na całych kolumnach B i C (wynik jak _extract_people_scalar)."""
+    # Kolumna B: słowa z tekstu (data jako tekst daty), pomijając liczby
+    find_words = _WORD_RE.findall
+    name_texts = [value.lower() if type(value) is str
+                  else (str(value.date()) if type(value) is pd.Timestamp else "")
+                  for value in cells[:, 1]]
+    tokens = [[token for token in find_words(text) if not token.isnumeric()] for text in name_texts]
+    keep = np.fromiter((bool(row_tokens) for row_tokens in tokens), dtype=bool, count=len(tokens))
+    if not keep.any():
+        return []
+    tokens = [row_tokens for row_tokens in tokens if row_tokens]
+    row_numbers = (np.flatnonzero(keep) + 1).tolist()
+
+    births = cells[keep, 2]
+    count = len(births)
+    is_str = np.fromiter((type(value) is str for value in births), dtype=bool, count=count)
+    missing = pd.isna(births)
+    missing[is_str] = [value.strip() == "" for value in births[is_str]]
+
+    # Kolumna C: wzorzec d.m.rrrr, walidacja i daty liczone na całej kolumnie
+    search_date = _DATE_RE.search
+    found = [search_date(value) if is_text else None for value, is_text in zip(births, is_str)]
+    matched = np.fromiter((m is not None for m in found), dtype=bool, count=count)
+    groups = [m.groups() if m is not None else ("0", "0", "0") for m in found]
+    day, month, year = (np.array(column, dtype=np.int64) for column in zip(*groups))
+    placeholder = matched & (day == 99) & (month == 99) & (year == 9999)
+    in_range = (matched & (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+                & (year >= 1800) & (year <= datetime.today().year + 1))
+    month_start = (year - 1970).astype("datetime64[Y]").astype("datetime64[M]") + np.clip(month - 1, 0, 11)
+    days_in_month = ((month_start + 1).astype("datetime64[D]") - month_start.astype("datetime64[D]")).astype(np.int64)
+    valid = in_range & (day <= days_in_month)
+    dates = (month_start.astype("datetime64[D]") + (day - 1)).astype(object)
+
+    birth_dates = np.full(count, None, dtype=object)
+    birth_dates[valid] = dates[valid]
+    birth_dates[placeholder] = "MEDIANA_WIEKU"
+    is_datetime = np.fromiter((isinstance(value, datetime) for value in births), dtype=bool, count=count)
+    birth_dates[is_datetime] = [value.date() for value in births[is_datetime]]
+
+    # Komunikaty o błędnych datach - tylko dla nielicznych wierszy
+    date_issues = [None] * count
+    for idx in np.flatnonzero(matched & ~valid & ~missing):
+        d, m, y = groups[idx]
+        is_valid, error_msg = validate_date_components(d, m, y)
+        if not is_valid:
+            date_issues[idx] = ("warning" if placeholder[idx] else "error", error_msg)
+
+    rows = []
+    for row_tokens, birth_cell, is_missing, date_issue, birth_date, row_number in zip(
+            tokens, births, missing, date_issues, birth_dates, row_numbers):
+        second_member = row_tokens[1] if len(row_tokens) > 1 else None
+        if is_missing:
+            rows.append((row_tokens[0], second_member, None, None, None, row_number))
+        else:
+            rows.append((row_tokens[0], second_member, f"{birth_cell}", date_issue, birth_date, row_number))
+    return rows
+
+def _parse_sheet_header(cells, filename):
+    """Wyodrębnia nagłówek arkusza: nazwisko, adresy i śluby (bez listy osób)."""
+    sheet = {
+        "surname": "",
+        "address": "",
+        "old_address": "",
+        "husband": None,
+        "wife": None,
+        "marriage_date": None,
+        "jubilee_date": None,
+        "gp_marriage_date": None,
+        "people": [],
+    }
+
+    try:
+        if cells.shape[0] >= 7 and cells.shape[1] >= 2:
+            sheet["surname"] = _first_values(cells, 1, 7, 0, 2)
+    except Exception as e:
+        logging.debug(f"Nie można wyodrębnić nazwiska z {filename}: {e}")
+
+    try:
+        if cells.shape[0] >= 4 and cells.shape[1] >= 5:
+            sheet["address"] = _first_values(cells, 1, 4, 2, 5)
+    except Exception as e:
+        logging.debug(f"Nie można wyodrębnić adresu z {filename}: {e}")
+
+    try:
+        if cells.shape[0] >= 4 and cells.shape[1] >= 7:
+            sheet["old_address"] = _first_values(cells, 1, 4, 5, 7)
+    except Exception as e:
+        logging.debug(f"Nie można wyodrębnić starego adresu z {filename}: {e}")
+
+    try:
+        marriage_info = extract_marriage_info(cells)
+        sheet["husband"] = marriage_info.get("husband")
+        sheet["wife"] = marriage_info.get("wife")
+        sheet["marriage_date"] = marriage_info.get("marriage_date")
+    except Exception as e:
+        logging.debug(f"Nie można wyodrębnić danych małżonków z {filename}: {e}")
+
+    try:
+        gp_marriage_info = extract_grandparents_marriage_info(cells)
+        sheet["gp_marriage_date"] = gp_marriage_info.get("marriage_date") if isinstance(gp_marriage_info, dict) else gp_marriage_info
+    except Exception as e:
+        logging.debug(f"Nie można wyodrębnić danych dziadków z {filename}: {e}")
+
+    try:
+        sheet["jubilee_date"] = _jubilee_marriage_date(cells)
+    except Exception:
+        pass
+    return sheet
+
+def _parse_sheet(cells, filename, timings=None):
+    """
+    Wyodrębnia dane jednego arkusza (tablica komórek z read_sheet_window).
+
+    timings - opcjonalny słownik czasów (klucze "extract" i "people").
+    """
+    start = perf_counter()
+    sheet = _parse_sheet_header(cells, filename)
+    extracted = perf_counter()
+    sheet["people"] = _extract_people_rows(cells)
+    if timings is not None:
+        timings["extract"] += extracted - start
+        timings["people"] += perf_counter() - extracted
+    return sheet
+
+def file_signature(file_path):
+    """Zwraca sygnaturę pliku (czas modyfikacji w ns, rozmiar) albo None."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def content_hash(data):
+    """Zwraca skrót zawartości pliku."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def parse_kartoteka_file(file_path):
+    """
+    Wczytuje jeden plik kartoteki i zwraca dane wszystkich arkuszy.
+
+    Funkcja działa w procesie roboczym - nie korzysta z GUI ani słownika imion.
+    Plik jest czytany raz; z tych samych bajtów liczony jest skrót dla pamięci podręcznej.
+    "timings" to czasy etapów (sekundy): open (odczyt pliku i otwarcie skoroszytu),
+    parse (wczytanie arkuszy), extract (nagłówki arkuszy), people (osoby).
+    """
+    filename = os.path.basename(file_path)
+    timings = dict.fromkeys(FILE_TIMING_STAGES, 0.0)
+    result = {
+        "file_path": file_path,
+        "filename": filename,
+        "error": None,
+        "signature": file_signature(file_path),
+        "content_hash": None,
+        "sheets": [],
+        "timings": timings
+    }
+
+    try:
+        start = perf_counter()
+        with open(file_path, "rb") as f:
+            data = f.read()
+        timings["open"] += perf_counter() - start
+        result["content_hash"] = content_hash(data)
+        workbook_sheets = _read_workbook_sheets(data, timings)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+
+    for sheet_name, cells, error in workbook_sheets:
+        if error is not None:
+            result["sheets"].append({"name": sheet_name, "error": error})
+            continue
+        sheet = _parse_sheet(cells, filename, timings)
+        sheet["name"] = sheet_name
+        sheet["error"] = None
+        result["sheets"].append(sheet)
+    return result
+
+def _parse_many(file_paths, workers):
+    """Wczytuje pliki w puli procesów (albo szeregowo) z zachowaniem kolejności."""
+    workers = resolve_worker_count(workers, len(file_paths))
+    if workers > 1:
+        chunksize = max(1, len(file_paths) // (workers * 4))
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(parse_kartoteka_file, file_paths, chunksize=chunksize))
+        except (BrokenProcessPool, OSError) as e:
+            logging.warning(f"Pula procesów niedostępna, analiza szeregowa: {e}")
+    return [parse_kartoteka_file(file_path) for file_path in file_paths]
+
+def parse_files(file_paths, workers=None, cache=None):
+    """
+    Wczytuje pliki i zwraca wyniki w kolejności plików.
+
+    Jeśli podano pamięć podręczną (ParseCache), wczytywane są tylko pliki
+    zmienione od ostatniej analizy, a nowe wyniki są do niej zapisywane.
+    """
+    if cache is None:
+        return _parse_many(file_paths, workers)
+
+    results = [cache.lookup(file_path) for file_path in file_paths]
+    missing = [i for i, parsed in enumerate(results) if parsed is None]
+    if missing:
+        parsed_missing = _parse_many([file_paths[i] for i in missing], workers)
+        for i, parsed in zip(missing, parsed_missing):
+            results[i] = parsed
+            cache.store(parsed)
+    return results
@@ -0,0 +1,289 @@
+"""
+Wirtualny widok dziennika analizy (panel wyników okna głównego).
+
+Wszystkie linie dziennika są przechowywane w pamięci (lista fragmentów
+tekst + tag), a widżet Text zawiera tylko widoczną stronę z marginesem
+linii powyżej i poniżej. Przy przewijaniu blisko krawędzi okno jest
+renderowane ponownie wokół bieżącej pozycji, a pasek przewijania pokazuje
+położenie w całym dzienniku. Dopisane linie są wstawiane zbiorczo - jedno
+wywołanie Text.insert na renderowanie, a nie jedno na fragment.
+
+Linki do plików korzystają z jednego tagu "file-link" i mapy
+numer linii -> ścieżka, zamiast osobnego tagu i powiązania na każdy plik.
+Wyszukiwanie korzysta z indeksu słów linii (search_index), a nie z Text.search.
+Indeks jest budowany porcjami w czasie bezczynności GUI zaraz po wyświetleniu
+linii, a wszystkie wystąpienia są podświetlane w renderowanym fragmencie.
+"""
+import bisect
+import tkinter as tk
+import tkinter.font as tkfont
+from search_index import LogSearchIndex
+
+# Liczba linii renderowanych powyżej i poniżej widocznej strony
+DEFAULT_MARGIN_LINES = 300
+
+# Liczba linii dodawanych do indeksu wyszukiwania w jednej porcji
+INDEX_CHUNK_LINES = 5000
+
+LINK_TAG = "file-link"
+MATCH_TAG = "match"
+HIGHLIGHT_TAG = "highlight"
+
+class LogView(tk.Frame):
+    """
+    Panel dziennika z przewijaniem wirtualnym.
+
+    Metody append/clear zastępują Text.insert/Text.delete; insert(tk.END, ...)
+    działa jak w widżecie Text, dzięki czemu dotychczasowe wywołania
+    (np. w oknach dialogowych) nie wymagają zmian.
+    """
+
+    def __init__(self, master, on_link=None, margin_lines=DEFAULT_MARGIN_LINES, bg=None, **text_options):
+        super().__init__(master, bg=bg)
+        self.on_link = on_link  # Funkcja wywoływana ze ścieżką klikniętego linku
+        self.margin_lines = margin_lines
+        self.lines = [[]]  # Linie dziennika: listy fragmentów (tekst, tag); ostatnia linia jest otwarta
+        self.links = {}  # Numer linii -> ścieżka pliku
+        self._first = 0  # Pierwsza i ostatnia (bez niej) linia wyrenderowana w widżecie
+        self._last = 0
+        self._top = 0  # Linia widoczna na górze panelu
+        self.search_index = LogSearchIndex()  # Indeks słów zakończonych linii
+        self._matches = []  # Wystąpienia szukanego tekstu: (linia, początek, koniec), rosnąco
+        self._match_lines = []  # Numery linii wystąpień (do bisect)
+        self._current = None  # Pozycja bieżącego wystąpienia w _matches
+        self._render_pending = None
+        self._check_pending = None
+        self._index_pending = None
+
+        self.notice = tk.Label(self, anchor="w", bg=bg, font=("Consolas", 10, "bold"))
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.text = tk.Text(self, bg=bg, yscrollcommand=self._on_text_scroll, **text_options)
+        self.text.pack(side="left", fill="both", expand=True)
+        self.text.configure(state="disabled")
+        self._font = tkfont.Font(font=self.text.cget("font"))
+
+        self.text.tag_configure(LINK_TAG, foreground="blue", underline=True)
+        self.text.tag_configure(MATCH_TAG, background="#FFF59D")
+        self.text.tag_configure(HIGHLIGHT_TAG, background="#FF9800", foreground="black")
+        self.text.tag_bind(LINK_TAG, "<Button-1>", self._on_link_click)
+        self.text.tag_bind(LINK_TAG, "<Enter>", lambda e: self.text.config(cursor="hand2"))
+        self.text.tag_bind(LINK_TAG, "<Leave>", lambda e: self.text.config(cursor=""))
+        self.text.bind("<Configure>", lambda e: self._schedule_check())
+
+    def tag_configure(self, tag, **options):
+        """Konfiguruje tag formatowania (jak Text.tag_configure); link i podświetlenie pozostają na wierzchu."""
+        result = self.text.tag_configure(tag, **options)
+        for top_tag in (LINK_TAG, MATCH_TAG, HIGHLIGHT_TAG):
+            self.text.tag_raise(top_tag)
+        return result
+
+    def line_count(self):
+        return len(self.lines)
+
+    def line_text(self, index):
+        """Zwraca tekst linii dziennika (bez formatowania)."""
+        return "".join(fragment for fragment, _ in self.lines[index])
+
+    def clear(self):
+        """Usuwa całą zawartość dziennika."""
+        self.lines = [[]]
+        self.links = {}
+        self._first = self._last = self._top = 0
+        self.search_index = LogSearchIndex()
+        self._matches = []
+        self._match_lines = []
+        self._current = None
+        self.set_notice(None)
+        self._schedule_render()
+
+    def append(self, text, tag=None, link=None):
+        """
+        Dopisuje tekst na końcu dziennika (renderowanie odbywa się zbiorczo, gdy GUI jest bezczynne).
+
+        link - ścieżka pliku otwieranego kliknięciem ostatniej linii zakończonej tym tekstem.
+        """
+        parts = text.split("\n")
+        if parts[0]:
+            self.lines[-1].append((parts[0], tag))
+        for part in parts[1:]:
+            self.lines.append([(part, tag)] if part else [])
+        if link:
+            self.links[max(0, len(self.lines) - 2)] = link
+        self._schedule_render()
+
+    def insert(self, index, text, tag=None):
+        """Zgodność z Text.insert - obsługiwane jest tylko dopisywanie na końcu (tk.END)."""
+        if index != tk.END:
+            raise ValueError("LogView obsługuje tylko dopisywanie na końcu (tk.END)")
+        self.append(text, tag)
+
+    def set_notice(self, text, tag=None):
+        """Pokazuje komunikat nad dziennikiem (np. wynik wyszukiwania); None ukrywa komunikat."""
+        if not text:
+            self.notice.pack_forget()
+            return
+        foreground = self.text.tag_cget(tag, "foreground") if tag else ""
+        self.notice.config(text=text, fg=foreground or self.text.cget("fg"))
+        if not self.notice.winfo_ismapped():
+            self.notice.pack(side="top", fill="x", before=self.scrollbar)
+
+    def update_index(self, limit=None):
+        """Dodaje do indeksu wyszukiwania nowe zakończone linie (najwyżej limit; otwarta ostatnia linia jest pomijana)."""
+        index = self.search_index
+        end = len(self.lines) - 1
+        if limit is not None:
+            end = min(end, len(index) + limit)
+        for number in range(len(index), end):
+            index.add_line(self.line_text(number))
+
+    def search(self, term):
+        """Zwraca wszystkie wystąpienia tekstu jako (linia, początek, koniec) - z indeksu słów."""
+        self.update_index()
+        return self.search_index.find(term)
+
+    def set_matches(self, matches):
+        """Podświetla wszystkie wystąpienia (bez bieżącego)."""
+        self._matches = matches
+        self._match_lines = [line for line, _, _ in matches]
+        self._current = None
+        self._apply_highlight()
+
+    def show_match(self, position):
+        """Wyróżnia wystąpienie o podanej pozycji w set_matches i przewija do niego dziennik."""
+        self._current = position
+        line, start, _ = self._matches[position]
+        self.flush()
+        if not self._first <= line < self._last:
+            self._render(max(0, line - self._page_lines() // 2))
+        self._apply_highlight()
+        self.text.see(f"{line - self._first + 1}.{start}")
+        self._schedule_check()
+
+    def clear_matches(self):
+        self.set_matches([])
+
+    def flush(self):
+        """Renderuje od razu oczekujące zmiany (zamiast czekać na bezczynność GUI)."""
+        if self._render_pending is not None:
+            self.after_cancel(self._render_pending)
+            self._render_pending = None
+            self._render(self._top)
+
+    def _schedule_indexing(self):
+        if self._index_pending is None and len(self.search_index) < len(self.lines) - 1:
+            self._index_pending = self.after(1, self._index_idle)
+
+    def _index_idle(self):
+        self._index_pending = None
+        self.update_index(INDEX_CHUNK_LINES)
+        self._schedule_indexing()
+
+    def _schedule_render(self):
+        if self._render_pending is None:
+            self._render_pending = self.after_idle(self._render_idle)
+
+    def _render_idle(self):
+        self._render_pending = None
+        self._render(self._top)
+
+    def _page_lines(self):
+        """Szacunkowa liczba linii mieszczących się w panelu."""
+        return max(1, self.text.winfo_height() // max(1, self._font.metrics("linespace")))
+
+    def _render(self, top):
+        """Wstawia do widżetu linie wokół linii top (strona + margines) jednym wywołaniem insert."""
+        total = len(self.lines)
+        top = max(0, min(top, total - 1))
+        first = max(0, top - self.margin_lines)
+        last = min(total, top + self._page_lines() + self.margin_lines)
+
+        chunks = []
+        for index in range(first, last):
+            link = index in self.links
+            for fragment, tag in self.lines[index]:
+                tags = (tag, LINK_TAG) if link and tag else (LINK_TAG,) if link else (tag,) if tag else ()
+                chunks.extend((fragment, tags))
+            if index < last - 1:
+                chunks.extend(("\n", ()))
+
+        self.text.configure(state="normal")
+        self.text.delete("1.0", tk.END)
+        if chunks:
+            self.text.insert(tk.END, *chunks)
+        self.text.configure(state="disabled")
+        self._first, self._last, self._top = first, last, top
+        self.text.yview(f"{top - first + 1}.0")
+        self._apply_highlight()
+        self._update_scrollbar()
+        self._schedule_indexing()
+
+    def _apply_highlight(self):
+        """Podświetla wystąpienia z wyrenderowanego fragmentu (jedno tag_add dla wszystkich)."""
+        self.text.tag_remove(MATCH_TAG, "1.0", tk.END)
+        self.text.tag_remove(HIGHLIGHT_TAG, "1.0", tk.END)
+        low = bisect.bisect_left(self._match_lines, self._first)
+        high = bisect.bisect_left(self._match_lines, self._last)
+        ranges = []
+        for line, start, end in self._matches[low:high]:
+            row = line - self._first + 1
+            ranges.extend((f"{row}.{start}", f"{row}.{end}"))
+        if ranges:
+            self.text.tag_add(MATCH_TAG, *ranges)
+        if self._current is not None:
+            line, start, end = self._matches[self._current]
+            if self._first <= line < self._last:
+                row = line - self._first + 1
+                self.text.tag_add(HIGHLIGHT_TAG, f"{row}.{start}", f"{row}.{end}")
+
+    def _visible_range(self):
+        """Zakres linii dziennika widocznych w panelu (pierwsza, ostatnia)."""
+        top_row = int(self.text.index("@0,0").split(".")[0])
+        bottom_row = int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0])
+        return self._first + top_row - 1, self._first + bottom_row - 1
+
+    def _update_scrollbar(self):
+        total = max(1, len(self.lines))
+        top, bottom = self._visible_range()
+        if self._last - self._first <= 0:
+            self.scrollbar.set(0.0, 1.0)
+        elif self._first == 0 and self._last == len(self.lines):
+            # Cały dziennik w widżecie - dokładne położenie z widżetu Text
+            self.scrollbar.set(*self.text.yview())
+        else:
+            self.scrollbar.set(top / total, (bottom + 1) / total)
+
+    def _on_text_scroll(self, first, last):
+        """Przewinięcie widżetu (kółko myszy, klawiatura) - sprawdza, czy trzeba przesunąć okno linii."""
+        self._schedule_check()
+
+    def _schedule_check(self):
+        if self._check_pending is None:
+            self._check_pending = self.after_idle(self._check_window)
+
+    def _check_window(self):
+        self._check_pending = None
+        if self._render_pending is not None:
+            return
+        top, bottom = self._visible_range()
+        self._top = top
+        threshold = self.margin_lines // 2
+        if (self._first > 0 and top - self._first < threshold) or \
+                (self._last < len(self.lines) and self._last - bottom < threshold):
+            self._render(top)
+        else:
+            self._update_scrollbar()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        """Obsługa paska przewijania - położenie odnosi się do całego dziennika."""
+        if action == tk.MOVETO:
+            top = int(float(amount) * len(self.lines))
+            self._render(max(0, min(top, len(self.lines) - self._page_lines())))
+        else:
+            self.text.yview_scroll(int(amount), unit)
+
+    def _on_link_click(self, event):
+        row = int(self.text.index(f"@{event.x},{event.y}").split(".")[0])
+        path = self.links.get(self._first + row - 1)
+        if path and self.on_link:
+            self.on_link(path)
@@ -1,8 +1,13 @@
+import time
+# Początek uruchamiania - do pomiaru czasu do pojawienia się okna
+STARTUP_TIME = time.perf_counter()
 import sys
 import os
 import tkinter as tk
 import logging
-import time
+import queue
+import threading
+import multiprocessing
 
 # Sprawdź czy Pillow jest dostępny
 try:
@@ -26,7 +31,7 @@ except ImportError:
         sys.exit(1)
 
 from splash_screen import SplashScreen
-from gui_main import MainWindow
+from startup import preload
 
 # Konfiguracja logowania
 logging.basicConfig(
@@ -35,6 +40,8 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s',
     encoding='utf-8'
 )
+# Czasy uruchamiania zapisywane do logu niezależnie od poziomu WARNING
+logging.getLogger("kartoteka.startup").setLevel(logging.INFO)
 
 def load_application_with_splash():
     """Ładuje aplikację z profesjonalnym ekranem powitalnym."""
@@ -66,41 +73,43 @@ def load_application_with_splash():
         version="v3.2"
     )
     splash.show()
-    
-    # Symuluj proces ładowania z prawdziwymi krokami
-    loading_steps = [
-        ("Ładowanie konfiguracji...", 0.3),
-        ("Ładowanie słownika imion...", 0.5),
-        ("Przygotowanie interfejsu graficznego...", 0.5),
-        ("Finalizacja uruchamiania...", 0.2),
-    ]
-    
-    for i, (step_text, duration) in enumerate(loading_steps):
-        progress = int((i / len(loading_steps)) * 100)
-        splash.update_progress(progress, step_text)
-        time.sleep(duration)
-    
 
-    # Przywróć napisy statusu ładowania
-    loading_steps = [
-        ("Ładowanie konfiguracji...", 0.7),
-        ("Ładowanie słownika imion...", 1.0),
-        ("Przygotowanie interfejsu graficznego...", 1.0),
-        ("Finalizacja uruchamiania...", 0.7),
-    ]
-    for i, (step_text, duration) in enumerate(loading_steps):
-        progress = int((i / len(loading_steps)) * 100)
-        splash.update_progress(progress, step_text)
-        splash.root.update()  # Wymuś odświeżenie GUI
-        time.sleep(duration)
-    splash.update_progress(100, "Gotowe!")
-    splash.root.update()
-    time.sleep(0.7)
+    # Praca startowa w wątku roboczym; wątek GUI tylko pokazuje postęp
+    messages = queue.Queue()
+    preloaded = {}
+
+    def worker():
+        try:
+            preloaded.update(preload(lambda value, text: messages.put((value, text))))
+        except Exception as e:
+            logging.error(f"Błąd przygotowania programu w tle: {e}", exc_info=True)
+        finally:
+            messages.put(None)  # Koniec pracy
+
+    threading.Thread(target=worker, daemon=True).start()
+    while True:
+        try:
+            message = messages.get(timeout=0.05)
+        except queue.Empty:
+            splash.root.update()  # Okno powitalne pozostaje responsywne
+            continue
+        if message is None:
+            break
+        splash.update_progress(*message)
 
     # Zamknij splash screen
-    splash.close()
+    splash.close(fade=False)
     root.deiconify()  # Pokaż główne okno
-    app = MainWindow(root)
+    from gui_main import MainWindow
+    app = MainWindow(root, preloaded=preloaded)
+
+    def log_startup_time():
+        startup_logger = logging.getLogger("kartoteka.startup")
+        steps = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in preloaded.get("timings", {}).items())
+        startup_logger.info(f"Czas do interaktywnego okna: {time.perf_counter() - STARTUP_TIME:.2f}s ({steps})")
+
+    # Wywoływane po pierwszym narysowaniu okna, gdy działa już pętla zdarzeń
+    root.after_idle(log_startup_time)
     return root, app
 
 def main():
@@ -120,4 +129,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Wymagane przez pulę procesów analizy w skompilowanym EXE (PyInstaller)
+    multiprocessing.freeze_support()
     main()
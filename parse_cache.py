@@ -0,0 +1,183 @@
+"""
+Moduł pamięci podręcznej wyników wczytywania plików kartoteki.
+
+Dla każdego pliku zapamiętywany jest wynik parse_kartoteka_file razem z sygnaturą
+(czas modyfikacji, rozmiar) i skrótem zawartości. Plik jest wczytywany ponownie
+tylko wtedy, gdy zmieniła się sygnatura i jednocześnie zawartość.
+
+Pamięć podręczna ma wersjonowany schemat oraz odcisk kodu i stałych ekstrakcji - zmiana
+logiki wyodrębniania danych automatycznie unieważnia zapisane wyniki.
+"""
+import os
+import pickle
+import hashlib
+import logging
+import re
+import types
+from config import CACHE_FILE
+
+# Zwiększ przy zmianie struktury wyniku parse_kartoteka_file
+CACHE_SCHEMA_VERSION = 3
+
+def _code_digest(digest, code):
+    """Dodaje do skrótu kod bajtowy funkcji (bez numerów linii i ścieżek)."""
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode("utf-8"))
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _code_digest(digest, const)
+        else:
+            digest.update(repr(const).encode("utf-8"))
+
+def _constant_repr(value):
+    """
+    Stały tekst wartości stałej modułu albo None, gdy to nie jest stała.
+
+    Zbiory są sortowane (kolejność w repr zależy od losowego ziarna haszowania),
+    a wyrażenia regularne zapisywane jako wzorzec i flagi.
+    """
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return repr(value)
+    if isinstance(value, re.Pattern):
+        return f"re({value.pattern!r}, {value.flags})"
+    if isinstance(value, (frozenset, set)):
+        items = [_constant_repr(item) for item in value]
+        return None if None in items else "{" + ", ".join(sorted(items)) + "}"
+    if isinstance(value, (tuple, list)):
+        items = [_constant_repr(item) for item in value]
+        return None if None in items else "(" + ", ".join(items) + ")"
+    return None
+
+def extraction_fingerprint():
+    """
+    Zwraca odcisk ekstrakcji danych (moduły wczytujące i przetwarzające).
+
+    Obejmuje kod funkcji, stałe modułów (np. READ_MAX_COLUMN, _NA_STRINGS)
+    oraz wersje openpyxl i numpy, przez które wczytywane są arkusze.
+    """
+    # Moduły ekstrakcji (z openpyxl i numpy) są importowane dopiero przy tworzeniu pamięci podręcznej
+    import analysis
+    import data_processing
+    import kartoteka_parser
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(CACHE_SCHEMA_VERSION).encode("utf-8"))
+    for library in ("openpyxl", "numpy"):
+        try:
+            digest.update(f"{library} {__import__(library).__version__}".encode("utf-8"))
+        except ImportError:
+            pass
+    for module in (kartoteka_parser, analysis, data_processing):
+        for name, obj in sorted(vars(module).items()):
+            if name.startswith("__"):
+                continue
+            code = getattr(obj, "__code__", None)
+            if code is not None and getattr(obj, "__module__", None) == module.__name__:
+                digest.update(name.encode("utf-8"))
+                _code_digest(digest, code)
+                continue
+            constant = _constant_repr(obj)
+            if constant is not None:
+                digest.update(f"{name}={constant}".encode("utf-8"))
+    return digest.hexdigest()
+
+class ParseCache:
+    """Trwała pamięć podręczna wyników wczytywania plików (plik obok settings.json)."""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.fingerprint = extraction_fingerprint()
+        self.entries = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """Wczytuje pamięć podręczną z dysku (nieaktualny schemat = pusta pamięć)."""
+        self.entries = {}
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+            if (isinstance(data, dict) and data.get("schema") == CACHE_SCHEMA_VERSION
+                    and data.get("fingerprint") == self.fingerprint):
+                self.entries = data.get("entries", {})
+            else:
+                logging.info("Pamięć podręczna analizy nieaktualna - zostanie odbudowana")
+                self.dirty = True
+        except Exception as e:
+            logging.warning(f"Nie można wczytać pamięci podręcznej analizy: {e}")
+            self.dirty = True
+
+    def save(self):
+        """Zapisuje pamięć podręczną na dysk (tylko gdy coś się zmieniło)."""
+        if not self.dirty:
+            return True
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump({
+                    "schema": CACHE_SCHEMA_VERSION,
+                    "fingerprint": self.fingerprint,
+                    "entries": self.entries
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+            return True
+        except Exception as e:
+            logging.warning(f"Nie można zapisać pamięci podręcznej analizy: {e}")
+            return False
+
+    def lookup(self, file_path):
+        """
+        Zwraca zapamiętany wynik dla pliku albo None, gdy plik trzeba wczytać.
+
+        Zwracany wynik ma klucz "cached" (plik nie był czytany - jego "timings"
+        to czasy ostatniego wczytania, nie tej analizy).
+        """
+        import kartoteka_parser
+        entry = self.entries.get(file_path)
+        if entry is None:
+            self.misses += 1
+            return None
+        signature = kartoteka_parser.file_signature(file_path)
+        if signature is not None and signature == entry["signature"]:
+            self.hits += 1
+            return dict(entry["parsed"], cached=True)
+        # Sygnatura inna (np. skopiowany plik) - porównaj zawartość
+        try:
+            with open(file_path, "rb") as f:
+                digest = kartoteka_parser.content_hash(f.read())
+        except OSError:
+            self.misses += 1
+            return None
+        if digest == entry["content_hash"]:
+            entry["signature"] = signature
+            entry["parsed"]["signature"] = signature
+            self.dirty = True
+            self.hits += 1
+            return dict(entry["parsed"], cached=True)
+        self.misses += 1
+        return None
+
+    def store(self, parsed):
+        """Zapamiętuje wynik wczytania pliku (pomija pliki z błędem odczytu)."""
+        if parsed.get("error") is not None or not parsed.get("content_hash"):
+            return
+        self.entries[parsed["file_path"]] = {
+            "signature": parsed["signature"],
+            "content_hash": parsed["content_hash"],
+            "parsed": parsed
+        }
+        self.dirty = True
+
+    def prune(self, folder_path, file_paths):
+        """Usuwa wpisy plików z folderu, których już nie ma na liście."""
+        keep = set(file_paths)
+        folder_prefix = os.path.join(folder_path, "")
+        stale = [path for path in self.entries if path.startswith(folder_prefix) and path not in keep]
+        for path in stale:
+            del self.entries[path]
+        if stale:
+            self.dirty = True
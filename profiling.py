@@ -0,0 +1,160 @@
+"""
+Profilowanie analizy kartoteki (cProfile i tracemalloc) - tryb włączany na żądanie.
+
+Gdy użytkownik zgłasza, że analiza zwolniła, włącza profilowanie
+("profile_analysis": true w settings.json albo --profile w wierszu poleceń).
+Każda profilowana analiza zapisuje do folderu profiles (obok pliku
+kartoteka_errors.log):
+- plik .pstats (do otwarcia w pstats, snakeviz itp.),
+- raport tekstowy: czas i szczytowe zużycie pamięci każdego etapu, funkcje
+  z największym czasem łącznym i własnym oraz miejsca alokacji pamięci.
+
+cProfile obejmuje tylko bieżący wątek, a tracemalloc tylko bieżący proces,
+dlatego profilowana analiza wczytuje pliki szeregowo (bez puli procesów).
+Moduł korzysta wyłącznie z biblioteki standardowej, więc działa także
+w skompilowanym programie (EXE).
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from time import perf_counter
+from config import BASE_DIR
+
+# Liczba pozycji w zestawieniach raportu
+DEFAULT_PROFILE_TOP = 40
+
+def default_profile_dir():
+    """Folder profiles obok pliku logu błędów, a bez logu w pliku - obok programu."""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.FileHandler):
+            return os.path.join(os.path.dirname(handler.baseFilename), "profiles")
+    return os.path.join(BASE_DIR, "profiles")
+
+def _mb(size):
+    return size / (1024 * 1024)
+
+class AnalysisProfiler:
+    """
+    Profiluje jedną analizę: cProfile całości oraz czas i pamięć każdego etapu.
+
+    Użycie:
+        with AnalysisProfiler("analiza", info={"Folder": folder}) as profiler:
+            with profiler.stage("wczytanie"):
+                ...
+        profiler.report_paths  # (plik .pstats, raport .txt)
+    """
+
+    def __init__(self, label="analiza", output_dir=None, top=DEFAULT_PROFILE_TOP, info=None):
+        self.label = label
+        self.output_dir = output_dir or default_profile_dir()
+        self.top = top
+        self.info = dict(info or {})  # Dodatkowe informacje w nagłówku raportu
+        self.stages = []  # (nazwa, czas w s, szczyt pamięci, pamięć po etapie) - w bajtach
+        self.profile = cProfile.Profile()
+        self.report_paths = None
+        self.total_time = 0.0
+        self.peak_memory = 0
+        self._snapshot = None
+        self._owns_tracemalloc = False
+        self._start_time = None
+
+    def start(self):
+        """Rozpoczyna profilowanie (w wątku, który wykonuje analizę)."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._start_time = perf_counter()
+        self.profile.enable()
+
+    @contextmanager
+    def stage(self, name):
+        """Mierzy czas i szczytowe zużycie pamięci etapu analizy."""
+        _, peak_before = tracemalloc.get_traced_memory()
+        self.peak_memory = max(self.peak_memory, peak_before)
+        tracemalloc.reset_peak()
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak_memory = max(self.peak_memory, peak)
+            self.stages.append((name, perf_counter() - start, peak, current))
+
+    def stop(self):
+        """Kończy profilowanie i zapamiętuje stan pamięci."""
+        self.profile.disable()
+        self.total_time = perf_counter() - self._start_time
+        self.peak_memory = max(self.peak_memory, tracemalloc.get_traced_memory()[1])
+        self._snapshot = tracemalloc.take_snapshot()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+    def format_report(self):
+        """Zwraca raport tekstowy profilowania."""
+        text = "=" * 78 + "\n"
+        text += "                    PROFIL ANALIZY KARTOTEKI\n"
+        text += "=" * 78 + "\n\n"
+        text += f"Data:               {datetime.now():%Y-%m-%d %H:%M:%S}\n"
+        for key, value in self.info.items():
+            text += f"{key + ':':<20}{value}\n"
+        text += f"Czas całkowity:     {self.total_time:.3f} s (z narzutem profilowania)\n"
+        text += f"Szczyt pamięci:     {_mb(self.peak_memory):.1f} MB\n\n"
+
+        text += "ETAPY:\n"
+        text += f"  {'etap':<24} {'czas [s]':>10} {'szczyt [MB]':>12} {'po etapie [MB]':>15}\n"
+        for name, seconds, peak, current in self.stages:
+            text += f"  {name:<24} {seconds:>10.3f} {_mb(peak):>12.1f} {_mb(current):>15.1f}\n"
+        text += "\n"
+
+        for sort_key, title in (("cumulative", "NAJWIĘKSZY CZAS ŁĄCZNY"), ("tottime", "NAJWIĘKSZY CZAS WŁASNY")):
+            stream = io.StringIO()
+            stats = pstats.Stats(self.profile, stream=stream)
+            stats.strip_dirs().sort_stats(sort_key).print_stats(self.top)
+            text += f"{title} (top {self.top}):\n{stream.getvalue()}\n"
+
+        if self._snapshot is not None:
+            text += f"PAMIĘĆ ZAJĘTA PO ANALIZIE (top {self.top} miejsc alokacji):\n"
+            for statistic in self._snapshot.statistics("lineno")[:self.top]:
+                text += f"  {_mb(statistic.size):>8.2f} MB {statistic.count:>9} bloków  {statistic.traceback}\n"
+        return text
+
+    def write_report(self):
+        """Zapisuje plik .pstats i raport tekstowy; zwraca (ścieżka_pstats, ścieżka_raportu)."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base_name = os.path.join(self.output_dir, f"{self.label}_{datetime.now():%Y%m%d_%H%M%S}")
+        pstats_path = base_name + ".pstats"
+        report_path = base_name + ".txt"
+        self.profile.dump_stats(pstats_path)
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(self.format_report())
+        self.report_paths = (pstats_path, report_path)
+        return self.report_paths
+
+    def finish(self):
+        """Kończy profilowanie i zapisuje raport; błąd zapisu trafia tylko do logu."""
+        self.stop()
+        try:
+            paths = self.write_report()
+            logging.info(f"Zapisano profil analizy: {paths[1]}")
+            return paths
+        except OSError as e:
+            logging.error(f"Nie można zapisać profilu analizy w {self.output_dir}: {e}")
+            return None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish()
+        return False
+
+def profile_stage(profiler, name):
+    """Etap profilowania albo pusty kontekst, gdy profilowanie jest wyłączone."""
+    return profiler.stage(name) if profiler is not None else nullcontext()
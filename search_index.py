@@ -0,0 +1,86 @@
+"""
+Indeks słów dziennika analizy - wyszukiwanie w wynikach bez przeszukiwania widżetu Tk.
+
+Każda linia dziennika jest normalizowana jak imiona w słowniku
+(remove_diacritics: małe litery, bez znaków diakrytycznych), a indeks
+odwrócony przechowuje dla każdego słowa numery linii, w których występuje.
+Wyszukanie frazy to przecięcie list linii jej słów i sprawdzenie tylko tych
+linii - liczba wystąpień i ich pozycje są dostępne od razu, także przy
+dziesiątkach tysięcy linii.
+"""
+import re
+from array import array
+from data_processing import remove_diacritics
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def _fold_char(char):
+    folded = remove_diacritics(char)
+    if len(folded) == 1:
+        return folded
+    lowered = char.lower()
+    return lowered if len(lowered) == 1 else char
+
+class _FoldTable(dict):
+    """Tabela str.translate: znak -> znak po remove_diacritics, uzupełniana przy pierwszym użyciu znaku."""
+
+    def __missing__(self, code):
+        folded = self[code] = _fold_char(chr(code))
+        return folded
+
+_FOLD_TABLE = _FoldTable()
+
+def fold_text(text):
+    """
+    Normalizacja remove_diacritics znak po znaku, z zachowaniem długości tekstu.
+
+    Pozycje znalezione w tekście znormalizowanym odpowiadają pozycjom
+    w tekście oryginalnym (potrzebne do podświetlenia wystąpień).
+    """
+    return text.translate(_FOLD_TABLE)
+
+class LogSearchIndex:
+    """Indeks odwrócony linii dziennika: słowo -> numery linii."""
+
+    def __init__(self):
+        self.postings = {}  # Słowo -> array numerów linii (rosnąco)
+        self.texts = []  # Linie po normalizacji (indeks = numer linii)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add_line(self, text):
+        """Dodaje kolejną linię dziennika do indeksu."""
+        number = len(self.texts)
+        folded = fold_text(text)
+        self.texts.append(folded)
+        for token in set(_TOKEN_RE.findall(folded)):
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = array("i")
+            postings.append(number)
+
+    def find(self, term):
+        """
+        Zwraca wszystkie wystąpienia frazy jako (linia, początek, koniec), w kolejności dziennika.
+
+        Fraza musi zaczynać się i kończyć na granicy słowa; wielkość liter
+        i znaki diakrytyczne nie mają znaczenia.
+        """
+        folded = fold_text(term.strip())
+        tokens = set(_TOKEN_RE.findall(folded))
+        if not tokens:
+            return []
+        postings = [self.postings.get(token) for token in tokens]
+        if not all(postings):
+            return []
+        postings.sort(key=len)
+        lines = postings[0]
+        if len(postings) > 1:
+            others = [set(other) for other in postings[1:]]
+            lines = [line for line in lines if all(line in other for other in others)]
+
+        pattern = re.compile(rf"(?<!\w){re.escape(folded)}(?!\w)")
+        texts = self.texts
+        return [(line, match.start(), match.end())
+                for line in lines for match in pattern.finditer(texts[line])]
@@ -183,10 +183,10 @@ class SplashScreen:
             self.status_label.config(text=status_text)
         self.root.update()
     
-    def close(self):
-        """Zamyka splash screen z efektem zanikania."""
+    def close(self, fade=True):
+        """Zamyka splash screen (domyślnie z efektem zanikania)."""
         # Efekt zanikania
-        for i in range(10, -1, -1):
+        for i in range(10, -1, -1) if fade else ():
             alpha = i / 10
             try:
                 self.root.attributes('-alpha', alpha)
@@ -0,0 +1,81 @@
+"""
+Przygotowanie programu w tle, w czasie wyświetlania ekranu powitalnego.
+
+Funkcja preload wykonuje rzeczywistą pracę startową: import modułów
+interfejsu, wczytanie słownika imion oraz wczytanie ostatnio używanego folderu
+kartoteki (z pamięci podręcznej). pandas i openpyxl są importowane dopiero
+przez wczytywanie folderu - bez zapisanego folderu okno otwiera się bez nich.
+Postęp jest zgłaszany przez funkcję report(wartość, opis) - ekran powitalny
+pokazuje prawdziwy stan zamiast odliczania czasu.
+Moduł nie tworzy okien, więc można go uruchomić w wątku roboczym.
+"""
+import os
+import sys
+import time
+import logging
+from config import DEFAULT_WORKERS, load_settings
+
+def default_names_file(folder_path):
+    """Plik imion: imiona.json w folderze kartoteki, a bez folderu - obok programu."""
+    if folder_path and os.path.exists(folder_path):
+        return os.path.join(folder_path, "imiona.json")
+    if getattr(sys, 'frozen', False):
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, "imiona.json")
+
+def preload(report):
+    """
+    Wykonuje pracę startową i zwraca słownik z wynikami dla MainWindow.
+
+    Klucze: folder_path, json_file_path, names_dict (None gdy brak pliku),
+    engine (AnalysisEngine z wczytanym folderem albo None), folder_watcher,
+    timings (czas każdego kroku w sekundach).
+    """
+    timings = {}
+    preloaded = {"folder_path": None, "json_file_path": None, "names_dict": None,
+                 "engine": None, "folder_watcher": None, "timings": timings}
+
+    step_start = time.perf_counter()
+    report(10, "Ładowanie modułów programu...")
+    import gui_main
+    from kartoteka_core import AnalysisEngine
+    from parse_cache import ParseCache
+    from folder_watcher import FolderWatcher
+    from file_operations import load_names
+    timings["imports"] = time.perf_counter() - step_start
+
+    step_start = time.perf_counter()
+    report(40, "Ładowanie konfiguracji...")
+    settings = load_settings()
+    folder_path = settings.get("folder_path")
+    if not folder_path or not os.path.exists(folder_path):
+        folder_path = None
+    preloaded["folder_path"] = folder_path
+    try:
+        workers = int(settings.get("workers", DEFAULT_WORKERS))
+    except (ValueError, TypeError):
+        workers = DEFAULT_WORKERS
+
+    report(45, "Ładowanie słownika imion...")
+    json_file_path = default_names_file(folder_path)
+    preloaded["json_file_path"] = json_file_path
+    if os.path.exists(json_file_path):
+        preloaded["names_dict"] = load_names(json_file_path)
+    timings["names"] = time.perf_counter() - step_start
+
+    if folder_path:
+        step_start = time.perf_counter()
+        report(55, "Wczytywanie kartoteki...")
+        # Migawka folderu przed wczytaniem - późniejsze zmiany zostaną wykryte
+        preloaded["folder_watcher"] = FolderWatcher(folder_path)
+        engine = AnalysisEngine(ParseCache())
+        engine.scan(folder_path, workers=workers)
+        preloaded["engine"] = engine
+        timings["folder"] = time.perf_counter() - step_start
+        logging.getLogger("kartoteka.startup").info(
+            f"Wczytano folder {folder_path}: plików {len(engine.files)}, z pamięci podręcznej {engine.cache.hits}")
+
+    report(100, "Gotowe!")
+    return preloaded
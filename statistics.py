@@ -1,8 +1,87 @@
 """
 Moduł do generowania statystyk z kartoteki parafialnej.
 """
-from datetime import datetime
-from collections import defaultdict
+import os
+import heapq
+from array import array
+from datetime import datetime, timedelta
+from collections import Counter, defaultdict
+
+# Domyślny wiek dla daty umownej, gdy nie ma jeszcze żadnych osób
+DEFAULT_MEDIAN_AGE = 40
+
+# Etapy analizy mierzone licznikami czasu: klucz -> opis
+TIMING_STAGES = {
+    "open": "Otwarcie plików",
+    "parse": "Wczytanie arkuszy",
+    "extract": "Nagłówki arkuszy",
+    "people": "Osoby",
+    "jubilee": "Jubileusze i urodziny",
+    "render": "Wyświetlenie wyników",
+}
+
+# Liczba plików w zestawieniu najwolniejszych
+SLOWEST_FILES_COUNT = 20
+
+
+class AgeHistogram:
+    """
+    Histogram wieku (liczby całkowite) - mediana, średnia, min i max bez sortowania.
+
+    Zakres 0-130 lat jest rozszerzany w razie potrzeby, więc wynik jest zawsze
+    taki sam jak dla posortowanej listy wszystkich wieków.
+    """
+
+    def __init__(self, low=0, high=130):
+        self.low = low
+        self.counts = array("I", [0]) * (high - low + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, age):
+        """Dodaje wiek do histogramu."""
+        self._widen(age, age)
+        self.counts[age - self.low] += 1
+        self.count += 1
+        self.total += age
+        if self.min is None or age < self.min:
+            self.min = age
+        if self.max is None or age > self.max:
+            self.max = age
+
+    def _widen(self, low, high):
+        """Rozszerza zakres histogramu tak, aby obejmował wieki low..high."""
+        if low < self.low:
+            self.counts = array("I", [0]) * (self.low - low) + self.counts
+            self.low = low
+        if high - self.low >= len(self.counts):
+            self.counts.extend(array("I", [0]) * (high - self.low - len(self.counts) + 1))
+
+    def __len__(self):
+        return self.count
+
+    def kth(self, k):
+        """Zwraca k-ty najmniejszy wiek (od 0)."""
+        for offset in range(self.min - self.low, self.max - self.low + 1):
+            k -= self.counts[offset]
+            if k < 0:
+                return self.low + offset
+        raise IndexError(k)
+
+    def median(self):
+        """Zwraca medianę (dla parzystej liczby osób - średnią dwóch środkowych)."""
+        if not self.count:
+            return None
+        middle = self.count // 2
+        if self.count % 2 == 0:
+            return (self.kth(middle - 1) + self.kth(middle)) / 2
+        return self.kth(middle)
+
+    def average(self):
+        """Zwraca średnią wieku."""
+        return self.total / self.count if self.count else None
 
 
 class Statistics:
@@ -45,19 +124,19 @@ class Statistics:
             'family_5plus': minmax(ranges[4])
         }
 
-    def add_family_by_size(self, size):
-        """Dodaje rodzinę (arkusz) do odpowiedniej kategorii wielkości."""
+    def add_family_by_size(self, size, count=1):
+        """Dodaje rodzinę (arkusz) do odpowiedniej kategorii wielkości (count=-1 usuwa)."""
         if size == 1:
-            self.family_count_1 += 1
+            self.family_count_1 += count
         elif size == 2:
-            self.family_count_2 += 1
+            self.family_count_2 += count
         elif 3 <= size <= 4:
-            self.family_count_3_4 += 1
+            self.family_count_3_4 += count
         elif size >= 5:
-            self.family_count_5plus += 1
+            self.family_count_5plus += count
     
     def __init__(self):
-        self.names_counter = defaultdict(int)
+        self.names_counter = Counter()
         self.reset()
     
     def reset(self):
@@ -66,6 +145,7 @@ class Statistics:
         self.total_males = 0
         self.total_females = 0
         self.files_scanned = 0
+        self.files_not_read = 0  # Pliki niewczytywane w tej analizie (pamięć podręczna, wcześniejsze wczytanie)
         self.sheets_scanned = 0
         self.errors_count = 0
         self.warnings_count = 0
@@ -73,7 +153,7 @@ class Statistics:
         self.jubilees_count = 0
         self.marriages_in_range_count = 0
         self.age_distribution = defaultdict(int)  # Przedziały wiekowe
-        self.addresses = set()  # Unikalne adresy
+        self.addresses = Counter()  # Adresy (unikalne = liczba kluczy)
         self.analysis_start_time = None
         self.analysis_end_time = None
         self.people_by_age_group = {
@@ -85,20 +165,28 @@ class Statistics:
             "90+": 0
         }
         # Dekady urodzin i ślubów
-        self.birth_decades = defaultdict(int)  # Dekady urodzin (np. 1940, 1950)
-        self.marriage_decades = defaultdict(int)  # Dekady ślubów
-        self.ages = []  # Lista wszystkich wieków do obliczeń statystycznych
+        self.birth_decades = Counter()  # Dekady urodzin (np. 1940, 1950)
+        self.marriage_decades = Counter()  # Dekady ślubów
+        self.ages = AgeHistogram()  # Histogram wieków do obliczeń statystycznych
         self.names_counter.clear()  # Czyszczenie licznika imion
         # Podział rodzin
         self.family_count_1 = 0
         self.family_count_2 = 0
         self.family_count_3_4 = 0
         self.family_count_5plus = 0
+        # Czasy etapów (łącznie, w sekundach) i czasy wczytywania plików
+        self.stage_times = dict.fromkeys(TIMING_STAGES, 0.0)
+        self.file_times = []  # (czas łączny, ścieżka, liczba arkuszy, czasy etapów)
     
-    def start_analysis(self):
-        """Rozpoczyna pomiar czasu analizy."""
+    def start_analysis(self, elapsed=0.0):
+        """
+        Rozpoczyna pomiar czasu analizy.
+
+        elapsed - czas już wykonanej części analizy w sekundach (wczytanie
+        plików przed filtrowaniem), wliczany do czasu trwania.
+        """
         self.reset()
-        self.analysis_start_time = datetime.now()
+        self.analysis_start_time = datetime.now() - timedelta(seconds=elapsed)
     
     def end_analysis(self):
         """Kończy pomiar czasu analizy i zlicza rodziny po adresach."""
@@ -115,20 +203,9 @@ class Statistics:
     def add_person(self, person):
         """Dodaje osobę do statystyk."""
         wiek = person.get("wiek")
-        # Jeśli wiek to znacznik "MEDIANA_WIEKU", wylicz medianę z dotychczasowych osób
+        # Jeśli wiek to znacznik "MEDIANA_WIEKU", przyjmij medianę z dotychczasowych osób
         if wiek == "MEDIANA_WIEKU":
-            # Jeśli nie ma jeszcze żadnych osób, przyjmij 40 jako domyślną medianę
-            if self.ages:
-                sorted_ages = sorted(self.ages)
-                count = len(sorted_ages)
-                if count % 2 == 0:
-                    wiek = (sorted_ages[count // 2 - 1] + sorted_ages[count // 2]) / 2
-                else:
-                    wiek = sorted_ages[count // 2]
-                wiek = int(round(wiek))
-            else:
-                wiek = 40
-            person["wiek"] = wiek
+            person["wiek"] = self.get_current_median_age()
         self.total_people += 1
         # Płeć
         if person.get("plec") == "M":
@@ -143,7 +220,7 @@ class Statistics:
             except Exception:
                 age_int = None
             if age_int is not None:
-                self.ages.append(age_int)  # Zapisz wiek do listy
+                self.ages.add(age_int)  # Zapisz wiek w histogramie
                 if age_int < 18:
                     self.people_by_age_group["0-17"] += 1
                 elif age_int < 31:
@@ -159,7 +236,7 @@ class Statistics:
         # Adresy
         address = person.get("adres")
         if address:
-            self.addresses.add(address)
+            self.addresses[address] += 1
         # Imię
         imie = person.get("imie")
         if imie:
@@ -188,29 +265,27 @@ class Statistics:
                 "max": 0
             }
         
-        sorted_ages = sorted(self.ages)
-        count = len(sorted_ages)
-        
-        # Średnia
-        average = sum(sorted_ages) / count
-        
-        # Mediana
-        if count % 2 == 0:
-            median = (sorted_ages[count // 2 - 1] + sorted_ages[count // 2]) / 2
-        else:
-            median = sorted_ages[count // 2]
-        
         return {
-            "average": round(average, 1),
-            "median": median,
-            "min": sorted_ages[0],
-            "max": sorted_ages[-1]
+            "average": round(self.ages.average(), 1),
+            "median": self.ages.median(),
+            "min": self.ages.min,
+            "max": self.ages.max
         }
+
+    def get_current_median_age(self):
+        """Zwraca bieżącą medianę wieku zaokrągloną do lat (40 gdy brak osób)."""
+        if not self.ages:
+            return DEFAULT_MEDIAN_AGE
+        return int(round(self.ages.median()))
     
     def add_file(self):
         """Zwiększa licznik przeskanowanych plików."""
         self.files_scanned += 1
     
+    def add_file_not_read(self):
+        """Zwiększa licznik plików bez pomiaru czasu (niewczytywanych w tej analizie)."""
+        self.files_not_read += 1
+
     def add_sheet(self):
         """Zwiększa licznik przeskanowanych arkuszy."""
         self.sheets_scanned += 1
@@ -227,6 +302,11 @@ class Statistics:
         """Zwiększa licznik nieznanych imion."""
         self.unknown_names_count += 1
     
+    def resolve_unknown_name(self):
+        """Cofa zliczenie nieznanego imienia i jego ostrzeżenia (imię dodane do słownika)."""
+        self.unknown_names_count -= 1
+        self.warnings_count -= 1
+    
     def add_jubilee(self):
         """Zwiększa licznik jubileuszy."""
         self.jubilees_count += 1
@@ -235,6 +315,32 @@ class Statistics:
         """Zwiększa licznik ślubów w zakresie."""
         self.marriages_in_range_count += 1
     
+    def add_stage_time(self, stage, seconds):
+        """Dodaje czas etapu analizy (klucz z TIMING_STAGES)."""
+        self.stage_times[stage] = self.stage_times.get(stage, 0.0) + seconds
+
+    def set_stage_time(self, stage, seconds):
+        """Ustawia czas etapu wykonywanego raz na wynik (np. wyświetlenie, powtarzane po dodaniu imienia)."""
+        self.stage_times[stage] = seconds
+
+    def add_file_timings(self, file_path, timings, sheets=0):
+        """
+        Dodaje czasy wczytywania pliku (słownik "timings" z parse_kartoteka_file).
+
+        Tylko dla plików wczytanych w tej analizie - pozostałe liczy add_file_not_read.
+        """
+        for stage, seconds in timings.items():
+            self.add_stage_time(stage, seconds)
+        self.file_times.append((sum(timings.values()), file_path, sheets, timings))
+
+    def get_slowest_files(self, count=SLOWEST_FILES_COUNT):
+        """Zwraca najwolniej wczytywane pliki (od najwolniejszego) jako listę słowników."""
+        slowest = heapq.nlargest(count, self.file_times, key=lambda entry: entry[0])
+        return [
+            dict({"file": os.path.basename(file_path), "file_path": file_path, "sheets": sheets, "total": total}, **timings)
+            for total, file_path, sheets, timings in slowest
+        ]
+
     def get_summary(self):
         """Zwraca słownik z podsumowaniem statystyk."""
         age_stats = self.get_age_stats()
@@ -243,6 +349,7 @@ class Statistics:
             "total_males": self.total_males,
             "total_females": self.total_females,
             "files_scanned": self.files_scanned,
+            "files_not_read": self.files_not_read,
             "sheets_scanned": self.sheets_scanned,
             "errors_count": self.errors_count,
             "warnings_count": self.warnings_count,
@@ -261,7 +368,9 @@ class Statistics:
                 "family_count_1": self.family_count_1,
                 "family_count_2": self.family_count_2,
                 "family_count_3_4": self.family_count_3_4,
-                "family_count_5plus": self.family_count_5plus
+                "family_count_5plus": self.family_count_5plus,
+                "stage_times": dict(self.stage_times),
+                "slowest_files": self.get_slowest_files()
         }
     
     def format_statistics(self, found_people):
@@ -366,6 +475,22 @@ class Statistics:
         text += f"  Czas trwania:           {duration:>8.2f} sekund\n"
         if summary['files_scanned'] > 0:
             text += f"  Sredni czas na plik:    {duration/summary['files_scanned']:>8.2f} s\n"
+        if any(summary['stage_times'].values()):
+            text += "  Czas etapów (łącznie, także w procesach roboczych):\n"
+            for stage, seconds in summary['stage_times'].items():
+                text += f"    {TIMING_STAGES.get(stage, stage) + ':':<26}{seconds:>8.3f} s\n"
+        if summary['files_not_read']:
+            text += f"  Pliki bez pomiaru (z pamięci, niewczytywane): {summary['files_not_read']}\n"
+
+        # NAJWOLNIEJSZE PLIKI
+        if summary['slowest_files']:
+            text += f"\nNAJWOLNIEJSZE PLIKI (TOP {len(summary['slowest_files'])}):\n"
+            text += f"  {'Lp.':>3} {'Plik':<34} {'Ark.':>4} {'Razem':>8} {'Wczyt.':>8} {'Ekstr.':>8}\n"
+            for i, entry in enumerate(summary['slowest_files'], 1):
+                name = entry['file'] if len(entry['file']) <= 34 else entry['file'][:31] + "..."
+                reading = entry.get('open', 0.0) + entry.get('parse', 0.0)
+                extracting = entry.get('extract', 0.0) + entry.get('people', 0.0)
+                text += f"  {i:>3} {name:<34} {entry['sheets']:>4} {entry['total']:>7.3f}s {reading:>7.3f}s {extracting:>7.3f}s\n"
 
         # Dni do końca roku
         today = date.today()
@@ -0,0 +1,264 @@
+"""
+Generator syntetycznej kartoteki do testów wydajności.
+
+Prawdziwych kartotek parafialnych nie można udostępniać, więc problemy
+z wydajnością przy 5-20 tys. plików odtwarzamy na danych wygenerowanych.
+Pliki .xlsx mają dokładnie taki układ, jakiego oczekuje analiza:
+- nazwisko w wierszach 1-6 kolumn A-B,
+- adres aktualny w kolumnach C-E, stary adres w kolumnach F-G,
+- mąż i żona w wierszach 8-9 (imię w B, data urodzenia w C, data ślubu w D),
+- dzieci i pozostałe osoby w kolejnych wierszach kolumn B-C,
+- znaczniki "dziadek"/"babcia" w kolumnie D i "ślub: data" w kolumnach E-R.
+
+Część danych jest celowo błędna (nieprawidłowe daty, 99/99/9999, brak daty,
+imiona spoza słownika, uszkodzone pliki) - częstość każdego przypadku jest
+parametrem. Każdy plik ma własny generator losowy wyprowadzony z ziarna
+i numeru pliku, więc zawartość korpusu zależy tylko od parametrów (także
+przy generowaniu w wielu procesach).
+
+Przykład:
+    python synthetic_corpus.py C:\\Testy\\korpus --files 5000 --seed 1 --workers 0
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Imiona zapisywane do imiona.json korpusu
+FEMALE_NAMES = ["Maria", "Anna", "Katarzyna", "Zofia", "Jadwiga", "Małgorzata", "Barbara", "Krystyna",
+                "Elżbieta", "Agnieszka", "Helena", "Teresa", "Joanna", "Magdalena", "Stanisława", "Józefa"]
+MALE_NAMES = ["Jan", "Piotr", "Józef", "Stanisław", "Andrzej", "Tomasz", "Krzysztof", "Marek",
+              "Kazimierz", "Władysław", "Tadeusz", "Paweł", "Wojciech", "Michał", "Zbigniew", "Łukasz"]
+
+# Imiona spoza słownika - trafiają do listy nieznanych imion
+UNKNOWN_NAMES = ["Xawery", "Brajan", "Dżesika", "Kewin", "Vanessa", "Zdzich", "Oliwier", "Nikola"]
+
+SURNAMES = ["Nowak", "Kowalski", "Wiśniewski", "Wójcik", "Kowalczyk", "Kamiński", "Lewandowski", "Zieliński",
+            "Szymański", "Woźniak", "Dąbrowski", "Kozłowski", "Jankowski", "Mazur", "Kwiatkowski", "Krawczyk",
+            "Piotrowski", "Grabowski", "Nowakowski", "Pawłowski", "Michalski", "Nowicki", "Adamczyk", "Dudek"]
+PLACES = ["Przyborów", "Brzeźnica", "Marcyporęba", "Łączany", "Sosnowice", "Paszkówka", "Kopytówka", "Wysoka"]
+STREETS = ["Główna", "Szkolna", "Kościelna", "Polna", "Leśna", "Ogrodowa", "Kolejowa", "Krótka"]
+
+# Domyślne parametry korpusu (częstości to prawdopodobieństwa z zakresu 0-1)
+DEFAULT_OPTIONS = {
+    "files": 1000,
+    "seed": 0,
+    "max_sheets": 3,  # Najwięcej arkuszy w pliku
+    "multi_sheet_rate": 0.2,  # Pliki z więcej niż jednym arkuszem
+    "max_children": 6,  # Najwięcej osób poniżej małżonków
+    "grandparents_rate": 0.4,  # Arkusze z dziadkami i datą ich ślubu
+    "invalid_date_rate": 0.03,  # Nieprawidłowe daty urodzenia (np. 31.02.1950)
+    "placeholder_date_rate": 0.02,  # Data umowna 99/99/9999
+    "missing_date_rate": 0.05,  # Osoby bez daty urodzenia
+    "unknown_name_rate": 0.02,  # Imiona spoza słownika
+    "broken_file_rate": 0.0,  # Pliki, których nie da się otworzyć
+}
+
+# Stała granica lat - zawartość korpusu nie zależy od dnia generowania
+LAST_YEAR = 2020
+
+# Nieprawidłowe daty w postaci tekstu (dzień, miesiąc)
+_INVALID_DAY_MONTH = [(31, 2), (30, 2), (12, 13), (33, 1), (0, 5), (31, 4)]
+
+def _new_counts():
+    return {"files": 0, "broken_files": 0, "sheets": 0, "people": 0, "invalid_dates": 0,
+            "placeholder_dates": 0, "missing_dates": 0, "unknown_names": 0}
+
+def _birth_cell(rnd, year, options, counts):
+    """Zwraca komórkę daty urodzenia: datę Excela, tekst d.m.rrrr albo przypadek błędny."""
+    r = rnd.random()
+    if r < options["missing_date_rate"]:
+        counts["missing_dates"] += 1
+        return None
+    r -= options["missing_date_rate"]
+    if r < options["placeholder_date_rate"]:
+        counts["placeholder_dates"] += 1
+        return "99/99/9999"
+    r -= options["placeholder_date_rate"]
+    if r < options["invalid_date_rate"]:
+        counts["invalid_dates"] += 1
+        day, month = rnd.choice(_INVALID_DAY_MONTH)
+        return f"{day}.{month}.{year}"
+    month = rnd.randint(1, 12)
+    day = rnd.randint(1, 28)
+    if rnd.random() < 0.5:
+        return datetime(year, month, day)
+    return f"{day:02d}.{month:02d}.{year}"
+
+def _given_name(rnd, names, options, counts):
+    """Losuje imię; czasem spoza słownika, małymi literami albo z drugim członem."""
+    if rnd.random() < options["unknown_name_rate"]:
+        counts["unknown_names"] += 1
+        name = rnd.choice(UNKNOWN_NAMES)
+    else:
+        name = rnd.choice(names)
+    r = rnd.random()
+    if r < 0.1:
+        name = name.lower()
+    elif r < 0.2:
+        name = f"{name} {rnd.choice(SURNAMES)}"
+    return name
+
+def _person_row(rnd, names, birth_year, options, counts, width):
+    row = [None] * width
+    row[1] = _given_name(rnd, names, options, counts)
+    row[2] = _birth_cell(rnd, birth_year, options, counts)
+    counts["people"] += 1
+    return row
+
+def build_sheet_rows(rnd, surname, options, counts):
+    """Buduje wiersze jednego arkusza (listy wartości kolumn A-R)."""
+    width = 18
+    rows = [[None] * width for _ in range(8)]
+
+    # Nazwisko (wiersze 1-6, kolumny A-B) - zwykle A2, czasem niżej lub w kolumnie B
+    surname_row = rnd.choice([1, 1, 1, 2, 3, 5])
+    rows[surname_row][0 if rnd.random() < 0.8 else 1] = surname
+    if rnd.random() < 0.3:
+        rows[surname_row + 1][1] = rnd.choice(SURNAMES)
+
+    # Adres aktualny (C-E) i stary (F-G)
+    address_row = rnd.randint(1, 3)
+    rows[address_row][2] = rnd.choice(STREETS) if rnd.random() < 0.5 else rnd.choice(PLACES)
+    rows[address_row][3] = rnd.randint(1, 250) if rnd.random() < 0.8 else f"{rnd.randint(1, 99)}a"
+    if rnd.random() < 0.4:
+        rows[address_row][4] = f"gm. {rnd.choice(PLACES)}"
+    if rnd.random() < 0.4:
+        rows[address_row][5] = rnd.choice(PLACES)
+        rows[address_row][6] = rnd.randint(1, 300)
+
+    # Małżonkowie (wiersze 8-9) z datą ślubu w kolumnie D
+    husband_year = rnd.randint(1925, 1995)
+    wife_year = min(LAST_YEAR, husband_year + rnd.randint(-5, 5))
+    marriage_year = min(LAST_YEAR, max(husband_year, wife_year) + rnd.randint(19, 35))
+    husband = _person_row(rnd, MALE_NAMES, husband_year, options, counts, width)
+    wife = _person_row(rnd, FEMALE_NAMES, wife_year, options, counts, width)
+    marriage_date = datetime(marriage_year, rnd.randint(1, 12), rnd.randint(1, 28))
+    r = rnd.random()
+    if r < 0.5:
+        marriage_cell = marriage_date
+    elif r < 0.8:
+        marriage_cell = marriage_date.strftime("%d.%m.%Y")
+    else:
+        marriage_cell = marriage_date.strftime("ślub %d.%m.%Y")
+    # Data ślubu zwykle przy mężu, czasem tylko przy żonie
+    (husband if rnd.random() < 0.9 else wife)[3] = marriage_cell
+    rows.append(husband)
+    rows.append(wife)
+
+    # Dzieci i pozostałe osoby
+    for _ in range(rnd.randint(0, options["max_children"])):
+        child_year = min(LAST_YEAR, marriage_year + rnd.randint(0, 20))
+        rows.append(_person_row(rnd, FEMALE_NAMES + MALE_NAMES, child_year, options, counts, width))
+
+    # Dziadkowie: znaczniki w kolumnie D, data ślubu "ślub: d.m.rrrr" w kolumnach E-R
+    if rnd.random() < options["grandparents_rate"]:
+        rows.append([None] * width)
+        grandfather_year = husband_year - rnd.randint(20, 35)
+        grandfather = _person_row(rnd, MALE_NAMES, grandfather_year, options, counts, width)
+        grandmother = _person_row(rnd, FEMALE_NAMES, grandfather_year + rnd.randint(-3, 3), options, counts, width)
+        grandfather[3] = "dziadek" if rnd.random() < 0.9 else "dziadek †"
+        grandmother[3] = "babcia"
+        gp_marriage = datetime(grandfather_year + rnd.randint(20, 30), rnd.randint(1, 12), rnd.randint(1, 28))
+        grandfather[rnd.randint(4, width - 1)] = f"ślub: {gp_marriage.day}.{gp_marriage.month}.{gp_marriage.year}"
+        rows.append(grandfather)
+        rows.append(grandmother)
+    return rows
+
+def write_workbook(file_path, index, options):
+    """Zapisuje jeden plik kartoteki i zwraca liczniki wygenerowanych przypadków."""
+    import openpyxl
+
+    rnd = random.Random(f"{options['seed']}:{index}")
+    counts = _new_counts()
+    counts["files"] = 1
+    if rnd.random() < options["broken_file_rate"]:
+        counts["broken_files"] = 1
+        with open(file_path, "wb") as f:
+            f.write(b"uszkodzony plik - to nie jest archiwum xlsx")
+        return counts
+
+    surname = rnd.choice(SURNAMES)
+    sheet_count = 1
+    if options["max_sheets"] > 1 and rnd.random() < options["multi_sheet_rate"]:
+        sheet_count = rnd.randint(2, options["max_sheets"])
+
+    workbook = openpyxl.Workbook(write_only=True)
+    for sheet_index in range(sheet_count):
+        worksheet = workbook.create_sheet(surname if sheet_index == 0 else f"{surname} {sheet_index + 1}")
+        for row in build_sheet_rows(rnd, surname, options, counts):
+            worksheet.append(row)
+        counts["sheets"] += 1
+    workbook.save(file_path)
+    return counts
+
+def write_names_file(output_dir):
+    """Zapisuje imiona.json ze słownikiem imion korpusu (bez imion nieznanych)."""
+    names = {name: "K" for name in FEMALE_NAMES}
+    names.update({name: "M" for name in MALE_NAMES})
+    path = os.path.join(output_dir, "imiona.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(names, f, ensure_ascii=False, indent=2)
+    return path
+
+def _write_chunk(output_dir, indexes, options):
+    counts = _new_counts()
+    for index in indexes:
+        for key, value in write_workbook(os.path.join(output_dir, f"kartoteka_{index:05d}.xlsx"), index, options).items():
+            counts[key] += value
+    return counts
+
+def generate_corpus(output_dir, workers=1, **options):
+    """
+    Generuje korpus w folderze output_dir i zwraca podsumowanie (liczniki przypadków).
+
+    Parametry jak w DEFAULT_OPTIONS; workers > 1 (lub 0 = liczba rdzeni)
+    generuje pliki w puli procesów - zawartość korpusu jest ta sama.
+    """
+    unknown = set(options) - set(DEFAULT_OPTIONS)
+    if unknown:
+        raise ValueError(f"Nieznane parametry korpusu: {', '.join(sorted(unknown))}")
+    options = dict(DEFAULT_OPTIONS, **options)
+    os.makedirs(output_dir, exist_ok=True)
+    write_names_file(output_dir)
+
+    indexes = list(range(options["files"]))
+    workers = int(workers or 0) or os.cpu_count() or 1
+    workers = max(1, min(workers, len(indexes)))
+    chunks = [indexes[i::workers] for i in range(workers)]
+    summary = _new_counts()
+    if workers == 1:
+        results = [_write_chunk(output_dir, indexes, options)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_write_chunk, [output_dir] * workers, chunks, [options] * workers))
+    for counts in results:
+        for key, value in counts.items():
+            summary[key] += value
+    return summary
+
+def build_parser():
+    """Tworzy parser argumentów wiersza poleceń."""
+    parser = argparse.ArgumentParser(description="Generator syntetycznej kartoteki do testów wydajności")
+    parser.add_argument("output", help="folder docelowy (zostanie utworzony)")
+    parser.add_argument("--workers", type=int, default=1, help="liczba procesów (0 = liczba rdzeni)")
+    for key, default in DEFAULT_OPTIONS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, type=type(default), default=default)
+    return parser
+
+def main(argv=None):
+    """Punkt wejścia wiersza poleceń; zwraca kod wyjścia."""
+    args = vars(build_parser().parse_args(argv))
+    output_dir = args.pop("output")
+    workers = args.pop("workers")
+    summary = generate_corpus(output_dir, workers=workers, **args)
+    print(json.dumps(summary, ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Testy logiki indeksów: kalendarz jubileuszy, okrągłe urodziny, filtr osób i wyszukiwanie w dzienniku.
+
+Uruchomienie: python -m pytest -q
+"""
+from datetime import date
+from jubilee_calendar import JubileeCalendar, BirthdayIndex
+from kartoteka_core import PeopleIndex, person_derived_fields
+from data_processing import remove_diacritics
+from search_index import LogSearchIndex
+
+def make_calendar(marriage_dates, milestones=(50,)):
+    calendar = JubileeCalendar(milestones)
+    for marriage_date in marriage_dates:
+        calendar.add(marriage_date, {"surname": marriage_date, "husband": "Mąż", "wife": "Żona",
+                                     "type": "MAŁŻONKOWIE", "old_address": None})
+    calendar.sort()
+    return calendar
+
+def make_birthdays(birth_dates, milestones=(90,)):
+    index = BirthdayIndex(milestones)
+    for birth_date in birth_dates:
+        index.add(birth_date, {"imie": birth_date.isoformat()})
+    index.sort()
+    return index
+
+# --- JubileeCalendar ---
+
+def test_leap_day_marriage_in_non_leap_year_falls_on_feb_28():
+    calendar = make_calendar(["1976-02-29"])
+    found = calendar.upcoming(date(2026, 2, 28), 0)
+    assert [(j["date"], j["years"], j["days"]) for j in found] == [("2026-02-28", 50, 0)]
+    assert calendar.upcoming(date(2026, 3, 1), 30) == []
+    assert [j["date"] for j in calendar.in_year(2026)] == ["2026-02-28"]
+
+def test_leap_day_marriage_in_leap_year_stays_on_feb_29():
+    calendar = make_calendar(["1976-02-29"], milestones=(48,))
+    assert calendar.upcoming(date(2024, 2, 28), 0) == []
+    assert [j["date"] for j in calendar.upcoming(date(2024, 2, 29), 0)] == ["2024-02-29"]
+
+def test_window_crossing_new_year():
+    calendar = make_calendar(["1975-12-30", "1976-01-03", "1976-12-30", "1975-01-05"])
+    found = calendar.upcoming(date(2025, 12, 20), 20)
+    # 1976-12-30 ma jubileusz dopiero w 2026 r., a 1975-01-05 - w styczniu 2025 r.
+    assert [(j["date"], j["days"]) for j in found] == [("2025-12-30", 10), ("2026-01-03", 14)]
+
+def test_zero_day_window_returns_only_that_day():
+    calendar = make_calendar(["1976-06-14", "1976-06-15", "1976-06-16"])
+    found = calendar.upcoming(date(2026, 6, 15), 0)
+    assert [(j["date"], j["days"]) for j in found] == [("2026-06-15", 0)]
+
+def test_marriage_year_filters():
+    calendar = make_calendar(["1976-06-15", "1986-06-15"], milestones=(40, 50))
+    assert len(calendar.upcoming(date(2026, 6, 15), 0)) == 2
+    found = calendar.upcoming(date(2026, 6, 15), 0, marriage_year_from=1980)
+    assert [j["years"] for j in found] == [40]
+
+# --- BirthdayIndex ---
+
+def test_leap_day_birthday_in_non_leap_year_falls_on_feb_28():
+    index = make_birthdays([date(1936, 2, 29)])
+    found = index.upcoming(date(2026, 2, 28), 0)
+    assert [(b["date"], b["wiek"], b["days"]) for b in found] == [("2026-02-28", 90, 0)]
+    assert index.upcoming(date(2026, 3, 1), 30) == []
+
+def test_birthday_window_crossing_new_year():
+    index = make_birthdays([date(1935, 12, 31), date(1936, 1, 1), date(1936, 12, 31)])
+    found = index.upcoming(date(2025, 12, 31), 1)
+    assert [(b["date"], b["days"]) for b in found] == [("2025-12-31", 0), ("2026-01-01", 1)]
+
+def test_birthday_zero_day_window():
+    index = make_birthdays([date(1936, 5, 9), date(1936, 5, 10)], milestones=(90, 95))
+    found = index.upcoming(date(2026, 5, 10), 0)
+    assert [(b["imie"], b["wiek"]) for b in found] == [("1936-05-10", 90)]
+
+# --- PeopleIndex ---
+
+def make_people():
+    people = []
+    for given_name, surname, age in [("Łukasz", "Nowak", 50), ("Lucyna", "Zając", 30),
+                                     ("Ewa", "Łukowska", 70), ("Jan", "Kowalski", 10)]:
+        person = {"imie": given_name, "nazwisko": surname, "wiek": age, "adres": "", "old_address": None}
+        person.update(person_derived_fields(given_name, surname, None))
+        people.append(person)
+    return people
+
+def names(people, order):
+    return [people[i]["imie"] for i in order]
+
+def test_filtered_order_matches_name_or_surname_prefix_in_sort_order():
+    people = make_people()
+    index = PeopleIndex(people)
+    assert names(people, index.filtered_order("wiek", remove_diacritics("Łu"))) == ["Łukasz", "Ewa"]
+    assert names(people, index.filtered_order("wiek", remove_diacritics("ZAJ"))) == ["Lucyna"]
+    assert names(people, index.filtered_order("alfabetycznie", "l")) == ["Lucyna"]
+
+def test_filtered_order_without_prefix_and_without_matches():
+    people = make_people()
+    index = PeopleIndex(people)
+    assert names(people, index.filtered_order("wiek", "")) == ["Jan", "Lucyna", "Łukasz", "Ewa"]
+    assert names(people, index.filtered_order(None, "")) == ["Łukasz", "Lucyna", "Ewa", "Jan"]
+    assert list(index.filtered_order("wiek", "xyz")) == []
+
+# --- LogSearchIndex ---
+
+def make_log_index(lines):
+    index = LogSearchIndex()
+    for line in lines:
+        index.add_line(line)
+    return index
+
+def test_search_ignores_case_and_polish_characters_and_keeps_positions():
+    lines = ["Znaleziona osoba: Józef Kowalski", "Adres: Łódzka 5", "Brak"]
+    index = make_log_index(lines)
+    found = index.find("JOZEF")
+    assert found == [(0, 18, 23)]
+    line, start, end = found[0]
+    assert lines[line][start:end] == "Józef"
+    assert index.find("łódzka") == [(1, 7, 13)]
+
+def test_search_matches_whole_words_and_phrases_only():
+    index = make_log_index(["Janina Nowak", "Jan Nowak", "Anna i Jan Nowak", "Nowak Jan"])
+    assert [line for line, _, _ in index.find("jan")] == [1, 2, 3]
+    assert [line for line, _, _ in index.find("jan nowak")] == [1, 2]
+    assert index.find("janek") == []
+    assert index.find("   ") == []